@@ -0,0 +1,149 @@
+"""
+Walk-forward backtest untuk sinyal get_hybrid_signal.
+
+    python backtest.py BBCA.JK BBRI.JK --steps 250 [--sentiment-archive arsip.csv] [--output trades.csv]
+
+Setiap hari uji: backend forecast live (forecasting.backend_for) hanya melihat data s/d hari itu (jendela 1 tahun
+seperti live), memprediksi harga hari berikutnya, lalu sinyal dibandingkan dengan pergerakan harga sebenarnya.
+"""
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import config
+import price_store
+import forecasting
+import market_analysis
+
+
+def load_sentiment_archive(path):
+    """CSV arsip skor sentimen: kolom date, ticker, score -> dict ticker -> Series skor per tanggal"""
+    df = pd.read_csv(path, parse_dates=['date'])
+    return {ticker: group.set_index('date')['score'].sort_index() for ticker, group in df.groupby('ticker')}
+
+
+def _position(signal):
+    """Arah posisi yang disiratkan sinyal: 1 (beli), -1 (jual), 0 (tidak ada posisi)"""
+    if 'BUY' in signal: return 1
+    if 'SELL' in signal: return -1
+    return 0
+
+
+def _run_window(ticker, history, steps, refit_every, sentiment, constant_sentiment):
+    """
+    Replay sekelompok hari berurutan untuk satu ticker (dijalankan di worker proses).
+    history: DataFrame ds/y lengkap; steps: index baris "hari ini" yang diuji.
+    """
+    ds = history['ds'].to_numpy()
+    y = history['y'].to_numpy()
+    # Backend yang sama dengan live (forecasting.backend_for), jadi sinyal yang diuji = sinyal yang dipakai
+    backend = forecasting.get_backend(forecasting.backend_for(ticker))
+    predictions = backend.walk_forward(history, steps, refit_every)
+    rows = []
+
+    for i, pred in zip(steps, predictions):
+        if pred is None: continue
+        current = float(y[i])
+        day = pd.Timestamp(ds[i])
+        score = constant_sentiment
+        if sentiment is not None:
+            known = sentiment[sentiment.index <= day]
+            if not known.empty: score = float(known.iloc[-1])
+
+        signal, change, reason = market_analysis.get_hybrid_signal(current, float(pred), score)
+        next_return = float(y[i + 1] / y[i] - 1)
+        position = _position(signal)
+        rows.append({
+            'ticker': ticker, 'date': day, 'current': current, 'pred': float(pred),
+            'sentiment': score, 'signal': signal, 'reason': reason, 'position': position,
+            'next_return': next_return, 'strategy_return': position * next_return,
+            'hit': float(np.sign(next_return) == position) if position != 0 else np.nan,
+        })
+    return rows
+
+
+def _max_drawdown(returns):
+    equity = np.cumprod(1 + np.asarray(returns))
+    peak = np.maximum.accumulate(np.concatenate([[1.0], equity]))[1:]
+    return float((equity / peak - 1).min()) if len(equity) else 0.0
+
+def summarize(trades):
+    """Hit rate, return, dan drawdown per kelas sinyal"""
+    rows = []
+    for signal, group in trades.sort_values('date').groupby('signal'):
+        rows.append({
+            'signal': signal,
+            'count': len(group),
+            'hit_rate': group['hit'].mean() if group['position'].iloc[0] != 0 else np.nan,
+            'avg_next_return': group['next_return'].mean(),
+            'avg_strategy_return': group['strategy_return'].mean(),
+            'total_return': float(np.prod(1 + group['strategy_return']) - 1),
+            'max_drawdown': _max_drawdown(group['strategy_return']),
+        })
+    return pd.DataFrame(rows).set_index('signal').sort_values('count', ascending=False)
+
+
+def run_backtest(tickers, steps=config.BACKTEST_STEPS, refit_every=config.BACKTEST_REFIT_EVERY,
+                 window_steps=config.BACKTEST_WINDOW_STEPS, sentiment_archive=None,
+                 constant_sentiment=config.BACKTEST_SENTIMENT, max_workers=None):
+    """
+    Walk-forward backtest beberapa ticker. Window-window hari uji dibagi ke process pool.
+    sentiment_archive: dict ticker -> Series skor (lihat load_sentiment_archive); jika tidak ada,
+    dipakai constant_sentiment sehingga bisa jalan sepenuhnya offline.
+    Return (trades, summary) berupa DataFrame.
+    """
+    # Riwayat cukup untuk jendela latih 1 tahun + hari uji (kalender, dengan cadangan libur)
+    history_days = config.FORECAST_HISTORY_DAYS + int(steps * 1.6) + 30
+    tasks = []
+    for ticker in tickers:
+        hist = price_store.get_history(ticker, history_days)
+        history = pd.DataFrame({'ds': hist.index, 'y': hist['Close'].values}).dropna().reset_index(drop=True)
+        if len(history) < 30:
+            print(f"Error Backtest {ticker}: data tidak cukup")
+            continue
+        # Hari terakhir tidak bisa diuji karena belum ada harga besoknya
+        test_rows = list(range(max(1, len(history) - 1 - steps), len(history) - 1))
+        sentiment = (sentiment_archive or {}).get(ticker)
+        for start in range(0, len(test_rows), window_steps):
+            tasks.append((ticker, history, test_rows[start:start + window_steps], refit_every,
+                          sentiment, constant_sentiment))
+
+    trades = []
+    if tasks:
+        workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_run_window, *task): task[0] for task in tasks}
+            for future in as_completed(futures):
+                try:
+                    trades.extend(future.result())
+                except Exception as e:
+                    print(f"Error Backtest {futures[future]}: {e}")
+
+    if not trades: return pd.DataFrame(), pd.DataFrame()
+    trades = pd.DataFrame(trades).sort_values(['ticker', 'date']).reset_index(drop=True)
+    return trades, summarize(trades)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward backtest sinyal hybrid")
+    parser.add_argument('tickers', nargs='*', help="Default: semua config.ASSETS")
+    parser.add_argument('--steps', type=int, default=config.BACKTEST_STEPS)
+    parser.add_argument('--refit-every', type=int, default=config.BACKTEST_REFIT_EVERY)
+    parser.add_argument('--window', type=int, default=config.BACKTEST_WINDOW_STEPS)
+    parser.add_argument('--sentiment', type=float, default=config.BACKTEST_SENTIMENT,
+                        help="Sentimen konstan jika tidak ada arsip")
+    parser.add_argument('--sentiment-archive', help="CSV: date,ticker,score")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', help="Simpan detail trade ke CSV")
+    args = parser.parse_args()
+
+    tickers = args.tickers or [asset['ticker'] for asset in config.ASSETS.values()]
+    archive = load_sentiment_archive(args.sentiment_archive) if args.sentiment_archive else None
+    trades, summary = run_backtest(tickers, args.steps, args.refit_every, args.window, archive,
+                                   args.sentiment, args.workers)
+    if summary.empty:
+        print("Tidak ada hasil backtest.")
+    else:
+        print(summary.to_string(float_format=lambda v: f"{v:.4f}"))
+        if args.output: trades.to_csv(args.output, index=False)
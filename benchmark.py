@@ -0,0 +1,460 @@
+"""
+Benchmark offline (tanpa Yahoo / Google News), memakai data sintetis deterministik dari synthetic.py.
+
+    python benchmark.py run [--suites forecast news signal portfolio render] [--tickers 10 100 1000] [--years 1 5]
+    python benchmark.py optimizer [--sizes 4 20 50 100]
+    python benchmark.py forecasters [--backends holt prophet] [--source synthetic|store] [--steps 20]
+    python benchmark.py import-time [--modules market_analysis ...]
+    python benchmark.py compare lama.json baru.json [--threshold 1.2]
+
+Hasil `run` disimpan sebagai JSON di data/benchmarks/ (atau --output) agar bisa dibandingkan antar versi.
+Setiap run memakai folder kerja sementara, jadi cache & store lokal yang asli tidak tersentuh.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+import config
+import synthetic
+import price_store
+import model_cache
+import news_fetcher
+import sentiment
+import market_analysis
+import forecasting
+import portfolio_optimizer
+import visualizer
+
+SUITES = ['forecast', 'news', 'signal', 'portfolio', 'render']
+
+
+def _timeit(func, repeat=3):
+    """Waktu terbaik (detik) dari beberapa kali jalan, plus hasil panggilan terakhir"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+@contextmanager
+def _workspace():
+    """Folder kerja sementara: semua path data/ relatif jatuh ke sini"""
+    previous = os.getcwd()
+    path = tempfile.mkdtemp(prefix="hmd_bench_")
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(path, ignore_errors=True)
+
+def _use_frames(frames, years):
+    """Arahkan price store ke data sintetis dan kosongkan cache model/sentimen/berita"""
+    days = int(years * 365)
+    config.FORECAST_HISTORY_DAYS = days
+    config.PORTFOLIO_HISTORY_DAYS = days
+    price_store.set_store(price_store.PriceStore(source=price_store.FrameSource(frames)))
+    shutil.rmtree(config.MODEL_CACHE_DIR, ignore_errors=True)
+    model_cache.set_cache(None)
+    shutil.rmtree(config.PORTFOLIO_CACHE_DIR, ignore_errors=True)
+    portfolio_optimizer._weights_cache.clear()
+    news_fetcher.clear_cache()
+    sentiment._engine = None
+
+
+# --- SUITE ---
+def bench_forecast(frames, sample=5):
+    tickers = list(frames)
+    sample_tickers = tickers[:sample]
+    start = time.perf_counter()
+    for ticker in sample_tickers: market_analysis.get_technical_forecast(ticker)
+    per_call_cold = (time.perf_counter() - start) / len(sample_tickers)
+    start = time.perf_counter()
+    for ticker in sample_tickers: market_analysis.get_technical_forecast(ticker)
+    per_call_cached = (time.perf_counter() - start) / len(sample_tickers)
+
+    # Batch paralel: mulai dari cache model kosong, lalu ulangi (semua hit)
+    shutil.rmtree(config.MODEL_CACHE_DIR, ignore_errors=True)
+    model_cache.set_cache(None)
+    no_news = {ticker: None for ticker in tickers}
+    batch_cold, results = _timeit(lambda: market_analysis.forecast_many(tickers, keywords=no_news), 1)
+    batch_cached, _ = _timeit(lambda: market_analysis.forecast_many(tickers, keywords=no_news), 1)
+    return {
+        'per_call_cold_s': per_call_cold,
+        'per_call_cached_s': per_call_cached,
+        'batch_cold_s': batch_cold,
+        'batch_cached_s': batch_cached,
+        'failed': sum(1 for res in results.values() if not res['ok']),
+    }
+
+def bench_news(frames, items=20):
+    keywords = [f"{ticker} stock" for ticker in frames]
+    with synthetic.serve_rss(num_items=items) as url:
+        config.NEWS_RSS_URL = url
+        single_cold, _ = _timeit(lambda: market_analysis.get_news_sentiment(keywords[0]), 1)
+        many_cold, _ = _timeit(lambda: market_analysis.get_news_sentiment_many(keywords), 1)
+        many_cached, _ = _timeit(lambda: market_analysis.get_news_sentiment_many(keywords))
+        # TTL habis: semua feed dicek ulang dengan conditional GET (server membalas 304)
+        ttl = config.NEWS_CACHE_TTL_SECONDS
+        config.NEWS_CACHE_TTL_SECONDS = 0
+        try:
+            many_conditional, _ = _timeit(lambda: market_analysis.get_news_sentiment_many(keywords), 1)
+        finally:
+            config.NEWS_CACHE_TTL_SECONDS = ttl
+    return {
+        'single_cold_s': single_cold,
+        'many_cold_s': many_cold,
+        'many_ttl_cached_s': many_cached,
+        'many_conditional_s': many_conditional,
+    }
+
+def bench_signal(frames, seed=0):
+    rng = np.random.default_rng(seed)
+    calls = sum(len(df) for df in frames.values())
+    current = rng.uniform(100, 10000, calls)
+    pred = current * (1 + rng.normal(0, 0.01, calls))
+    scores = rng.uniform(-0.3, 0.3, calls)
+
+    def run():
+        for c, p, s in zip(current, pred, scores): market_analysis.get_hybrid_signal(c, p, s)
+    total, _ = _timeit(run, 1)
+    return {'calls': calls, 'total_s': total, 'per_call_us': total / calls * 1e6}
+
+def bench_portfolio(frames, amounts=100):
+    tickers = list(frames)
+    cold, (recs, _) = _timeit(lambda: portfolio_optimizer.get_optimized_portfolio(10_000_000, tickers=tickers), 1)
+    warm, _ = _timeit(lambda: portfolio_optimizer.get_optimized_portfolio(10_000_000, tickers=tickers))
+    # Bobot sudah di-cache: hanya alokasi lot untuk banyak jumlah dana
+    optimal = portfolio_optimizer.get_optimal_weights(tickers=tickers)
+    budgets = np.linspace(1_000_000, 1_000_000_000, amounts)
+    allocate, _ = _timeit(lambda: [portfolio_optimizer.allocate_lots(optimal['weights'], optimal['prices'], b)
+                                   for b in budgets])
+    return {'cold_s': cold, 'warm_s': warm, 'allocate_per_amount_s': allocate / amounts, 'ok': recs is not None}
+
+def bench_render(frames, limit=40):
+    assets = []
+    for i, (ticker, df) in enumerate(list(frames.items())[:limit]):
+        recent = df.tail(config.REPORT_HISTORY_POINTS)
+        current = float(recent['Close'].iloc[-1])
+        assets.append({
+            'name': ticker, 'df': pd.DataFrame({'ds': recent.index, 'y': recent['Close'].values}),
+            'current': current, 'pred': current * 1.01, 'signal': ["BUY", "SELL", "HOLD"][i % 3],
+            'change': "1.00%", 'sentiment_label': "Netral",
+        })
+    cold, pages = _timeit(lambda: visualizer.render_pages(assets, "01 January 2026", "report.jpg"), 1)
+    cached, _ = _timeit(lambda: visualizer.render_pages(assets, "01 January 2026", "report.jpg"), 1)
+    return {'assets': len(assets), 'pages': len(pages), 'cold_s': cold, 'cached_s': cached,
+            'bytes_per_page': os.path.getsize(pages[0])}
+
+BENCHES = {
+    'forecast': bench_forecast, 'news': bench_news, 'signal': bench_signal,
+    'portfolio': bench_portfolio, 'render': bench_render,
+}
+
+def run_suites(suites, ticker_counts, years_list, seed=0):
+    """Jalankan setiap suite untuk setiap skala (jumlah ticker x panjang riwayat)"""
+    results = {suite: [] for suite in suites}
+    with _workspace():
+        for years in years_list:
+            for num_tickers in ticker_counts:
+                frames = synthetic.universe(num_tickers, int(years * 252), seed=seed)
+                for suite in suites:
+                    _use_frames(frames, years)
+                    print(f"[{suite}] {num_tickers} ticker x {years} tahun ...", flush=True)
+                    try:
+                        row = BENCHES[suite](frames)
+                    except Exception as e:
+                        row = {'error': repr(e)}
+                    results[suite].append({'tickers': num_tickers, 'years': years, **row})
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def _metadata():
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+# --- OPTIMIZER (jalur lama vs baru) ---
+def _legacy_max_sharpe(selected_returns, bounds=(0.05, 0.5)):
+    """Jalur lama: mean/cov pandas dihitung ulang tiap evaluasi, gradien numerik"""
+    num_assets = selected_returns.shape[1]
+
+    def negative_sharpe(weights):
+        portfolio_return = np.sum(selected_returns.mean() * weights) * 252
+        portfolio_volatility = np.sqrt(np.dot(weights.T, np.dot(selected_returns.cov() * 252, weights)))
+        return - (portfolio_return / portfolio_volatility)
+
+    constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
+    lower, upper = portfolio_optimizer._feasible_bounds(num_assets, bounds)
+    bounds = tuple((lower, upper) for _ in range(num_assets))
+    init_guess = [1 / num_assets] * num_assets
+    return minimize(negative_sharpe, init_guess, method='SLSQP', bounds=bounds, constraints=constraints).x
+
+
+def _sharpe(weights, returns_arr):
+    mu = returns_arr.mean(axis=0) * 252
+    sigma = np.cov(returns_arr, rowvar=False) * 252
+    return float(mu @ weights / np.sqrt(weights @ sigma @ weights))
+
+
+def bench_optimizer(sizes=(4, 20, 50, 100), repeat=3, frontier_points=50):
+    results = []
+    for num_assets in sizes:
+        returns = synthetic.synthetic_returns(num_assets, seed=num_assets)
+        returns_arr = returns.to_numpy()
+
+        legacy_time, legacy_w = _timeit(lambda: _legacy_max_sharpe(returns), repeat)
+        new_time, new_w = _timeit(lambda: portfolio_optimizer.max_sharpe_weights(
+            returns_arr.mean(axis=0), np.cov(returns_arr, rowvar=False)), repeat)
+        frontier_time, _ = _timeit(lambda: portfolio_optimizer.efficient_frontier(
+            returns_arr.mean(axis=0), np.cov(returns_arr, rowvar=False), n_points=frontier_points), 1)
+
+        results.append({
+            'assets': num_assets,
+            'legacy_s': legacy_time,
+            'vectorized_s': new_time,
+            'speedup': legacy_time / new_time,
+            'legacy_sharpe': _sharpe(legacy_w, returns_arr),
+            'vectorized_sharpe': _sharpe(new_w, returns_arr),
+            f'frontier_{frontier_points}pts_s': frontier_time,
+        })
+    return results
+
+
+# --- BACKEND FORECAST (akurasi vs kecepatan) ---
+def _forecast_groups(source, num_tickers, num_days, seed=0):
+    """dict tipe aset -> dict ticker -> DataFrame ds/y (sumber: data sintetis atau price store untuk config.ASSETS)"""
+    if source == 'store':
+        groups = {}
+        for info in config.ASSETS.values():
+            hist = price_store.get_history(info['ticker'], int(num_days * 1.6))
+            if hist.empty: continue
+            groups.setdefault(info['type'], {})[info['ticker']] = pd.DataFrame(
+                {'ds': hist.index, 'y': hist['Close'].values}).dropna()
+        return groups
+    groups = {}
+    for asset_type, suffix in [('stock', ".JK"), ('forex', "=X")]:
+        frames = synthetic.universe(num_tickers, num_days, seed=synthetic._seed(seed, asset_type), suffix=suffix)
+        groups[asset_type] = {t: pd.DataFrame({'ds': df.index, 'y': df['Close'].values}) for t, df in frames.items()}
+    return groups
+
+def bench_forecasters(groups, backends, steps=20, window=250):
+    """
+    Walk-forward di histori yang sama untuk tiap backend: prediksi 1 hari ke depan dari `steps` titik asal terakhir.
+    Metrik: MAPE, akurasi arah (naik/turun vs harga terakhir), dan waktu per prediksi. naive = harga terakhir.
+    """
+    rows = []
+    for asset_type, series in groups.items():
+        series = {t: s for t, s in series.items() if len(s) > steps + 10}
+        if not series: continue
+        for name in backends:
+            backend = forecasting.get_backend(name)
+            ape, naive_ape, direction, elapsed = [], [], [], 0.0
+            for k in range(steps, 0, -1):
+                train = {t: s.iloc[max(len(s) - k - window, 0):len(s) - k].reset_index(drop=True)
+                         for t, s in series.items()}
+                start = time.perf_counter()
+                preds = backend.forecast_many(train)
+                elapsed += time.perf_counter() - start
+                for t, s in series.items():
+                    if preds.get(t) is None: continue
+                    actual, last = s['y'].iloc[len(s) - k], train[t]['y'].iloc[-1]
+                    ape.append(abs(preds[t] - actual) / actual)
+                    naive_ape.append(abs(last - actual) / actual)
+                    direction.append(np.sign(preds[t] - last) == np.sign(actual - last))
+            forecasts = max(len(ape), 1)
+            rows.append({
+                'asset_type': asset_type, 'backend': name, 'tickers': len(series), 'steps': steps,
+                'mape_pct': float(np.mean(ape) * 100), 'naive_mape_pct': float(np.mean(naive_ape) * 100),
+                'direction_acc': float(np.mean(direction)), 'total_s': elapsed, 'per_forecast_s': elapsed / forecasts,
+            })
+    return rows
+
+def recommend_backends(rows):
+    """Backend dengan MAPE terkecil per tipe aset (untuk config.FORECAST_BACKEND_BY_TYPE)"""
+    best = {}
+    for row in rows:
+        current = best.get(row['asset_type'])
+        if current is None or row['mape_pct'] < current['mape_pct']: best[row['asset_type']] = row
+    return {asset_type: row['backend'] for asset_type, row in best.items()}
+
+
+# --- WAKTU IMPORT (startup) ---
+IMPORT_MODULES = ['config', 'instrumentation', 'price_store', 'model_cache', 'forecasting', 'news_fetcher',
+                  'sentiment', 'market_analysis', 'portfolio_optimizer', 'prefetcher', 'snapshot', 'streaming',
+                  'visualizer', 'pipeline', 'dashboard']
+# Dependensi berat yang seharusnya baru dimuat saat dipakai
+HEAVY_MODULES = ['prophet', 'cmdstanpy', 'yfinance', 'feedparser', 'textblob', 'httpx', 'scipy', 'seaborn']
+
+_IMPORT_SNIPPET = """
+import sys, json, time, types
+class _PageStart(Exception): pass
+{setup}
+start = time.perf_counter()
+try:
+    import {module}
+except _PageStart:
+    pass
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'import_s': elapsed, 'heavy': heavy}}))
+"""
+
+# dashboard adalah script Streamlit: streamlit diganti stub yang berhenti di st.set_page_config, jadi yang diukur
+# hanya import modul (bagian yang dibayar sekali per proses), bukan badan halaman yang dijalankan per sesi.
+# Waktu import streamlit sendiri tidak ikut dihitung.
+_STREAMLIT_STUB = """
+def _set_page_config(**kwargs): raise _PageStart()
+sys.modules['streamlit'] = types.ModuleType('streamlit')
+sys.modules['streamlit'].set_page_config = _set_page_config
+"""
+_IMPORT_SETUP = {'dashboard': _STREAMLIT_STUB}
+
+def bench_import_time(modules=None, repeat=3):
+    """Waktu import tiap modul di proses Python baru (tanpa cache modul), plus dependensi berat yang ikut termuat"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for module in modules or IMPORT_MODULES:
+        best, heavy = float('inf'), []
+        for _ in range(repeat):
+            code = _IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES, setup=_IMPORT_SETUP.get(module, ''))
+            proc = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise RuntimeError(f"Import {module} gagal:\n{proc.stderr.strip()}")
+            data = json.loads(proc.stdout.strip().splitlines()[-1])
+            best, heavy = min(best, data['import_s']), data['heavy']
+        results.append({'module': module, 'import_s': best, 'heavy': ", ".join(heavy) or "-"})
+    return results
+
+
+# --- PERBANDINGAN ---
+def compare(old, new, threshold=1.2):
+    """Bandingkan metrik *_s dua file hasil; return list baris (rasio > threshold = regresi)"""
+    rows = []
+    key_fields = ('module', 'asset_type', 'backend', 'tickers', 'years', 'assets')
+    for suite, new_rows in new['results'].items():
+        old_rows = {tuple(r.get(f) for f in key_fields): r for r in old['results'].get(suite, [])}
+        for row in new_rows:
+            key = tuple(row.get(f) for f in key_fields)
+            if key not in old_rows: continue
+            for metric, value in row.items():
+                before = old_rows[key].get(metric)
+                if not metric.endswith('_s') or not isinstance(value, (int, float)) or not before: continue
+                ratio = value / before
+                rows.append({'suite': suite, 'scale': "/".join(str(k) for k in key if k is not None),
+                             'metric': metric, 'old_s': before, 'new_s': value, 'ratio': ratio,
+                             'regression': ratio > threshold})
+    return rows
+
+
+def _print_table(rows):
+    if not rows: return
+    headers = list(dict.fromkeys(h for row in rows for h in row))
+    print("  ".join(f"{h:>18}" for h in headers))
+    for row in rows:
+        cells = [row.get(h, "") for h in headers]
+        print("  ".join(f"{v:>18.4f}" if isinstance(v, float) else f"{str(v):>18}" for v in cells))
+
+
+def main():
+    # cmdstanpy memasang handler INFO sendiri jika logger-nya belum punya handler
+    for name in ('cmdstanpy', 'prophet'):
+        logging.getLogger(name).addHandler(logging.NullHandler())
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--output', help="File JSON hasil (default: data/benchmarks/<waktu>.json untuk run)")
+    parser = argparse.ArgumentParser(description="Benchmark offline Hybrid Market Dashboard")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', parents=[common], help="Benchmark jalur utama pada beberapa skala")
+    run.add_argument('--suites', nargs='+', choices=SUITES, default=SUITES)
+    run.add_argument('--tickers', type=int, nargs='+', default=[10, 100, 1000])
+    run.add_argument('--years', type=float, nargs='+', default=[1, 5])
+    run.add_argument('--seed', type=int, default=0)
+
+    opt = sub.add_parser('optimizer', parents=[common],
+                         help="SLSQP lama vs vektor + gradien analitik, dan efficient frontier")
+    opt.add_argument('--sizes', type=int, nargs='+', default=[4, 20, 50, 100])
+    opt.add_argument('--repeat', type=int, default=3)
+
+    fc = sub.add_parser('forecasters', parents=[common], help="Akurasi & kecepatan backend forecast per tipe aset")
+    fc.add_argument('--backends', nargs='+', choices=list(forecasting.BACKENDS), default=list(forecasting.BACKENDS))
+    fc.add_argument('--source', choices=['synthetic', 'store'], default='synthetic',
+                    help="synthetic = offline; store = histori config.ASSETS dari price store")
+    fc.add_argument('--tickers', type=int, default=5, help="Ticker sintetis per tipe aset")
+    fc.add_argument('--steps', type=int, default=20, help="Jumlah hari uji walk-forward")
+    fc.add_argument('--seed', type=int, default=0)
+
+    imp = sub.add_parser('import-time', parents=[common], help="Waktu import modul (startup dashboard/tool)")
+    imp.add_argument('--modules', nargs='+', default=IMPORT_MODULES)
+    imp.add_argument('--repeat', type=int, default=3)
+
+    cmp_parser = sub.add_parser('compare', help="Bandingkan dua file hasil run")
+    cmp_parser.add_argument('old')
+    cmp_parser.add_argument('new')
+    cmp_parser.add_argument('--threshold', type=float, default=1.2, help="Rasio waktu yang dianggap regresi")
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        with open(args.old) as f: old = json.load(f)
+        with open(args.new) as f: new = json.load(f)
+        rows = compare(old, new, args.threshold)
+        _print_table(rows)
+        sys.exit(1 if any(row['regression'] for row in rows) else 0)
+
+    output = args.output
+    if args.command == 'run':
+        if output is None:
+            os.makedirs(config.BENCHMARK_DIR, exist_ok=True)
+            output = os.path.join(config.BENCHMARK_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}.json")
+        output = os.path.abspath(output)
+        results = run_suites(args.suites, args.tickers, args.years, args.seed)
+        for suite, rows in results.items():
+            print(f"\n== {suite} ==")
+            _print_table(rows)
+    elif args.command == 'forecasters':
+        # Histori "store" dibaca dari data/ asli sebelum pindah ke folder kerja sementara (cache model Prophet)
+        groups = _forecast_groups(args.source, args.tickers, 250 + args.steps, args.seed)
+        with _workspace():
+            results = {'forecasters': bench_forecasters(groups, args.backends, args.steps)}
+        _print_table(results['forecasters'])
+        print(f"\nSaran FORECAST_BACKEND_BY_TYPE (MAPE terkecil): {recommend_backends(results['forecasters'])}")
+    elif args.command == 'import-time':
+        results = {'import_time': bench_import_time(args.modules, args.repeat)}
+        _print_table(results['import_time'])
+    else:
+        results = {'optimizer': bench_optimizer(args.sizes, args.repeat)}
+        _print_table(results['optimizer'])
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'meta': _metadata(), 'results': results}, f, indent=2, default=str)
+        print(f"\nHasil disimpan: {output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import os
+
 # --- KONFIGURASI ASET ---
 ASSETS = {
     'USD': {'ticker': 'USDIDR=X', 'type': 'forex', 'keyword': 'USD IDR currency'},
@@ -15,6 +17,8 @@ BLUE_CHIPS_CANDIDATES = [
     'TLKM.JK', 'ASII.JK', 'ICBP.JK', 'UNVR.JK', 
     'ADRO.JK', 'PTBA.JK', 'GOTO.JK', 'KLBF.JK'
 ]
+PORTFOLIO_TOP_N = 4                   # Jumlah saham terbaik (Sharpe) yang dipilih
+PORTFOLIO_WEIGHT_BOUNDS = (0.05, 0.5) # Bobot min/maks per saham
 
 # --- WARNA VISUALISASI ---
 COLORS = {
@@ -32,3 +36,102 @@ QUESTIONS = [
     "Ada yang portofolionya hijau royo-royo hari ini? 🍀",
     "Pasar lagi volatile, mending wait & see atau hajar kanan? 👊"
 ]
+
+# --- PENYIMPANAN DATA LOKAL ---
+DATA_DIR = "data"
+PRICE_STORE_DIR = f"{DATA_DIR}/prices"
+PRICE_REFRESH_SECONDS = 3600  # Jangan cek Yahoo lagi jika data baru saja diperbarui
+FORECAST_HISTORY_DAYS = 365   # Setara period="1y"
+PORTFOLIO_HISTORY_DAYS = 182  # Setara period="6mo"
+
+# --- SCREENER (Portfolio) ---
+# Daftar seluruh saham IDX (CSV, kolom 'ticker'/'Kode'); tanpa file = BLUE_CHIPS_CANDIDATES
+IDX_UNIVERSE_FILE = f"{DATA_DIR}/idx_universe.csv"
+SCREENER_CHUNK_SIZE = 100    # Ticker per potongan saat memuat harga
+SCREENER_MIN_COVERAGE = 0.8  # Minimal porsi hari bursa yang punya data agar ikut di-screening
+PORTFOLIO_CACHE_DIR = f"{DATA_DIR}/portfolio"  # Bobot optimal per hari bursa (dipakai semua sesi)
+LOT_SIZE = 100               # 1 lot = 100 lembar
+LOT_EXACT_MAX_ASSETS = 16    # Alokasi lot optimal (branch-and-bound) sampai N saham; di atasnya greedy
+
+# --- FORECAST ---
+FORECAST_BACKEND = "prophet"  # "prophet" atau "holt" (NumPy, batch banyak ticker); lihat forecasting.BACKENDS
+# Backend per tipe aset di ASSETS ('forex' / 'stock'), mis. {'forex': 'holt'}. Isi hanya berdasarkan
+# `benchmark.py forecasters --source store` (riwayat harga asli), bukan data sintetis
+FORECAST_BACKEND_BY_TYPE = {}
+HOLT_ALPHAS = (0.2, 0.4, 0.6, 0.8, 1.0)  # Grid smoothing level; dipilih per ticker (SSE 1 langkah terkecil)
+HOLT_BETAS = (0.0, 0.05, 0.1, 0.2)       # Grid smoothing tren
+HOLT_WARMUP = 10                         # Error awal yang diabaikan saat memilih parameter
+HOLT_SEASONAL_PRIOR = 10                 # Penyusut koreksi hari-dalam-minggu (hari dengan sedikit data ~ 0)
+
+# --- CACHE MODEL PROPHET ---
+MODEL_CACHE_DIR = f"{DATA_DIR}/models"
+MODEL_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Total ukuran file model di disk
+MODEL_CACHE_MAX_AGE_DAYS = 7               # Model lebih tua dari ini di-fit ulang dari nol
+WARM_START_MAX_NEW_ROWS = 5                # Maks. hari baru yang masih boleh warm-start
+
+# --- BERITA (RSS) ---
+# {query} diganti keyword yang sudah di-URL-encode; bisa diarahkan ke server lokal untuk tes
+NEWS_RSS_URL = os.environ.get(
+    "NEWS_RSS_URL", "https://news.google.com/rss/search?q={query}+when:2d&hl=en-ID&gl=ID&ceid=ID:en")
+NEWS_CACHE_TTL_SECONDS = 600  # Dalam rentang ini feed tidak diambil ulang sama sekali
+NEWS_MAX_CONCURRENCY = 8
+NEWS_TIMEOUT_SECONDS = 10
+
+# --- SENTIMEN ---
+SENTIMENT_SCORER = "textblob"   # "textblob" atau "lexicon" (lebih cepat, berbasis kamus)
+SENTIMENT_CACHE_SIZE = 20000    # Jumlah judul berita yang skornya disimpan
+SENTIMENT_CACHE_DIR = f"{DATA_DIR}/sentiment"
+NEWS_DISPLAY_LIMIT = 5          # Berita yang ditampilkan; skor dihitung dari semua berita
+
+# --- DASHBOARD ---
+DASHBOARD_FORECAST_TTL_SECONDS = 3600  # Harga + prediksi harian jarang berubah
+DASHBOARD_NEWS_TTL_SECONDS = 600       # Berita cepat basi
+PREFETCH_INTERVAL_SECONDS = 300        # Jeda antar putaran prefetch watchlist (config.ASSETS)
+PREFETCH_START_DELAY_SECONDS = 60      # Putaran pertama di dashboard ditunda (library berat dimuat belakangan)
+
+# --- STREAMING INTRADAY ---
+MARKET_TIMEZONE = "Asia/Jakarta"
+# Sesi perdagangan IDX (jam lokal); Jumat istirahat siang lebih panjang
+IDX_SESSIONS = [("09:00", "12:00"), ("13:30", "15:50")]
+IDX_SESSIONS_FRIDAY = [("09:00", "11:30"), ("14:00", "15:50")]
+STREAM_EVAL_INTERVAL_SECONDS = 180      # Sinyal per ticker dievaluasi ulang paling cepat tiap N detik (waktu tick)
+STREAM_EWMA_SPAN = 20                   # Jumlah tick untuk rata-rata bergerak eksponensial harga & volatilitas
+STREAM_SENTIMENT_REFRESH_SECONDS = 900  # Skor berita diambil ulang tiap N detik
+STREAM_EVENTS_FILE = f"{DATA_DIR}/stream/events.jsonl"  # Event sinyal untuk dibaca dashboard
+
+# --- BACKTEST ---
+BACKTEST_STEPS = 250        # Jumlah hari perdagangan yang diuji ulang (mundur dari hari terakhir)
+BACKTEST_REFIT_EVERY = 5    # Prophet di-fit ulang (warm-start) tiap N hari; holt dihitung ulang tiap hari (satu batch per window)
+BACKTEST_WINDOW_STEPS = 50  # Hari per tugas worker (tiap window mulai dengan cold fit)
+BACKTEST_SENTIMENT = 0.0    # Sentimen konstan jika tidak ada arsip skor
+
+# --- REPORT GAMBAR ---
+REPORT_FILENAME = "market_forecast.jpg"
+REPORT_SIZE_PX = (1080, 1080)  # Ukuran feed Instagram
+REPORT_QUALITY = 85            # Kualitas JPEG/WebP
+REPORT_SLOTS = 4               # Aset per halaman (grid 2x2)
+RENDER_CACHE_DIR = f"{DATA_DIR}/renders"
+
+# --- PIPELINE HARIAN ---
+PIPELINE_RUN_DIR = f"{DATA_DIR}/runs"  # Checkpoint per tahap + laporan waktu, satu folder per tanggal
+REPORT_HISTORY_POINTS = 90             # Jumlah hari historis di grafik report
+
+# --- UPLOAD INSTAGRAM ---
+UPLOAD_CLIENT = os.environ.get("IG_CLIENT", "instagrapi")  # "fake" = tanpa jaringan (uji lokal)
+IG_SESSION_FILE = f"{DATA_DIR}/instagram/session.json"     # Setting client (cookie, device) dipakai ulang antar run
+UPLOAD_OUTBOX_DIR = f"{DATA_DIR}/instagram/outbox"         # Gambar hasil kompres ulang sebelum dikirim
+UPLOAD_PENDING_FILE = f"{DATA_DIR}/instagram/pending.json"  # Postingan yang gagal, dikirim lagi oleh run berikutnya
+UPLOAD_MAX_SIDE_PX = 1080    # Sisi terpanjang gambar yang diunggah (Instagram men-downscale di atas ini)
+UPLOAD_JPEG_QUALITY = 85
+UPLOAD_MAX_CAROUSEL = 10     # Batas gambar per postingan carousel
+UPLOAD_MAX_RETRIES = 3       # Percobaan ulang per postingan
+UPLOAD_BACKOFF_SECONDS = 30  # Jeda awal antar percobaan, dikali 2 tiap kali gagal
+
+# --- INSTRUMENTASI ---
+METRICS_FILE = os.environ.get("METRICS_FILE")  # File JSONL span/counter; None = hanya di memori + log
+METRICS_MAX_SPANS = 2000                       # Span terakhir yang disimpan di memori
+PROFILE_ENABLED = os.environ.get("HMD_PROFILE") == "1"
+PROFILE_DIR = f"{DATA_DIR}/profiles"
+
+# --- BENCHMARK ---
+BENCHMARK_DIR = f"{DATA_DIR}/benchmarks"  # Hasil JSON per run, untuk dibandingkan antar versi
@@ -6,6 +6,12 @@ from datetime import timedelta
 import config
 import market_analysis
 import portfolio_optimizer # Import modul baru
+import instrumentation
+import price_store
+import news_fetcher
+import prefetcher
+import streaming
+import snapshot
 
 # --- KONFIGURASI HALAMAN ---
 st.set_page_config(
@@ -39,15 +45,77 @@ def get_dynamic_css(sentiment_color):
     """
 
 # --- CACHE ---
-@st.cache_data(ttl=3600)
+# Satu snapshot per proses untuk semua sesi: riwayat harga (array read-only), berita, dan sinyal.
+# Dua lapis dengan TTL sendiri: prediksi harian (lama) dan berita (cepat basi).
+# `version` ikut dicek: menaikkan versi satu ticker/keyword = invalidasi hanya entri itu.
+@st.cache_resource
+def get_snapshot():
+    return snapshot.MarketSnapshot()
+
+@st.cache_resource
+def cache_versions():
+    """Nomor versi per ticker/keyword, dipakai bersama semua sesi"""
+    return {}
+
+@st.cache_resource
+def start_prefetcher():
+    """
+    Satu prefetcher per proses server: watchlist config.ASSETS selalu hangat. Putaran pertama ditunda agar
+    Prophet/yfinance/scipy tidak dimuat bersamaan dengan halaman pertama.
+    """
+    return prefetcher.Prefetcher(delay=config.PREFETCH_START_DELAY_SECONDS).start()
+
+def invalidate(ticker, keyword):
+    """Refresh satu aset saja: snapshot + price store + cache RSS untuk ticker/keyword ini"""
+    versions = cache_versions()
+    for key in (ticker, keyword): versions[key] = versions.get(key, 0) + 1
+    price_store.get_store().invalidate(ticker)
+    news_fetcher.invalidate(keyword)
+
 def load_market_data(ticker, keyword):
-    df, current, pred = market_analysis.get_technical_forecast(ticker)
-    if df is None: return None, None, None, None, None, None, None, None, None
-    sent_score, sent_label, news_list = market_analysis.get_news_sentiment(keyword)
-    signal, change, reason = market_analysis.get_hybrid_signal(current, pred, sent_score)
-    return df, current, pred, sent_score, sent_label, news_list, signal, change, reason
+    """(PriceSeries, SignalRecord) dari snapshot bersama; (None, None) jika data harga tidak ada"""
+    snap, versions = get_snapshot(), cache_versions()
+    with instrumentation.profile(f"dashboard_{ticker}"), instrumentation.span('dashboard.load', ticker=ticker):
+        series = snap.get_series(ticker, market_analysis.get_technical_forecast,
+                                 config.DASHBOARD_FORECAST_TTL_SECONDS, versions.get(ticker, 0))
+        if series is None: return None, None
+        news = snap.get_news(keyword, market_analysis.get_news_sentiment,
+                             config.DASHBOARD_NEWS_TTL_SECONDS, versions.get(keyword, 0))
+        return series, snap.get_signal(series, news, market_analysis.get_hybrid_signal)
+
+def show_snapshot_memory():
+    report = get_snapshot().memory_report()
+    st.sidebar.caption(f"🧠 Snapshot: {report['tickers']} ticker, {report['keywords']} keyword, "
+                       f"{report['total_bytes'] / 1024:,.1f} KB (harga {report['array_bytes'] / 1024:,.1f} KB)")
+
+def show_performance_panel(ticker, keyword):
+    """Rincian waktu (span) terakhir untuk ticker yang sedang dibuka"""
+    with st.expander("⏱️ Performance", expanded=True):
+        spans = instrumentation.latest_breakdown(ticker=ticker, keyword=keyword)
+        if not spans:
+            st.caption("Belum ada data waktu (hasil diambil dari snapshot).")
+        else:
+            df_spans = pd.DataFrame([{
+                'Operasi': s['name'], 'Detik': round(s['seconds'], 3),
+                'Waktu': pd.to_datetime(s['ts'], unit='s').strftime('%H:%M:%S'), 'Error': s.get('error', ''),
+            } for s in spans])
+            st.bar_chart(df_spans.set_index('Operasi')['Detik'])
+            st.dataframe(df_spans, use_container_width=True)
+        counters = instrumentation.get_counters()
+        if counters: st.json(counters, expanded=False)
+
+def show_intraday_events(ticker):
+    """Perubahan sinyal intraday terbaru dari streaming.py (jika sedang/pernah dijalankan)"""
+    events = streaming.read_events(ticker=ticker, limit=10)
+    if not events: return
+    st.subheader("⚡ Sinyal Intraday")
+    st.dataframe(pd.DataFrame([{
+        'Waktu': e['ts'][:19].replace('T', ' '), 'Harga': round(e['price'], 2), 'Baseline': round(e['baseline'], 2),
+        'Sinyal': e['signal'], 'Sebelumnya': e['previous'] or '-', 'Alasan': e['reason'],
+    } for e in events]), use_container_width=True, hide_index=True)
 
 # --- MAIN DASHBOARD ---
+start_prefetcher()
 st.title("⚡ Hybrid Market Intelligence")
 st.markdown("### *Technical Data + News Sentiment + Portfolio AI*")
 
@@ -77,16 +145,20 @@ with tab1:
         target_keyword = st.sidebar.text_input("Keyword Berita:", value="GoTo Stock")
         display_name = target_ticker
 
+    show_perf = st.sidebar.checkbox("⏱️ Tampilkan Performance", value=False)
+
     if st.sidebar.button("🔄 Refresh Data", type="primary"):
-        st.cache_data.clear()
+        invalidate(target_ticker, target_keyword)
         st.rerun()
 
     if target_ticker:
         with st.spinner(f"🤖 Menganalisa {display_name}..."):
             try:
-                df, current, pred, sent_score, sent_label, news_list, signal, change, reason = load_market_data(target_ticker, target_keyword)
+                series, record = load_market_data(target_ticker, target_keyword)
                 
-                if df is not None:
+                if series is not None:
+                    current, pred, sent_score, sent_label = record.current, record.pred, record.sent_score, record.sent_label
+                    signal, change, reason, news_list = record.signal, record.change, record.reason, record.news
                     # Logic Warna & CSS (Sama seperti sebelumnya)
                     signal_bg = "rgba(46, 204, 113, 0.2)" if "BUY" in signal else ("rgba(231, 76, 60, 0.2)" if "SELL" in signal else "#333")
                     sent_hex = "#2ecc71" if sent_score > 0.1 else ("#e74c3c" if sent_score < -0.1 else "#95a5a6")
@@ -108,34 +180,40 @@ with tab1:
                     with c3: st.metric("📰 Sentimen", sent_label, delta=f"{sent_score:.2f}")
 
                     st.subheader(f"📈 Momentum: {display_name}")
-                    df_chart = df.tail(180)
+                    ds_chart, y_chart = series.tail(180)  # View array snapshot, tanpa salinan
                     fig = go.Figure()
-                    fig.add_trace(go.Scatter(x=df_chart['ds'], y=df_chart['y'], mode='lines', name='Historis', line=dict(color='#4EA8DE', width=3), fill='tozeroy', fillcolor='rgba(78, 168, 222, 0.2)'))
-                    fig.add_trace(go.Scatter(x=[df_chart['ds'].iloc[-1] + timedelta(days=1)], y=[pred], mode='markers+text', name='Target', marker=dict(color='#FF9F1C', size=18, symbol='diamond'), text=[f"{pred:,.0f}"], textposition="top center"))
+                    fig.add_trace(go.Scatter(x=ds_chart, y=y_chart, mode='lines', name='Historis', line=dict(color='#4EA8DE', width=3), fill='tozeroy', fillcolor='rgba(78, 168, 222, 0.2)'))
+                    fig.add_trace(go.Scatter(x=[pd.Timestamp(ds_chart[-1]) + timedelta(days=1)], y=[pred], mode='markers+text', name='Target', marker=dict(color='#FF9F1C', size=18, symbol='diamond'), text=[f"{pred:,.0f}"], textposition="top center"))
                     fig.update_layout(template="plotly_dark", height=450, hovermode="x unified", plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
                     st.plotly_chart(fig, use_container_width=True)
 
+                    show_intraday_events(target_ticker)
+
                     # News
                     st.subheader("🗞️ Berita Terkait")
                     if news_list:
                         for news in news_list:
-                            st.markdown(f"<div class='news-card'><a href='{news['link']}' target='_blank' class='news-title'>{news['title']}</a><span class='news-date'>{news['published']}</span></div>", unsafe_allow_html=True)
+                            st.markdown(f"<div class='news-card'><a href='{news.link}' target='_blank' class='news-title'>{news.title}</a><span class='news-date'>{news.published}</span></div>", unsafe_allow_html=True)
                     else:
                         st.warning("Tidak ada berita terbaru.")
+
+                    if show_perf: show_performance_panel(target_ticker, target_keyword)
                 else:
                     st.error("Data tidak ditemukan.")
             except Exception as e:
                 st.error(f"Error: {e}")
 
+    show_snapshot_memory()
+
 # =========================================
 # TAB 2: PORTFOLIO GENERATOR (Fitur Baru)
 # =========================================
 with tab2:
-    st.header("💼 Robo-Advisor: Daily Top 4 Portfolio")
-    st.markdown("""
+    st.header(f"💼 Robo-Advisor: Daily Top {config.PORTFOLIO_TOP_N} Portfolio")
+    st.markdown(f"""
     Fitur ini menggunakan algoritma **Modern Portfolio Theory (Optimization)** untuk:
-    1. Memindai saham Blue Chip LQ45.
-    2. Memilih 4 saham dengan kinerja Risk/Reward terbaik saat ini.
+    1. Memindai seluruh saham IDX (atau Blue Chip LQ45 jika daftar saham IDX belum tersedia).
+    2. Memilih {config.PORTFOLIO_TOP_N} saham dengan kinerja Risk/Reward terbaik saat ini.
     3. Menghitung alokasi optimal sesuai dana investasi Anda.
     """)
     st.markdown("---")
@@ -155,6 +233,8 @@ with tab2:
             
             if recs:
                 st.success(f"Optimasi Selesai! Estimasi Pemakaian Dana: Rp {total_est:,.0f} (Sisa uang masuk RDN)")
+                st.caption(f"Bobot optimal hari bursa {portfolio_optimizer.trading_day()} dihitung sekali dan dipakai "
+                           f"semua pengguna; hanya pembagian lot yang dihitung ulang per jumlah dana.")
                 
                 # Visualisasi Donut Chart Alokasi
                 df_recs = pd.DataFrame(recs)
@@ -0,0 +1,207 @@
+"""
+Backend prediksi harga 1 hari ke depan, dipilih lewat config.FORECAST_BACKEND (atau per tipe aset,
+config.FORECAST_BACKEND_BY_TYPE). Library berat (Prophet + Stan) baru di-import saat backend-nya dipakai.
+"""
+import numpy as np
+import pandas as pd
+import config
+import model_cache
+import instrumentation
+
+
+class ProphetBackend:
+    """Prophet dengan cache model per ticker (hit / warm-start / cold fit, lihat model_cache)"""
+    name = "prophet"
+    batched = False  # Satu fit per ticker; forecast_many di market_analysis memakai process pool
+
+    def forecast_many(self, frames):
+        return {ticker: self.forecast(ticker, df) for ticker, df in frames.items()}
+
+    def forecast(self, ticker, df):
+        """Prediksi 1 hari ke depan dari DataFrame ds/y"""
+        cache = model_cache.get_cache()
+        key = model_cache.fingerprint(df)
+        meta = cache.load_meta(ticker)
+
+        # Data tidak berubah sejak fit terakhir: pakai hasil yang tersimpan
+        if meta is not None and meta['fingerprint'] == key:
+            model_cache.record('hit', ticker)
+            return meta['yhat']
+
+        # Hanya beberapa hari baru: lanjutkan dari parameter model sebelumnya
+        init = None
+        if meta is not None:
+            new_rows = int((df['ds'] > pd.Timestamp(meta['last_ds'])).sum())
+            if new_rows <= config.WARM_START_MAX_NEW_ROWS:
+                prev_model = cache.load_model(ticker)
+                if prev_model is not None: init = model_cache.warm_start_params(prev_model)
+
+        from prophet import Prophet
+        fit_type = 'warm_fit' if init is not None else 'cold_fit'
+        m = Prophet(daily_seasonality=True)
+        with instrumentation.span('prophet.fit', ticker=ticker, fit=fit_type):
+            if init is not None: m.fit(df, init=init)
+            else: m.fit(df)
+        model_cache.record(fit_type, ticker)
+        with instrumentation.span('prophet.predict', ticker=ticker):
+            future = m.make_future_dataframe(periods=1)
+            forecast = m.predict(future)
+        predicted_price = float(forecast.iloc[-1]['yhat'])
+
+        cache.save(ticker, m, {
+            'fingerprint': key,
+            'last_ds': str(df['ds'].iloc[-1]),
+            'rows': len(df),
+            'yhat': predicted_price,
+        })
+        return predicted_price
+
+    def walk_forward(self, history, rows, refit_every=1):
+        """
+        Prediksi untuk tiap baris `rows` (hari uji berurutan) dari history ds/y, hanya dari data s/d baris itu.
+        Di-fit ulang (warm-start) tiap `refit_every` baris, tanpa cache disk. Return list yhat sejajar `rows`.
+        """
+        from prophet import Prophet
+        ds = history['ds'].to_numpy()
+        preds = []
+        model = None
+        for block_start in range(0, len(rows), refit_every):
+            block = rows[block_start:block_start + refit_every]
+            train = history.iloc[_lookback_start(ds, block[0]):block[0] + 1]
+            # Cold fit di awal, selanjutnya warm-start dari parameter sebelumnya; backtest hanya butuh yhat
+            init = model_cache.warm_start_params(model) if model is not None else None
+            model = Prophet(daily_seasonality=True, uncertainty_samples=0)
+            if init is not None: model.fit(train, init=init)
+            else: model.fit(train)
+            # Satu predict untuk semua hari di blok ini (prediksi = hari kalender berikutnya, seperti live)
+            future = pd.DataFrame({'ds': ds[block] + np.timedelta64(1, 'D')})
+            preds.extend(float(p) for p in model.predict(future)['yhat'])
+        return preds
+
+
+class HoltBackend:
+    """
+    Holt (level + tren linear) + koreksi hari-dalam-minggu, dihitung dengan NumPy untuk banyak ticker sekaligus.
+    Parameter smoothing dipilih per ticker dari grid HOLT_ALPHAS x HOLT_BETAS (SSE prediksi 1 langkah terkecil),
+    semua kombinasi dijalankan bersamaan dalam satu array (ticker x grid).
+    """
+    name = "holt"
+    batched = True
+
+    def forecast(self, ticker, df):
+        return self.forecast_many({ticker: df})[ticker]
+
+    def forecast_many(self, frames):
+        """dict ticker -> DataFrame ds/y  =>  dict ticker -> yhat (None jika data < 3 baris)"""
+        tickers = [t for t, df in frames.items() if len(df) >= 3]
+        result = {t: None for t in frames}
+        if not tickers: return result
+
+        with instrumentation.span('holt.forecast', tickers=len(tickers)):
+            # Rata kanan: kolom terakhir = hari terakhir tiap ticker, awal yang kosong = NaN
+            length = max(len(frames[t]) for t in tickers)
+            y = np.full((len(tickers), length), np.nan)
+            dow = np.zeros((len(tickers), length), dtype=np.int64)
+            for i, t in enumerate(tickers):
+                df = frames[t]
+                y[i, length - len(df):] = df['y'].to_numpy(dtype=float)
+                dow[i, length - len(df):] = pd.DatetimeIndex(df['ds']).dayofweek
+            yhat = holt_forecast(y, dow)
+        result.update(zip(tickers, yhat.tolist()))
+        return result
+
+    def walk_forward(self, history, rows, refit_every=1):
+        """Seperti ProphetBackend.walk_forward; semua hari uji dihitung dalam satu batch (refit_every tidak dipakai)"""
+        ds = history['ds'].to_numpy()
+        frames = {t: history.iloc[_lookback_start(ds, t):t + 1] for t in rows}
+        preds = self.forecast_many(frames)
+        return [preds[t] for t in rows]
+
+
+def holt_forecast(y, dow, alphas=None, betas=None, warmup=None, seasonal_prior=None):
+    """
+    Prediksi 1 langkah ke depan untuk matriks y (ticker x waktu, NaN di awal = belum ada data).
+    dow: hari-dalam-minggu (0-6) tiap titik. Return array yhat per ticker.
+    """
+    alphas = np.asarray(alphas or config.HOLT_ALPHAS, dtype=float)
+    betas = np.asarray(betas or config.HOLT_BETAS, dtype=float)
+    warmup = config.HOLT_WARMUP if warmup is None else warmup
+    seasonal_prior = config.HOLT_SEASONAL_PRIOR if seasonal_prior is None else seasonal_prior
+
+    # Semua kombinasi (alpha, beta) sebagai sumbu kedua: state berbentuk (ticker, grid)
+    alpha, beta = [g.ravel()[None, :] for g in np.meshgrid(alphas, betas, indexing='ij')]
+    n, length = y.shape
+    valid = ~np.isnan(y)
+    first = valid.argmax(axis=1)
+    level = np.repeat(y[np.arange(n), first][:, None], alpha.shape[1], axis=1)
+    trend = np.zeros_like(level)
+    sse = np.zeros_like(level)
+    dow_error = np.zeros(level.shape + (7,))  # Jumlah error 1 langkah per hari-dalam-minggu
+    dow_count = np.zeros((n, 7))
+    weekdays = np.eye(7)
+
+    for t in range(length):
+        started = (t > first)[:, None]
+        counted = (t >= first + warmup)[:, None]
+        error = y[:, t:t + 1] - (level + trend)
+        update = started & valid[:, t:t + 1]
+        error = np.where(update, error, 0.0)
+        sse += np.where(counted, error ** 2, 0.0)
+        onehot = weekdays[dow[:, t]] * (counted & update)
+        dow_error += error[:, :, None] * onehot[:, None, :]
+        dow_count += onehot
+        # Bentuk koreksi error Holt: level += tren + alpha*e, tren += alpha*beta*e
+        level = np.where(update, level + trend + alpha * error, level)
+        trend = np.where(update, trend + alpha * beta * error, trend)
+
+    best = sse.argmin(axis=1)
+    rows = np.arange(n)
+    base = level[rows, best] + trend[rows, best]
+    seasonal = dow_error[rows, best] / (dow_count + seasonal_prior)
+
+    # Hari berikutnya = hari-dalam-minggu berikut yang pernah muncul di data (akhir pekan dilewati untuk saham)
+    last_dow = dow[:, -1]
+    next_dow = (last_dow + 1) % 7
+    for step in range(1, 8):
+        candidate = (last_dow + step) % 7
+        unresolved = dow_count[rows, next_dow] == 0
+        next_dow = np.where(unresolved & (dow_count[rows, candidate] > 0), candidate, next_dow)
+    return base + seasonal[rows, next_dow]
+
+
+def _lookback_start(ds, t):
+    """Baris pertama jendela latih untuk "hari ini" = baris t (FORECAST_HISTORY_DAYS ke belakang, seperti live)"""
+    return int(np.searchsorted(ds, ds[t] - np.timedelta64(config.FORECAST_HISTORY_DAYS, 'D'), side='right'))
+
+
+BACKENDS = {'holt': HoltBackend, 'prophet': ProphetBackend}
+
+_backends = {}
+
+def get_backend(name=None):
+    """Instance backend (satu per nama per proses); default config.FORECAST_BACKEND"""
+    name = name or config.FORECAST_BACKEND
+    if name not in BACKENDS: raise ValueError(f"Backend forecast tidak dikenal: {name}")
+    if name not in _backends: _backends[name] = BACKENDS[name]()
+    return _backends[name]
+
+def asset_type(ticker):
+    """'forex' / 'stock' dari config.ASSETS; ticker lain ditebak dari akhiran Yahoo (=X = forex)"""
+    for info in config.ASSETS.values():
+        if info['ticker'] == ticker: return info['type']
+    return 'forex' if ticker.endswith("=X") else 'stock'
+
+def backend_for(ticker):
+    return config.FORECAST_BACKEND_BY_TYPE.get(asset_type(ticker), config.FORECAST_BACKEND)
+
+def forecast(ticker, df, backend=None):
+    return get_backend(backend or backend_for(ticker)).forecast(ticker, df)
+
+def forecast_many(frames, backend=None):
+    """dict ticker -> DataFrame ds/y  =>  dict ticker -> yhat; ticker dikelompokkan per backend (batch)"""
+    groups = {}
+    for ticker in frames: groups.setdefault(backend or backend_for(ticker), []).append(ticker)
+    result = {}
+    for name, tickers in groups.items():
+        result.update(get_backend(name).forecast_many({t: frames[t] for t in tickers}))
+    return result
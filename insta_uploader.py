@@ -1,32 +1,223 @@
+"""
+Upload report ke Instagram: sesi login dipakai ulang antar run, gambar dikompres ulang,
+beberapa gambar digabung jadi satu carousel, dan postingan yang gagal dicoba ulang dengan backoff.
+Client bisa ditukar (IG_CLIENT=fake untuk uji lokal tanpa jaringan).
+"""
 import os
-from instagrapi import Client
+import json
+import time
+import shutil
+import hashlib
+import config
+import instrumentation
 
-def upload_image(image_path, caption):
-    print("--- UPLOAD INSTAGRAM ---")
-    username = os.environ.get("IG_USERNAME")
-    password = os.environ.get("IG_PASSWORD")
-    session_id = os.environ.get("IG_SESSION_ID")
-    
-    cl = Client()
-    cl.delay_range = [1, 3]
-
-    try:
-        if session_id:
-            print("Login via Session ID...")
-            cl.login_by_sessionid(session_id)
-        else:
-            print("Login via User/Pass...")
-            cl.login(username, password)
-        
+
+# --- CLIENT (bisa ditukar) ---
+class InstagrapiClient:
+    """instagrapi dengan setting sesi yang disimpan di IG_SESSION_FILE (tidak login ulang tiap upload)"""
+    name = "instagrapi"
+
+    def __init__(self, session_file=config.IG_SESSION_FILE):
+        self.session_file = session_file
+        self._client = None
+
+    def _login(self):
+        from instagrapi import Client
+        cl = Client()
+        cl.delay_range = [1, 3]
+        username = os.environ.get("IG_USERNAME")
+        password = os.environ.get("IG_PASSWORD")
+        session_id = os.environ.get("IG_SESSION_ID")
+
+        with instrumentation.span('instagram.login'):
+            if os.path.exists(self.session_file):
+                # Cookie & device lama dipakai lagi: Instagram tidak melihatnya sebagai login baru
+                print("Login via sesi tersimpan...")
+                cl.load_settings(self.session_file)
+                # Dengan user/pass: sesi lama divalidasi, login penuh hanya jika ditolak
+                if username and password: cl.login(username, password)
+            elif session_id:
+                print("Login via Session ID...")
+                cl.login_by_sessionid(session_id)
+            else:
+                print("Login via User/Pass...")
+                cl.login(username, password)
+
+        os.makedirs(os.path.dirname(self.session_file) or ".", exist_ok=True)
+        cl.dump_settings(self.session_file)
+        return cl
+
+    def _call(self, method, *args, **kwargs):
+        from instagrapi.exceptions import LoginRequired
+        if self._client is None: self._client = self._login()
         try:
-            cl.account_info()
-            print("✅ Login Valid.")
-        except Exception as e:
-            print(f"❌ Session Invalid: {e}")
-            raise e
-
-        cl.photo_upload(path=image_path, caption=caption)
-        print("🎉 Upload Berhasil!")
-        
-    except Exception as e:
-        print(f"!! Gagal Upload: {e}")
+            return getattr(self._client, method)(*args, **kwargs)
+        except LoginRequired:
+            # Sesi kadaluarsa: buang setting lama agar percobaan berikutnya login dari nol
+            instrumentation.count('instagram.session_expired')
+            self.reset()
+            raise
+
+    def reset(self):
+        self._client = None
+        if os.path.exists(self.session_file): os.remove(self.session_file)
+
+    def upload_photo(self, path, caption):
+        return str(self._call('photo_upload', path=path, caption=caption).pk)
+
+    def upload_album(self, paths, caption):
+        return str(self._call('album_upload', paths=paths, caption=caption).pk)
+
+
+class FakeClient:
+    """Client lokal untuk uji: mencatat upload, bisa disetel gagal `fail_times` kali"""
+    name = "fake"
+
+    def __init__(self, fail_times=0):
+        self.fail_times = fail_times
+        self.uploads = []
+
+    def _upload(self, kind, paths, caption):
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise ConnectionError("Gagal upload (simulasi)")
+        for path in paths:
+            if not os.path.exists(path): raise FileNotFoundError(path)
+        media_id = f"fake_{len(self.uploads) + 1}"
+        self.uploads.append({'kind': kind, 'paths': list(paths), 'caption': caption, 'media_id': media_id})
+        return media_id
+
+    def upload_photo(self, path, caption):
+        return self._upload('photo', [path], caption)
+
+    def upload_album(self, paths, caption):
+        return self._upload('album', paths, caption)
+
+
+CLIENTS = {'instagrapi': InstagrapiClient, 'fake': FakeClient}
+
+_client = None
+
+def get_client():
+    """Client default sesuai config.UPLOAD_CLIENT; satu per proses agar sesi dipakai ulang"""
+    global _client
+    if _client is None: _client = CLIENTS[config.UPLOAD_CLIENT]()
+    return _client
+
+def set_client(client):
+    global _client
+    _client = client
+
+
+# --- KOMPRES GAMBAR ---
+def prepare_image(path, out_dir=config.UPLOAD_OUTBOX_DIR, max_side=config.UPLOAD_MAX_SIDE_PX,
+                  quality=config.UPLOAD_JPEG_QUALITY):
+    """
+    JPEG progresif dengan sisi terpanjang <= max_side. Nama file dari hash isi + setting,
+    jadi gambar yang sama tidak dikompres dua kali. JPEG yang sudah kecil dipakai apa adanya.
+    """
+    from PIL import Image
+    with open(path, 'rb') as f: digest = hashlib.sha1(f.read()).hexdigest()[:16]
+    target = os.path.join(out_dir, f"{digest}_{max_side}_{quality}.jpg")
+    if os.path.exists(target): return target
+
+    os.makedirs(out_dir, exist_ok=True)
+    with Image.open(path) as img:
+        if img.format == 'JPEG' and max(img.size) <= max_side and img.mode == 'RGB':
+            shutil.copyfile(path, target)
+            return target
+        img = img.convert('RGB')
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        img.save(tmp_path, format='JPEG', quality=quality, optimize=True, progressive=True)
+    os.replace(tmp_path, target)
+    return target
+
+
+# --- ANTRIAN UPLOAD ---
+class UploadQueue:
+    """
+    Antrian postingan. add() dengan beberapa gambar -> carousel (dipecah per UPLOAD_MAX_CAROUSEL).
+    run() mengirim semua postingan; yang gagal dicoba ulang dengan backoff eksponensial,
+    yang tetap gagal dikembalikan ke antrian. Dengan pending_file antrian disimpan ke disk (JSON),
+    jadi postingan yang gagal ikut dikirim oleh run berikutnya.
+    """
+
+    def __init__(self, client=None, max_retries=None, backoff=None, compress=True, sleep=time.sleep,
+                 pending_file=None):
+        self.client = client if client is not None else get_client()
+        self.max_retries = config.UPLOAD_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = config.UPLOAD_BACKOFF_SECONDS if backoff is None else backoff
+        self.compress = compress
+        self.sleep = sleep
+        self.pending_file = pending_file
+        self.pending = self._load()
+
+    def _load(self):
+        """Postingan tersimpan dari run sebelumnya; yang gambarnya sudah tidak ada dibuang"""
+        if not self.pending_file or not os.path.exists(self.pending_file): return []
+        try:
+            with open(self.pending_file) as f: posts = json.load(f)
+        except (OSError, ValueError) as e:
+            instrumentation.error('instagram.pending_load', e)
+            return []
+        return [post for post in posts if all(os.path.exists(p) for p in post['paths'])]
+
+    def _save(self, posts):
+        if not self.pending_file: return
+        os.makedirs(os.path.dirname(self.pending_file) or ".", exist_ok=True)
+        tmp_path = f"{self.pending_file}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f: json.dump(posts, f)
+        os.replace(tmp_path, self.pending_file)
+
+    def add(self, paths, caption):
+        if isinstance(paths, (str, os.PathLike)): paths = [paths]
+        paths = [os.path.abspath(p) for p in paths]
+        size = config.UPLOAD_MAX_CAROUSEL
+        for i in range(0, len(paths), size):
+            post = {'paths': paths[i:i + size], 'caption': caption}
+            # Gambar yang sama sudah menunggu (mis. tahap upload diulang): ganti, jangan diposting dua kali
+            self.pending = [p for p in self.pending if p['paths'] != post['paths']] + [post]
+        self._save(self.pending)
+        return self
+
+    def _send(self, post):
+        paths = [prepare_image(p) for p in post['paths']] if self.compress else post['paths']
+        if len(paths) == 1: return self.client.upload_photo(paths[0], post['caption'])
+        return self.client.upload_album(paths, post['caption'])
+
+    def run(self):
+        """Kirim semua postingan; return list hasil {'paths', 'status', 'media_id', 'attempts', 'error'}"""
+        posts, self.pending = self.pending, []
+        results = []
+        for i, post in enumerate(posts):
+            result = {'paths': post['paths'], 'status': 'failed', 'media_id': None, 'attempts': 0, 'error': None}
+            for attempt in range(1, self.max_retries + 1):
+                result['attempts'] = attempt
+                try:
+                    with instrumentation.span('instagram.upload', images=len(post['paths']), attempt=attempt):
+                        result['media_id'] = self._send(post)
+                    result['status'], result['error'] = 'ok', None
+                    print(f"🎉 Upload Berhasil! ({len(post['paths'])} gambar, media {result['media_id']})")
+                    break
+                except Exception as e:
+                    result['error'] = repr(e)
+                    instrumentation.error('instagram.upload', e, attempt=attempt)
+                    print(f"!! Gagal Upload (percobaan {attempt}/{self.max_retries}): {e}")
+                    if attempt < self.max_retries: self.sleep(self.backoff * 2 ** (attempt - 1))
+            if result['status'] != 'ok': self.pending.append(post)
+            self._save(self.pending + posts[i + 1:])
+            results.append(result)
+        return results
+
+
+def upload_images(image_paths, caption, client=None):
+    """Unggah beberapa gambar sebagai carousel; raise jika ada postingan yang tetap gagal"""
+    print("--- UPLOAD INSTAGRAM ---")
+    results = UploadQueue(client, pending_file=config.UPLOAD_PENDING_FILE).add(image_paths, caption).run()
+    failed = [r for r in results if r['status'] != 'ok']
+    if failed: raise RuntimeError(f"Upload gagal: {failed[0]['error']}")
+    return [r['media_id'] for r in results]
+
+def upload_image(image_path, caption, client=None):
+    return upload_images([image_path], caption, client)[0]
@@ -0,0 +1,96 @@
+import os
+import json
+import time
+import logging
+import cProfile
+import threading
+from contextlib import contextmanager
+from collections import deque, defaultdict
+import config
+
+logger = logging.getLogger("hybrid_market")
+
+_spans = deque(maxlen=config.METRICS_MAX_SPANS)
+_counters = defaultdict(int)
+_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    # Worker ProcessPool di-fork dari thread pipeline/dashboard: lock bisa sedang dipegang thread lain
+    # yang tidak ikut ke proses anak, jadi buat lock baru supaya anak tidak deadlock
+    global _lock
+    _lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _emit(record):
+    """Kirim record ke log terstruktur (JSON) dan, jika di-set, ke config.METRICS_FILE"""
+    line = json.dumps(record, default=str)
+    logger.debug(line)
+    if config.METRICS_FILE:
+        with _lock:
+            with open(config.METRICS_FILE, 'a') as f: f.write(line + "\n")
+
+
+@contextmanager
+def span(name, **tags):
+    """Ukur durasi satu operasi, mis. `with span('prophet.fit', ticker=ticker):`"""
+    start = time.perf_counter()
+    record = {'type': 'span', 'name': name, 'ts': time.time(), 'pid': os.getpid(), **tags}
+    try:
+        yield record
+    except Exception as e:
+        record['error'] = repr(e)
+        raise
+    finally:
+        record['seconds'] = time.perf_counter() - start
+        with _lock: _spans.append(record)
+        _emit(record)
+
+def count(name, value=1, **tags):
+    with _lock: _counters[name] += value
+    _emit({'type': 'counter', 'name': name, 'value': value, 'ts': time.time(), **tags})
+
+def error(name, exc, **tags):
+    """Error yang ditangkap (tidak di-raise ulang): dihitung dan di-log lengkap dengan traceback"""
+    count(f"{name}.error", **tags)
+    logger.error("%s gagal %s: %r", name, tags or "", exc, exc_info=exc)
+
+
+def get_spans(ticker=None, keyword=None, limit=None):
+    """Span terbaru dulu; filter opsional berdasarkan tag ticker/keyword"""
+    with _lock: spans = list(_spans)
+    if ticker is not None or keyword is not None:
+        spans = [s for s in spans if (ticker is not None and s.get('ticker') == ticker)
+                 or (keyword is not None and s.get('keyword') == keyword)]
+    spans.reverse()
+    return spans[:limit] if limit else spans
+
+def latest_breakdown(ticker=None, keyword=None):
+    """Span terakhir per nama operasi (untuk panel Performance)"""
+    latest = {}
+    for s in get_spans(ticker, keyword):
+        latest.setdefault(s['name'], s)
+    return sorted(latest.values(), key=lambda s: s['ts'])
+
+def get_counters():
+    with _lock: return dict(_counters)
+
+
+@contextmanager
+def profile(name, enabled=None):
+    """cProfile opsional (config.PROFILE_ENABLED / HMD_PROFILE=1); hasil ke PROFILE_DIR/<name>_<waktu>.prof"""
+    if not (config.PROFILE_ENABLED if enabled is None else enabled):
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        os.makedirs(config.PROFILE_DIR, exist_ok=True)
+        path = os.path.join(config.PROFILE_DIR, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}.prof")
+        profiler.dump_stats(path)
+        logger.info("Profil disimpan: %s", path)
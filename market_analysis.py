@@ -1,77 +1,103 @@
-import yfinance as yf
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
-from prophet import Prophet
-import feedparser
-from textblob import TextBlob
+import config
+import price_store
+import model_cache
+import forecasting
+import news_fetcher
+import sentiment
+import instrumentation
 
-def get_technical_forecast(ticker):
-    """Mengambil data historis dan melakukan prediksi Prophet"""
+def get_technical_forecast(ticker, backend=None, before=None):
+    """
+    Mengambil data historis dan melakukan prediksi (backend: forecasting.backend_for(ticker) jika kosong).
+    before (tanggal, opsional): hanya bar harian sebelum tanggal ini yang dipakai (mis. buang bar parsial hari ini).
+    """
     try:
-        df = yf.download(ticker, period="1y", interval="1d", progress=False)
-        if df.empty: return None, None, None
+        # Data dari store lokal; hanya hari yang belum tersimpan yang diunduh
+        with instrumentation.span('price.load', ticker=ticker):
+            hist = price_store.get_history(ticker, config.FORECAST_HISTORY_DAYS)
+        if before is not None: hist = hist[hist.index < pd.Timestamp(before)]
+        if hist.empty: return None, None, None
         
-        df.reset_index(inplace=True)
-        if 'Date' in df.columns: df['ds'] = df['Date']
-        else: df['ds'] = df.index
-        
-        if isinstance(df.columns, pd.MultiIndex):
-            try: df['y'] = df[('Close', ticker)]
-            except KeyError: df['y'] = df['Close']
-        else: df['y'] = df['Close']
-        
-        df = df[['ds', 'y']].dropna()
-        
-        m = Prophet(daily_seasonality=True)
-        m.fit(df)
-        future = m.make_future_dataframe(periods=1)
-        forecast = m.predict(future)
+        df = pd.DataFrame({'ds': hist.index, 'y': hist['Close'].values}).dropna()
         
         current_price = float(df.iloc[-1]['y'])
-        predicted_price = forecast.iloc[-1]['yhat']
+        predicted_price = forecasting.forecast(ticker, df, backend)
+        # Backend menolak data (mis. holt: < 3 baris): dianggap gagal, jangan sampai di-cache
+        if predicted_price is None: return None, None, None
         
         return df, current_price, predicted_price
         
     except Exception as e:
-        print(f"Error Technical {ticker}: {e}")
+        instrumentation.error('technical_forecast', e, ticker=ticker)
         return None, None, None
 
+def get_technical_forecast_many(tickers, backend=None):
+    """
+    Versi batch: harga semua ticker diambil sekaligus, lalu diprediksi per backend dalam satu panggilan
+    (backend "holt" = satu operasi array untuk semua ticker). Return dict ticker -> (df, current, pred).
+    """
+    results = {ticker: (None, None, None) for ticker in tickers}
+    try:
+        with instrumentation.span('price.load', tickers=len(tickers)):
+            hists = price_store.get_store().update_many(list(tickers), config.FORECAST_HISTORY_DAYS)
+        start = pd.Timestamp.today().normalize() - pd.Timedelta(days=config.FORECAST_HISTORY_DAYS)
+        frames = {}
+        for ticker in tickers:
+            hist = hists[ticker]
+            hist = hist[hist.index >= start]
+            if not hist.empty: frames[ticker] = pd.DataFrame({'ds': hist.index, 'y': hist['Close'].values}).dropna()
+        preds = forecasting.forecast_many(frames, backend)
+        for ticker, df in frames.items():
+            if preds.get(ticker) is not None: results[ticker] = (df, float(df.iloc[-1]['y']), preds[ticker])
+    except Exception as e:
+        instrumentation.error('technical_forecast', e, tickers=len(tickers))
+    return results
+
 def get_news_sentiment(keyword):
     """Membaca berita, menghitung sentimen, DAN mengembalikan daftar berita"""
     try:
-        query = keyword.replace(" ", "%20")
-        rss_url = f"https://news.google.com/rss/search?q={query}+when:2d&hl=en-ID&gl=ID&ceid=ID:en"
-        feed = feedparser.parse(rss_url)
-        
-        news_list = [] # List untuk menyimpan detail berita
-        
-        if not feed.entries: return 0, "No News", []
-
-        polarities = []
-        for entry in feed.entries[:5]:
-            analysis = TextBlob(entry.title)
-            polarities.append(analysis.sentiment.polarity)
-            
-            # Simpan detail berita untuk Dashboard
-            news_list.append({
-                'title': entry.title,
-                'link': entry.link,
-                'published': entry.published
-            })
-        
-        if not polarities: return 0, "Neutral", []
-
-        avg = sum(polarities) / len(polarities)
-        
-        if avg > 0.1: label = "Positif 🟢"
-        elif avg < -0.1: label = "Negatif 🔴"
-        else: label = "Netral ⚪"
-        
-        return avg, label, news_list # Return 3 values sekarang
-        
+        return _score_entries(news_fetcher.get_entries(keyword))
     except Exception as e:
-        print(f"Error News: {e}")
+        instrumentation.error('news_sentiment', e, keyword=keyword)
         return 0, "Error", []
 
+def get_news_sentiment_many(keywords):
+    """Sentimen banyak keyword; feed diambil bersamaan. Return dict keyword -> (score, label, news_list)"""
+    feeds = news_fetcher.fetch_many(keywords)
+    results = {}
+    for keyword in keywords:
+        if keyword not in feeds:
+            results[keyword] = (0, "Error", [])
+            continue
+        try:
+            results[keyword] = _score_entries(feeds[keyword])
+        except Exception as e:
+            instrumentation.error('news_sentiment', e, keyword=keyword)
+            results[keyword] = (0, "Error", [])
+    return results
+
+def _score_entries(entries):
+    if not entries: return 0, "No News", []
+
+    # Semua berita ikut dihitung; judul yang sama cukup dihitung sekali (skor di-cache)
+    titles = list({sentiment.text_key(entry['title']): entry['title'] for entry in entries}.values())
+    polarities = sentiment.get_engine().score(titles)
+    
+    # List untuk menyimpan detail berita (untuk Dashboard)
+    news_list = entries[:config.NEWS_DISPLAY_LIMIT]
+
+    avg = sum(polarities) / len(polarities)
+    
+    if avg > 0.1: label = "Positif 🟢"
+    elif avg < -0.1: label = "Negatif 🔴"
+    else: label = "Netral ⚪"
+    
+    return avg, label, news_list # Return 3 values sekarang
+
 def get_hybrid_signal(current, pred, sentiment_score):
     diff_percent = (pred - current) / current
     
@@ -108,3 +134,102 @@ def get_hybrid_signal(current, pred, sentiment_score):
             reason = "High Volatility News"
             
     return final_call, f"{diff_percent*100:.2f}%", reason
+
+
+# --- BATCH (SEMUA ASET SEKALIGUS) ---
+def _analyse_one(ticker, keyword):
+    """Forecast + sentimen + sinyal untuk satu ticker (dijalankan di worker proses)"""
+    result = {
+        'ticker': ticker, 'keyword': keyword, 'ok': False, 'error': None, 'fit': None,
+        'df': None, 'current': None, 'pred': None,
+        'sent_score': 0, 'sent_label': "No News", 'news': [],
+        'signal': None, 'change': None, 'reason': None, 'seconds': None,
+    }
+    start = time.perf_counter()
+    stats_before = model_cache.get_stats()
+    try:
+        df, current, pred = get_technical_forecast(ticker)
+        if df is None:
+            result['error'] = "Data tidak ditemukan"
+            return result
+        
+        if keyword:
+            result['sent_score'], result['sent_label'], result['news'] = get_news_sentiment(keyword)
+        signal, change, reason = get_hybrid_signal(current, pred, result['sent_score'])
+        result.update(df=df, current=current, pred=pred, signal=signal, change=change, reason=reason, ok=True)
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        # Catat jenis fit (hit / warm_fit / cold_fit) yang terjadi untuk ticker ini
+        stats_after = model_cache.get_stats()
+        for event, count in stats_after.items():
+            if count > stats_before[event]: result['fit'] = event
+        result['seconds'] = time.perf_counter() - start
+    return result
+
+def _analyse_batch(tickers):
+    """Seperti _analyse_one tanpa sentimen, untuk banyak ticker dengan backend batch"""
+    start = time.perf_counter()
+    forecasts = get_technical_forecast_many(tickers)
+    seconds = (time.perf_counter() - start) / len(tickers)
+    results = {}
+    for ticker in tickers:
+        df, current, pred = forecasts[ticker]
+        result = {
+            'ticker': ticker, 'keyword': None, 'ok': df is not None,
+            'error': None if df is not None else "Data tidak ditemukan",
+            'fit': forecasting.backend_for(ticker), 'df': df, 'current': current, 'pred': pred,
+            'sent_score': 0, 'sent_label': "No News", 'news': [],
+            'signal': None, 'change': None, 'reason': None, 'seconds': seconds,
+        }
+        if df is not None:
+            result['signal'], result['change'], result['reason'] = get_hybrid_signal(current, pred, 0)
+        results[ticker] = result
+    return results
+
+def forecast_many(tickers=None, keywords=None, max_workers=None):
+    """
+    Analisa banyak ticker secara paralel (default: semua config.ASSETS, satu worker per core).
+    Return dict ticker -> hasil (lihat _analyse_one); ticker yang gagal punya ok=False dan error.
+    """
+    keyword_map = {asset['ticker']: asset['keyword'] for asset in config.ASSETS.values()}
+    if keywords: keyword_map.update(keywords)
+    if tickers is None: tickers = list(keyword_map)
+    if not tickers: return {}
+    
+    # Backend batch (mis. holt) dihitung sekaligus di proses ini; sisanya (Prophet) per ticker di worker
+    batched = [t for t in tickers if forecasting.get_backend(forecasting.backend_for(t)).batched]
+    pooled = [t for t in tickers if t not in batched]
+    workers = min(max_workers or os.cpu_count() or 1, max(len(pooled), 1))
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Worker hanya mengerjakan bagian berat (harga + Prophet)
+        futures = {pool.submit(_analyse_one, ticker, None): ticker for ticker in pooled}
+        
+        if batched: results.update(_analyse_batch(batched))
+
+        # Sambil menunggu, ambil semua feed berita sekaligus di proses utama
+        keywords = [keyword_map[t] for t in tickers if keyword_map.get(t)]
+        sentiments = get_news_sentiment_many(keywords) if keywords else {}
+        
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                results[ticker] = future.result()
+            except Exception as e:
+                # Worker mati (mis. kehabisan memori); ticker lain tetap diproses
+                results[ticker] = {'ticker': ticker, 'ok': False, 'error': f"Worker error: {e}"}
+    
+    for ticker, res in results.items():
+        keyword = keyword_map.get(ticker)
+        res['keyword'] = keyword
+        if not res['ok'] or keyword not in sentiments: continue
+        res['sent_score'], res['sent_label'], res['news'] = sentiments[keyword]
+        res['signal'], res['change'], res['reason'] = get_hybrid_signal(res['current'], res['pred'], res['sent_score'])
+    
+    return {ticker: results[ticker] for ticker in tickers}
+
+if __name__ == "__main__":
+    for ticker, res in forecast_many().items():
+        if res['ok']: print(f"{ticker:<10} {res['signal']:<16} {res['change']:>8}  {res['reason']} [{res['fit']}]")
+        else: print(f"{ticker:<10} GAGAL: {res['error']}")
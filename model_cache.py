@@ -0,0 +1,119 @@
+import os
+import re
+import json
+import time
+import hashlib
+import numpy as np
+import config
+import instrumentation
+
+# Statistik per proses: berapa kali model dipakai ulang, di-warm-start, atau di-fit dari nol
+_stats = {'hit': 0, 'warm_fit': 0, 'cold_fit': 0}
+
+
+def record(event, ticker=None):
+    _stats[event] += 1
+    instrumentation.count(f"model_cache.{event}", ticker=ticker)
+
+def get_stats():
+    return dict(_stats)
+
+def reset_stats():
+    for key in _stats: _stats[key] = 0
+
+
+def fingerprint(df):
+    """Hash isi data historis (ds, y); berubah jika ada bar baru atau revisi harga"""
+    h = hashlib.sha1()
+    h.update(df['ds'].values.astype('datetime64[ns]').view('int64').tobytes())
+    h.update(df['y'].values.astype('float64').tobytes())
+    return h.hexdigest()
+
+
+def warm_start_params(model):
+    """Parameter hasil fit sebelumnya, dipakai sebagai `init` untuk Prophet.fit"""
+    res = {}
+    for pname in ['k', 'm', 'sigma_obs']:
+        if model.mcmc_samples == 0: res[pname] = model.params[pname][0][0]
+        else: res[pname] = np.mean(model.params[pname])
+    for pname in ['delta', 'beta']:
+        if model.mcmc_samples == 0: res[pname] = model.params[pname][0]
+        else: res[pname] = np.mean(model.params[pname], axis=0)
+    return res
+
+
+class ModelCache:
+    """
+    Cache model Prophet di disk: <ticker>.json (model) + <ticker>.meta.json (fingerprint, yhat, dll).
+    File per ticker agar aman dipakai beberapa proses sekaligus.
+    """
+
+    def __init__(self, root=config.MODEL_CACHE_DIR, max_bytes=config.MODEL_CACHE_MAX_BYTES,
+                 max_age_days=config.MODEL_CACHE_MAX_AGE_DAYS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400
+        os.makedirs(root, exist_ok=True)
+
+    def _base(self, ticker):
+        return os.path.join(self.root, re.sub(r'[^A-Za-z0-9._=^-]', '_', ticker))
+
+    def load_meta(self, ticker):
+        path = self._base(ticker) + ".meta.json"
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds: return None
+            with open(path) as f: return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_model(self, ticker):
+        from prophet.serialize import model_from_json
+        try:
+            with open(self._base(ticker) + ".json") as f: return model_from_json(f.read())
+        except Exception as e:
+            instrumentation.error('model_cache.load', e, ticker=ticker)
+            return None
+
+    def save(self, ticker, model, meta):
+        from prophet.serialize import model_to_json
+        base = self._base(ticker)
+        # Model dulu, baru meta: meta yang ada selalu menunjuk ke model yang lengkap
+        for path, content in [(base + ".json", model_to_json(model)), (base + ".meta.json", json.dumps(meta))]:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f: f.write(content)
+            os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Hapus model kadaluarsa, lalu model paling lama sampai total ukuran di bawah batas"""
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.root):
+            if not name.endswith(".meta.json"): continue
+            base = os.path.join(self.root, name[:-len(".meta.json")])
+            try:
+                mtime = os.path.getmtime(base + ".meta.json")
+                size = os.path.getsize(base + ".json") + os.path.getsize(base + ".meta.json")
+            except OSError:
+                continue
+            entries.append((mtime, size, base))
+
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, base in sorted(entries):
+            if now - mtime <= self.max_age_seconds and total <= self.max_bytes: break
+            for path in (base + ".meta.json", base + ".json"):
+                try: os.remove(path)
+                except OSError: pass
+            total -= size
+
+
+_cache = None
+
+def get_cache():
+    global _cache
+    if _cache is None: _cache = ModelCache()
+    return _cache
+
+def set_cache(cache):
+    global _cache
+    _cache = cache
@@ -0,0 +1,154 @@
+import os
+import time
+import asyncio
+import threading
+from urllib.parse import quote
+import config
+import instrumentation
+
+# Cache per URL feed: {'entries', 'etag', 'last_modified', 'fetched_at'}; diakses dari banyak thread
+# (sesi dashboard, prefetcher, thread event loop) jadi selalu lewat _cache_lock
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def feed_url(keyword, url_template=None):
+    return (url_template or config.NEWS_RSS_URL).format(query=quote(keyword))
+
+def clear_cache():
+    with _cache_lock: _cache.clear()
+
+def invalidate(keyword, url_template=None):
+    """Anggap feed satu keyword kadaluarsa; pengambilan berikutnya tetap memakai conditional GET"""
+    with _cache_lock:
+        cached = _cache.get(feed_url(keyword, url_template))
+        if cached: cached['fetched_at'] = 0
+
+
+def _entry_dict(entry):
+    """Entry feedparser -> dict biasa (bisa di-cache dan di-pickle)"""
+    return {
+        'title': entry.get('title', ''),
+        'link': entry.get('link', ''),
+        'published': entry.get('published', ''),
+    }
+
+
+async def _fetch_one(client, semaphore, keyword, url, ttl, timeout):
+    with _cache_lock:
+        cached = _cache.get(url)
+        if cached and time.time() - cached['fetched_at'] < ttl:
+            instrumentation.count('rss.cache_hit')
+            return cached['entries']
+
+        # Conditional GET: server cukup balas 304 jika feed belum berubah
+        headers = {}
+        if cached:
+            if cached['etag']: headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']: headers['If-Modified-Since'] = cached['last_modified']
+
+    async with semaphore:
+        with instrumentation.span('rss.fetch', keyword=keyword) as record:
+            response = await client.get(url, headers=headers, timeout=timeout)
+            record['status'] = response.status_code
+
+    if response.status_code == 304 and cached:
+        instrumentation.count('rss.not_modified')
+        with _cache_lock: cached['fetched_at'] = time.time()
+        return cached['entries']
+    response.raise_for_status()
+
+    import feedparser
+    feed = feedparser.parse(response.content)
+    entries = [_entry_dict(entry) for entry in feed.entries]
+    with _cache_lock:
+        _cache[url] = {
+            'entries': entries,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        }
+    return entries
+
+
+def _new_client(max_concurrency=None, timeout=None):
+    import httpx
+    max_concurrency = max_concurrency or config.NEWS_MAX_CONCURRENCY
+    limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+    return httpx.AsyncClient(timeout=timeout or config.NEWS_TIMEOUT_SECONDS, limits=limits, follow_redirects=True)
+
+
+async def fetch_feeds(keywords, url_template=None, ttl=None, max_concurrency=None, timeout=None, client=None):
+    """
+    Ambil feed banyak keyword secara bersamaan lewat satu HTTP client (koneksi dipakai ulang).
+    Parameter kosong memakai nilai NEWS_* di config; tanpa `client` dibuat client sementara untuk panggilan ini.
+    Return dict keyword -> list berita; keyword yang gagal dan belum pernah di-cache tidak ikut.
+    """
+    if client is None:
+        async with _new_client(max_concurrency, timeout) as client:
+            return await fetch_feeds(keywords, url_template, ttl, max_concurrency, timeout, client)
+
+    ttl = config.NEWS_CACHE_TTL_SECONDS if ttl is None else ttl
+    max_concurrency = max_concurrency or config.NEWS_MAX_CONCURRENCY
+    timeout = timeout or config.NEWS_TIMEOUT_SECONDS
+    keywords = list(dict.fromkeys(keywords))
+    urls = [feed_url(keyword, url_template) for keyword in keywords]
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    results = await asyncio.gather(*[_fetch_one(client, semaphore, keyword, url, ttl, timeout)
+                                     for keyword, url in zip(keywords, urls)],
+                                   return_exceptions=True)
+
+    feeds = {}
+    for keyword, url, result in zip(keywords, urls, results):
+        if isinstance(result, Exception):
+            instrumentation.error('rss.fetch', result, keyword=keyword)
+            # Pakai data lama (jika ada) daripada kosong
+            with _cache_lock: cached = _cache.get(url)
+            if cached: feeds[keyword] = cached['entries']
+        else:
+            feeds[keyword] = result
+    return feeds
+
+
+# --- SESI BERSAMA (versi sinkron) ---
+class _Session:
+    """Event loop di thread daemon + satu AsyncClient yang hidup terus: koneksi keep-alive dipakai antar panggilan"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="news-fetcher", daemon=True)
+        self.thread.start()
+        self.client = _new_client()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+_session = None
+_session_lock = threading.Lock()
+
+def _get_session():
+    global _session
+    with _session_lock:
+        if _session is None: _session = _Session()
+        return _session
+
+def _reset_after_fork():
+    # Proses anak (worker ProcessPool) tidak mewarisi thread event loop: buat sesi & lock baru saat dipakai
+    global _session, _session_lock, _cache_lock
+    _session = None
+    _session_lock = threading.Lock()
+    _cache_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def fetch_many(keywords, **kwargs):
+    """Versi sinkron dari fetch_feeds, lewat event loop dan client bersama (aman dipanggil dari thread mana pun)"""
+    session = _get_session()
+    return session.run(fetch_feeds(keywords, client=session.client, **kwargs))
+
+def get_entries(keyword, **kwargs):
+    """Daftar berita untuk satu keyword; raise jika feed gagal diambil"""
+    feeds = fetch_many([keyword], **kwargs)
+    if keyword not in feeds: raise RuntimeError(f"Feed tidak bisa diambil: {keyword}")
+    return feeds[keyword]
@@ -0,0 +1,192 @@
+"""
+Pipeline harian tanpa UI: fetch -> forecast -> sentiment -> signal -> render -> upload.
+
+    python pipeline.py [--tickers USDIDR=X BBCA.JK ...] [--dry-run] [--force] [--date 2026-10-18]
+
+Tahap yang tidak saling bergantung (forecast & sentiment) jalan bersamaan. Hasil tiap tahap disimpan
+di data/runs/<tanggal>/, sehingga menjalankan ulang (mis. setelah upload gagal) hanya mengulang
+tahap yang belum selesai. Ringkasan waktu per tahap & per ticker ditulis ke report_<jam>.json
+(dan report.json untuk run terakhir).
+"""
+import os
+import json
+import time
+import pickle
+import random
+import argparse
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import config
+import price_store
+import market_analysis
+import visualizer
+import instrumentation
+
+
+# --- TAHAP-TAHAP ---
+def stage_fetch(ctx, inputs):
+    frames = price_store.get_store().update_many(ctx['tickers'], config.FORECAST_HISTORY_DAYS)
+    return {ticker: len(df) for ticker, df in frames.items()}
+
+def stage_forecast(ctx, inputs):
+    # Berita diambil di tahap sentiment, jadi di sini tanpa keyword
+    results = market_analysis.forecast_many(ctx['tickers'], keywords={t: None for t in ctx['tickers']})
+    for res in results.values():
+        if res.get('df') is not None: res['df'] = res['df'].tail(config.REPORT_HISTORY_POINTS)
+        res.pop('news', None)
+    return results
+
+def stage_sentiment(ctx, inputs):
+    keywords = {t: k for t, k in ctx['keywords'].items() if k}
+    scores = market_analysis.get_news_sentiment_many(list(keywords.values()))
+    return {ticker: scores[keyword] for ticker, keyword in keywords.items()}
+
+def stage_signal(ctx, inputs):
+    signals = {}
+    for ticker, res in inputs['forecast'].items():
+        if not res.get('ok'): continue
+        sent_score, sent_label, _ = inputs['sentiment'].get(ticker, (0, "No News", []))
+        signal, change, reason = market_analysis.get_hybrid_signal(res['current'], res['pred'], sent_score)
+        signals[ticker] = {
+            'name': ctx['names'][ticker], 'df': res['df'], 'current': res['current'], 'pred': res['pred'],
+            'signal': signal, 'change': change, 'reason': reason, 'sentiment_label': sent_label,
+        }
+    return signals
+
+def stage_render(ctx, inputs):
+    assets = [inputs['signal'][t] for t in ctx['tickers'] if t in inputs['signal']]
+    if not assets: raise RuntimeError("Tidak ada aset untuk dirender")
+    filename = os.path.join(ctx['run_dir'], config.REPORT_FILENAME)
+    return visualizer.render_pages(assets, ctx['date'].strftime('%d %B %Y'), filename)
+
+def stage_upload(ctx, inputs):
+    import insta_uploader
+    caption = f"{random.choice(config.QUESTIONS)}\n\nMarket Forecast {ctx['date'].strftime('%d %B %Y')}"
+    # Semua halaman report jadi satu carousel; raise jika gagal agar tahap ini tidak di-checkpoint
+    media_ids = insta_uploader.upload_images(inputs['render'], caption)
+    return {'files': inputs['render'], 'caption': caption, 'media_ids': media_ids}
+
+
+# Nama tahap -> (tahap yang harus selesai dulu, fungsi)
+STAGES = {
+    'fetch': ([], stage_fetch),
+    'forecast': (['fetch'], stage_forecast),
+    'sentiment': ([], stage_sentiment),
+    'signal': (['forecast', 'sentiment'], stage_signal),
+    'render': (['signal'], stage_render),
+    'upload': (['render'], stage_upload),
+}
+
+
+# --- RUNNER ---
+def _checkpoint_path(ctx, name):
+    return os.path.join(ctx['run_dir'], f"{name}.pkl")
+
+def _run_stage(ctx, name, inputs):
+    path = _checkpoint_path(ctx, name)
+    start = time.perf_counter()
+    if not ctx['force'] and os.path.exists(path):
+        with open(path, 'rb') as f: checkpoint = pickle.load(f)
+        # Checkpoint hanya berlaku untuk daftar ticker yang sama
+        if checkpoint['tickers'] == ctx['tickers']:
+            return checkpoint['output'], 'cached', time.perf_counter() - start
+
+    output = STAGES[name][1](ctx, inputs)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f: pickle.dump({'tickers': ctx['tickers'], 'output': output}, f)
+    os.replace(tmp_path, path)
+    return output, 'done', time.perf_counter() - start
+
+def run_pipeline(tickers=None, run_date=None, dry_run=False, force=False):
+    """Jalankan DAG tahap; return dict laporan (juga ditulis ke <run_dir>/report.json)"""
+    run_date = run_date or date.today()
+    names = {asset['ticker']: name for name, asset in config.ASSETS.items()}
+    keywords = {asset['ticker']: asset['keyword'] for asset in config.ASSETS.values()}
+    tickers = tickers or list(names)
+    ctx = {
+        'tickers': tickers, 'date': run_date, 'force': force,
+        'names': {t: names.get(t, t) for t in tickers},
+        'keywords': {t: keywords.get(t) for t in tickers},
+        'run_dir': os.path.join(config.PIPELINE_RUN_DIR, run_date.isoformat()),
+    }
+    os.makedirs(ctx['run_dir'], exist_ok=True)
+
+    stages = {name: spec for name, spec in STAGES.items() if not (dry_run and name == 'upload')}
+    outputs, report = {}, {}
+    pending = dict(stages)
+    total_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=len(stages)) as pool:
+        running = {}
+        while pending or running:
+            # Tahap yang dependensinya gagal ikut dilewati
+            for name, (deps, _) in list(pending.items()):
+                if any(report.get(dep, {}).get('status') in ('failed', 'skipped') for dep in deps):
+                    report[name] = {'status': 'skipped', 'seconds': 0.0}
+                    del pending[name]
+            for name, (deps, _) in list(pending.items()):
+                if all(dep in outputs for dep in deps):
+                    inputs = {dep: outputs[dep] for dep in deps}
+                    running[pool.submit(_run_stage, ctx, name, inputs)] = name
+                    del pending[name]
+            if not running: break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    outputs[name], status, seconds = future.result()
+                    report[name] = {'status': status, 'seconds': seconds}
+                except Exception as e:
+                    print(f"Error Pipeline [{name}]: {e}")
+                    report[name] = {'status': 'failed', 'seconds': None, 'error': str(e)}
+                print(f"[{name}] {report[name]['status']}")
+
+    if dry_run: report['upload'] = {'status': 'dry-run', 'seconds': 0.0}
+
+    summary = {
+        'date': run_date.isoformat(),
+        'dry_run': dry_run,
+        'total_seconds': time.perf_counter() - total_start,
+        'stages': {name: report.get(name, {'status': 'not-run'}) for name in STAGES},
+        'tickers': _ticker_summary(tickers, outputs),
+    }
+    # report_<jam>.json per run, report.json selalu berisi run terakhir
+    for filename in (f"report_{time.strftime('%H%M%S')}.json", 'report.json'):
+        with open(os.path.join(ctx['run_dir'], filename), 'w') as f:
+            json.dump(summary, f, indent=2, default=str)
+    return summary
+
+def _ticker_summary(tickers, outputs):
+    forecasts = outputs.get('forecast', {})
+    signals = outputs.get('signal', {})
+    sentiments = outputs.get('sentiment', {})
+    summary = {}
+    for ticker in tickers:
+        res = forecasts.get(ticker, {})
+        summary[ticker] = {
+            'ok': res.get('ok'),
+            'error': res.get('error'),
+            'forecast_seconds': res.get('seconds'),
+            'model_cache': res.get('fit'),
+            'sentiment': sentiments[ticker][0] if ticker in sentiments else None,
+            'signal': signals.get(ticker, {}).get('signal'),
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipeline harian Hybrid Market (tanpa Streamlit)")
+    parser.add_argument('--tickers', nargs='+', help="Default: semua config.ASSETS")
+    parser.add_argument('--date', type=date.fromisoformat, help="ID run / folder checkpoint (default: hari ini)")
+    parser.add_argument('--dry-run', action='store_true', help="Semua tahap kecuali upload")
+    parser.add_argument('--force', action='store_true', help="Abaikan checkpoint, jalankan ulang semua tahap")
+    parser.add_argument('--profile', action='store_true', help="Simpan profil cProfile ke data/profiles")
+    args = parser.parse_args()
+
+    with instrumentation.profile('pipeline', enabled=args.profile or None):
+        result = run_pipeline(args.tickers, args.date, args.dry_run, args.force)
+    for name, stage in result['stages'].items():
+        seconds = f"{stage['seconds']:.2f}s" if stage.get('seconds') is not None else "-"
+        print(f"{name:<10} {stage['status']:<10} {seconds}")
+    print(f"Total: {result['total_seconds']:.2f}s")
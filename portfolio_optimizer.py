@@ -1,78 +1,277 @@
-import yfinance as yf
-import pandas as pd
+import os
+import json
+import hashlib
+import threading
 import numpy as np
-from scipy.optimize import minimize
+import pandas as pd
 import config
+import screener
+import instrumentation
+
+TRADING_DAYS = 252
+
+# Constraint: Total bobot harus 1 (100%), dengan jacobian analitik
+_SUM_TO_ONE = {'type': 'eq', 'fun': lambda w: np.sum(w) - 1, 'jac': lambda w: np.ones_like(w)}
+
+
+def _annualize(mean_returns, cov):
+    mu = np.asarray(mean_returns, dtype=float) * TRADING_DAYS
+    sigma = np.atleast_2d(np.asarray(cov, dtype=float)) * TRADING_DAYS
+    return mu, sigma
+
+def _feasible_bounds(num_assets, bounds):
+    # Longgarkan bound jika tidak mungkin mencapai total 100% (mis. 30 saham x min 5%)
+    lower, upper = bounds
+    if lower * num_assets > 1: lower = 0.0
+    return lower, max(upper, 1 / num_assets)
+
+
+def max_sharpe_weights(mean_returns, cov, bounds=config.PORTFOLIO_WEIGHT_BOUNDS):
+    """
+    Bobot dengan Sharpe Ratio maksimum.
+    mean_returns / cov: return harian (array NumPy), dihitung sekali di luar fungsi objektif.
+    """
+    from scipy.optimize import minimize  # scipy baru dimuat saat optimasi pertama
+    mu, sigma = _annualize(mean_returns, cov)
+    num_assets = len(mu)
+    lower, upper = _feasible_bounds(num_assets, bounds)
+
+    # Fungsi Negatif Sharpe + gradien analitiknya (SLSQP tidak perlu beda hingga)
+    def negative_sharpe(weights):
+        sigma_w = sigma @ weights
+        variance = weights @ sigma_w
+        volatility = np.sqrt(variance)
+        portfolio_return = mu @ weights
+        grad = -(mu / volatility - portfolio_return * sigma_w / (variance * volatility))
+        return -portfolio_return / volatility, grad
+
+    init_guess = np.full(num_assets, 1 / num_assets)
+    with instrumentation.span('slsqp.max_sharpe', assets=num_assets) as record:
+        result = minimize(negative_sharpe, init_guess, jac=True, method='SLSQP',
+                          bounds=[(lower, upper)] * num_assets, constraints=[_SUM_TO_ONE])
+        record['iterations'] = int(result.nit)
+    if not result.success: instrumentation.count('slsqp.not_converged', assets=num_assets)
+    return result.x
+
+
+def _extreme_return_weights(mu, lower, upper, highest=True):
+    """Bobot dengan return tertinggi/terendah yang masih memenuhi bound (isi saham terbaik dulu)"""
+    weights = np.full(len(mu), lower)
+    remaining = 1 - weights.sum()
+    order = np.argsort(-mu if highest else mu)
+    for i in order:
+        add = min(upper - lower, remaining)
+        weights[i] += add
+        remaining -= add
+        if remaining <= 0: break
+    return weights
+
+def efficient_frontier(mean_returns, cov, n_points=50, bounds=config.PORTFOLIO_WEIGHT_BOUNDS):
+    """
+    Efficient frontier: portofolio volatilitas minimum untuk `n_points` target return sekaligus.
+    Tiap titik di-warm-start dari solusi titik sebelumnya.
+    Return dict berisi array 'returns', 'volatility', 'sharpe' (per titik) dan 'weights' (titik x aset).
+    """
+    from scipy.optimize import minimize
+    mu, sigma = _annualize(mean_returns, cov)
+    num_assets = len(mu)
+    lower, upper = _feasible_bounds(num_assets, bounds)
+    asset_bounds = [(lower, upper)] * num_assets
+
+    def variance(weights):
+        sigma_w = sigma @ weights
+        return weights @ sigma_w, 2 * sigma_w
+
+    # Titik awal frontier: portofolio varians minimum
+    weights = minimize(variance, np.full(num_assets, 1 / num_assets), jac=True, method='SLSQP',
+                       bounds=asset_bounds, constraints=[_SUM_TO_ONE]).x
+    max_return = mu @ _extreme_return_weights(mu, lower, upper, highest=True)
+    targets = np.linspace(mu @ weights, max_return, n_points)
+
+    all_weights = np.empty((n_points, num_assets))
+    for i, target in enumerate(targets):
+        constraints = [_SUM_TO_ONE, {'type': 'eq', 'fun': lambda w, t=target: mu @ w - t, 'jac': lambda w: mu}]
+        weights = minimize(variance, weights, jac=True, method='SLSQP',
+                           bounds=asset_bounds, constraints=constraints).x
+        all_weights[i] = weights
+
+    returns = all_weights @ mu
+    volatility = np.sqrt(np.einsum('ij,jk,ik->i', all_weights, sigma, all_weights))
+    return {'returns': returns, 'volatility': volatility, 'sharpe': returns / volatility, 'weights': all_weights}
+
+
+# --- BOBOT PER HARI BURSA (tidak bergantung pada jumlah dana) ---
+_weights_cache = {}  # Hanya hari bursa yang sedang berlaku; hari lain cukup di disk
+_weights_locks = {}  # Satu lock per kunci: cache miss satu kunci tidak menahan kunci lain
+_weights_lock = threading.Lock()  # Menjaga kedua dict di atas
+
+def _reset_after_fork():
+    # Lock yang dipegang thread lain saat fork tidak pernah dilepas di proses anak
+    global _weights_lock
+    _weights_lock = threading.Lock()
+    _weights_locks.clear()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def trading_day(now=None):
+    """Hari bursa yang sedang berlaku (jam bursa); Sabtu/Minggu ikut hari Jumat sebelumnya"""
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz=config.MARKET_TIMEZONE)
+    day = now.normalize().tz_localize(None) if now.tzinfo is not None else now.normalize()
+    if day.dayofweek >= 5: day -= pd.Timedelta(days=day.dayofweek - 4)
+    return day.strftime('%Y-%m-%d')
+
+def _weights_key(day, tickers, top_n, bounds):
+    params = json.dumps([sorted(tickers) if tickers else None, top_n, list(bounds), config.PORTFOLIO_HISTORY_DAYS])
+    return f"{day}_{hashlib.sha1(params.encode()).hexdigest()[:12]}"
 
-def get_optimized_portfolio(investment_amount):
+def get_optimal_weights(top_n=config.PORTFOLIO_TOP_N, bounds=config.PORTFOLIO_WEIGHT_BOUNDS, tickers=None,
+                        day=None):
     """
-    1. Ambil data Blue Chips.
-    2. Pilih 4 dengan Sharpe Ratio terbaik.
-    3. Optimasi bobot alokasi.
-    4. Hitung jumlah lot.
+    Screening + SLSQP sekali per hari bursa. Hasil disimpan di memori proses dan di PORTFOLIO_CACHE_DIR,
+    jadi semua sesi/proses memakai hasil yang sama. Return dict: day, tickers, weights, prices, sharpe; None jika gagal.
+    """
+    day = day or trading_day()
+    key = _weights_key(day, tickers, top_n, bounds)
+    result = _weights_cache.get(key)
+    if result is not None: return result
+
+    with _key_lock(key):
+        result = _weights_cache.get(key)
+        if result is not None: return result
+
+        path = os.path.join(config.PORTFOLIO_CACHE_DIR, f"{key}.json")
+        try:
+            with open(path) as f: result = json.load(f)
+            instrumentation.count('portfolio.weights_disk_hit')
+        except (OSError, ValueError):
+            result = None
+
+        if result is None:
+            screened = screener.screen(tickers, top_n, config.PORTFOLIO_HISTORY_DAYS)
+            if screened is None: return None
+            # Mean & kovarians dihitung sekali, bukan di tiap evaluasi SLSQP
+            weights = max_sharpe_weights(screened['mean'], screened['cov'], bounds)
+            result = {
+                'day': day,
+                'tickers': screened['tickers'],
+                'weights': [float(w) for w in weights],
+                'prices': [float(p) for p in screened['prices']],
+                'sharpe': [float(s) for s in screened['sharpe']],
+            }
+            os.makedirs(config.PORTFOLIO_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f: json.dump(result, f)
+            os.replace(tmp_path, path)
+
+        _remember(day, key, result)
+        return result
+
+def _key_lock(key):
+    with _weights_lock:
+        return _weights_locks.setdefault(key, threading.Lock())
+
+def _remember(day, key, result):
+    """Simpan di memori hanya untuk hari bursa yang berlaku; entri (dan lock) hari sebelumnya dibuang"""
+    current = trading_day()
+    with _weights_lock:
+        for stale in [k for k in _weights_cache if not k.startswith(f"{current}_")]: del _weights_cache[stale]
+        for stale in [k for k in _weights_locks if not k.startswith(f"{current}_")]: del _weights_locks[stale]
+        if day == current: _weights_cache[key] = result
+
+
+# --- ALOKASI LOT (per jumlah dana) ---
+def allocate_lots(weights, prices, investment_amount, lot_size=config.LOT_SIZE):
+    """
+    Jumlah lot bulat per saham yang nilainya paling dekat dengan target bobot (selisih kuadrat terkecil)
+    tanpa melebihi dana. Untuk <= LOT_EXACT_MAX_ASSETS saham dicari solusi optimal (branch-and-bound, lihat
+    _search_lots); di atas itu hasil greedy: pembulatan ke bawah lalu tambahan 1 lot dengan perbaikan terbesar dulu.
+    """
+    weights = np.asarray(weights, dtype=float)
+    lot_cost = np.asarray(prices, dtype=float) * lot_size
+    target = investment_amount * weights
+
+    lots = np.floor(target / lot_cost)
+    remaining = investment_amount - lots @ lot_cost
+
+    # Selisih sekarang (<= 0) vs setelah tambah 1 lot
+    deviation = lots * lot_cost - target
+    gain = deviation ** 2 - (deviation + lot_cost) ** 2
+    for i in np.argsort(-gain, kind='stable'):
+        if gain[i] <= 0: break
+        if lot_cost[i] <= remaining:
+            lots[i] += 1
+            remaining -= lot_cost[i]
+
+    if len(lots) <= config.LOT_EXACT_MAX_ASSETS:
+        lots = _search_lots(target, lot_cost, investment_amount, lots)
+    return lots.astype(int)
+
+def _search_lots(target, lot_cost, budget, initial):
+    """
+    Branch-and-bound: lot per saham antara 0 dan floor(target/biaya lot) + 1 (di atasnya selisih & biaya hanya
+    bertambah). Saham termahal diputuskan dulu; cabang dipangkas jika selisih sejauh ini + selisih minimum saham
+    sisanya (tanpa batas dana) tidak lebih kecil dari solusi terbaik. Mulai dari `initial` (greedy, selalu muat).
+    """
+    order = np.argsort(-lot_cost, kind='stable')
+    t, c = target[order].tolist(), lot_cost[order].tolist()
+    n = len(t)
+    floors = [int(ti // ci) for ti, ci in zip(t, c)]
+    item_min = [min((f * ci - ti) ** 2, ((f + 1) * ci - ti) ** 2) for f, ti, ci in zip(floors, t, c)]
+    rest_min = [sum(item_min[i:]) for i in range(n + 1)]
+
+    best_lots = [float(x) for x in initial[order]]
+    best = [sum((l * ci - ti) ** 2 for l, ti, ci in zip(best_lots, t, c)), best_lots]
+    lots = [0] * n
+
+    def visit(i, remaining, error):
+        if i == n:
+            if error < best[0]: best[0], best[1] = error, list(lots)
+            return
+        ti, ci = t[i], c[i]
+        # Dari lot terbanyak yang muat ke bawah: selisih turun sampai target, lalu naik lagi
+        for l in range(min(floors[i] + 1, int(remaining // ci)), -1, -1):
+            item_error = (l * ci - ti) ** 2
+            if error + item_error + rest_min[i + 1] >= best[0]:
+                if l * ci <= ti: break  # Di bawah target: lot lebih sedikit hanya menambah selisih
+                continue
+            lots[i] = l
+            visit(i + 1, remaining - l * ci, error + item_error)
+
+    visit(0, budget, 0.0)
+    result = np.empty(n)
+    result[order] = best[1]
+    return result
+
+
+def get_optimized_portfolio(investment_amount, top_n=config.PORTFOLIO_TOP_N, bounds=config.PORTFOLIO_WEIGHT_BOUNDS,
+                            tickers=None):
+    """
+    1. Ambil data seluruh universe (screener.load_universe, default Blue Chips).
+    2. Pilih `top_n` dengan Sharpe Ratio terbaik.
+    3. Optimasi bobot alokasi (1-3 di-cache per hari bursa, lihat get_optimal_weights).
+    4. Hitung jumlah lot untuk `investment_amount`.
     """
     try:
-        tickers = config.BLUE_CHIPS_CANDIDATES
-        
-        # 1. Ambil Data (6 Bulan Terakhir)
-        df = yf.download(tickers, period="6mo", progress=False)['Close']
-        
-        if df.empty: return None, "Gagal mengambil data saham."
-
-        # Hitung Daily Returns
-        returns = df.pct_change().dropna()
-
-        # 2. Screening: Cari 4 Saham dengan Sharpe Ratio Tertinggi
-        # Sharpe = Rata-rata Return / Standar Deviasi (Risiko)
-        mean_returns = returns.mean()
-        std_dev = returns.std()
-        sharpe_ratios = mean_returns / std_dev
-        
-        # Ambil 4 terbaik
-        top_4_tickers = sharpe_ratios.nlargest(4).index.tolist()
-        
-        # Filter data hanya untuk Top 4
-        selected_returns = returns[top_4_tickers]
-        current_prices = df[top_4_tickers].iloc[-1]
-
-        # 3. Portfolio Optimization (Minimize Volatility for Target Return)
-        # Kita pakai pendekatan Maximize Sharpe Ratio sederhana
-        num_assets = len(top_4_tickers)
-        
-        # Fungsi Negatif Sharpe (karena scipy bisanya minimize)
-        def negative_sharpe(weights):
-            portfolio_return = np.sum(selected_returns.mean() * weights) * 252
-            portfolio_volatility = np.sqrt(np.dot(weights.T, np.dot(selected_returns.cov() * 252, weights)))
-            return - (portfolio_return / portfolio_volatility)
-
-        # Constraints: Total bobot harus 1 (100%)
-        constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
-        # Bounds: Tiap saham minimal 5%, maksimal 50% (agar diversifikasi terjaga)
-        bounds = tuple((0.05, 0.5) for _ in range(num_assets))
-        
-        # Initial Guess (Bagi rata)
-        init_guess = [1/num_assets] * num_assets
-
-        # Eksekusi Optimasi
-        result = minimize(negative_sharpe, init_guess, method='SLSQP', bounds=bounds, constraints=constraints)
-        optimal_weights = result.x
-
-        # 4. Susun Hasil Rekomendasi
+        # 1-3. Screening + bobot optimal: cukup sekali per hari bursa
+        optimal = get_optimal_weights(top_n, bounds, tickers)
+        if optimal is None: return None, "Gagal mengambil data saham."
+        optimal_weights = optimal['weights']
+        current_prices = optimal['prices']
+
+        # 4. Hitung Lot (1 Lot = 100 Lembar): bulat, sedekat mungkin dengan bobot, tidak melebihi dana
+        all_lots = allocate_lots(optimal_weights, current_prices, investment_amount)
+
+        # 5. Susun Hasil Rekomendasi
         recommendations = []
         total_spent = 0
-        
-        for i, ticker in enumerate(top_4_tickers):
+
+        for i, ticker in enumerate(optimal['tickers']):
             weight = optimal_weights[i]
             allocated_money = investment_amount * weight
-            price = current_prices[ticker]
-            
-            # Hitung Lot (1 Lot = 100 Lembar)
-            # Dibulatkan ke bawah agar tidak melebihi budget
-            lots = int(allocated_money / (price * 100))
-            if lots < 1: lots = 0 # Kalau uang gak cukup
-            
-            actual_value = lots * 100 * price
-            
+            price = current_prices[i]
+            lots = int(all_lots[i])
+            actual_value = lots * config.LOT_SIZE * price
+
             recommendations.append({
                 'Ticker': ticker,
                 'Price': price,
@@ -86,5 +285,5 @@ def get_optimized_portfolio(investment_amount):
         return recommendations, total_spent
 
     except Exception as e:
-        print(f"Error Optimization: {e}")
-        return None, str(e)
\ No newline at end of file
+        instrumentation.error('portfolio.optimize', e)
+        return None, str(e)
@@ -0,0 +1,83 @@
+"""
+Prefetch watchlist di background: harga (price store), model Prophet (model cache) dan berita (cache RSS + sentimen)
+untuk semua aset di config.ASSETS selalu dipanaskan, sehingga dashboard tidak perlu fit dari nol saat aset diganti.
+
+    python prefetcher.py            # satu putaran lalu keluar
+    python prefetcher.py --loop     # terus berjalan tiap PREFETCH_INTERVAL_SECONDS
+"""
+import time
+import argparse
+import threading
+import config
+import market_analysis
+import instrumentation
+
+
+def _watchlist(assets=None):
+    assets = assets if assets is not None else config.ASSETS
+    return [(info['ticker'], info['keyword']) for info in assets.values()]
+
+
+def warm_once(assets=None):
+    """Satu putaran prefetch. Return dict ticker -> True/False (berhasil forecast)"""
+    watchlist = _watchlist(assets)
+    tickers = [ticker for ticker, _ in watchlist]
+    status = {}
+    with instrumentation.span('prefetch.cycle', tickers=len(tickers)):
+        # Satu request harga untuk semua ticker, lalu prediksi per backend (batch / cache model)
+        for ticker, (df, _, _) in market_analysis.get_technical_forecast_many(tickers).items():
+            status[ticker] = df is not None
+        market_analysis.get_news_sentiment_many([keyword for _, keyword in watchlist])
+    return status
+
+
+class Prefetcher:
+    """Thread daemon yang menjalankan warm_once berulang; satu instance cukup per proses"""
+
+    def __init__(self, assets=None, interval=None, delay=0):
+        self.assets = assets
+        self.interval = interval or config.PREFETCH_INTERVAL_SECONDS
+        self.delay = delay  # Jeda sebelum putaran pertama (detik)
+        self.last_run = None
+        self.last_status = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="prefetcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None: self._thread.join(timeout)
+
+    def _loop(self):
+        if self._stop.wait(self.delay): return
+        while not self._stop.is_set():
+            try:
+                self.last_status = warm_once(self.assets)
+                self.last_run = time.time()
+            except Exception as e:
+                instrumentation.error('prefetch', e)
+            self._stop.wait(self.interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Panaskan cache harga, model, dan berita untuk config.ASSETS")
+    parser.add_argument('--loop', action='store_true', help="Jalan terus tiap PREFETCH_INTERVAL_SECONDS")
+    args = parser.parse_args()
+
+    if args.loop:
+        prefetcher = Prefetcher().start()
+        try:
+            while True: time.sleep(3600)
+        except KeyboardInterrupt:
+            prefetcher.stop()
+    else:
+        start = time.perf_counter()
+        status = warm_once()
+        for ticker, ok in status.items(): print(f"{ticker:<12} {'OK' if ok else 'GAGAL'}")
+        print(f"Selesai dalam {time.perf_counter() - start:.1f} detik")
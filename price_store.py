@@ -0,0 +1,293 @@
+import os
+import re
+import json
+import time
+import numpy as np
+import pandas as pd
+import config
+import instrumentation
+
+# Kolom standar yang disimpan untuk setiap ticker
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _empty_frame():
+    return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name='Date'), dtype='float64')
+
+
+def _normalize(df, ticker=None):
+    """Menyeragamkan format OHLCV: index Date (tanpa timezone), kolom COLUMNS, float64"""
+    if df is None or df.empty: return _empty_frame()
+
+    if isinstance(df.columns, pd.MultiIndex):
+        # yf.download mengembalikan kolom (Price, Ticker)
+        if ticker is not None and ticker in df.columns.get_level_values(-1):
+            df = df.xs(ticker, axis=1, level=-1)
+        else:
+            df = df.droplevel(-1, axis=1)
+
+    df = df.reindex(columns=COLUMNS).astype('float64')
+    index = pd.DatetimeIndex(pd.to_datetime(df.index))
+    if index.tz is not None: index = index.tz_localize(None)
+    df.index = index.normalize().rename('Date')
+
+    df = df[df['Close'].notna()]
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+
+# --- SUMBER DATA (bisa ditukar) ---
+class YahooSource:
+    """Sumber data live dari Yahoo Finance"""
+
+    def fetch(self, ticker, start, end):
+        import yfinance as yf
+        with instrumentation.span('yf.download', ticker=ticker):
+            df = yf.download(ticker, start=start.strftime('%Y-%m-%d'), end=end.strftime('%Y-%m-%d'),
+                             interval="1d", progress=False)
+        return _normalize(df, ticker)
+
+    def fetch_many(self, tickers, start, end):
+        """Satu request untuk banyak ticker sekaligus"""
+        if len(tickers) == 1: return {tickers[0]: self.fetch(tickers[0], start, end)}
+        import yfinance as yf
+        with instrumentation.span('yf.download', tickers=len(tickers)):
+            df = yf.download(list(tickers), start=start.strftime('%Y-%m-%d'), end=end.strftime('%Y-%m-%d'),
+                             interval="1d", progress=False)
+        result = {}
+        for ticker in tickers:
+            if df is not None and isinstance(df.columns, pd.MultiIndex) and ticker in df.columns.get_level_values(-1):
+                result[ticker] = _normalize(df, ticker)
+            else:
+                result[ticker] = _empty_frame()
+        return result
+
+
+class FixtureSource:
+    """Sumber data offline: satu file CSV per ticker (Date, Open, High, Low, Close, Volume)"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def fetch(self, ticker, start, end):
+        path = os.path.join(self.directory, f"{ticker}.csv")
+        if not os.path.exists(path): return _empty_frame()
+        df = _normalize(pd.read_csv(path, index_col='Date', parse_dates=True))
+        return df[(df.index >= start) & (df.index < end)]
+
+    def fetch_many(self, tickers, start, end):
+        return {ticker: self.fetch(ticker, start, end) for ticker in tickers}
+
+
+class FrameSource(FixtureSource):
+    """Sumber data in-memory (dict ticker -> DataFrame OHLCV)"""
+
+    def __init__(self, frames):
+        self.frames = {ticker: _normalize(df) for ticker, df in frames.items()}
+
+    def fetch(self, ticker, start, end):
+        df = self.frames.get(ticker)
+        if df is None: return _empty_frame()
+        return df[(df.index >= start) & (df.index < end)]
+
+
+# --- PRICE STORE ---
+class PriceStore:
+    """
+    Penyimpanan harga harian lokal (satu file Parquet per ticker).
+    Hanya rentang tanggal yang belum ada yang diminta ke sumber data, lalu ditambahkan ke file.
+    """
+
+    def __init__(self, root=config.PRICE_STORE_DIR, source=None, refresh_seconds=config.PRICE_REFRESH_SECONDS):
+        self.root = root
+        self.source = source if source is not None else YahooSource()
+        self.refresh_seconds = refresh_seconds
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, ticker):
+        return os.path.join(self.root, re.sub(r'[^A-Za-z0-9._=^-]', '_', ticker) + ".parquet")
+
+    def read(self, ticker):
+        path = self.path(ticker)
+        if not os.path.exists(path): return None
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            instrumentation.error('price_store.read', e, ticker=ticker)
+            return None
+
+    def read_close(self, ticker):
+        """(tanggal datetime64, Close float64) langsung dari Parquet tanpa membangun DataFrame; None jika tidak ada"""
+        import pyarrow.parquet as pq
+        path = self.path(ticker)
+        if not os.path.exists(path): return None
+        try:
+            table = pq.read_table(path, columns=['Date', 'Close'])
+        except Exception as e:
+            instrumentation.error('price_store.read', e, ticker=ticker)
+            return None
+        return table.column('Date').to_numpy().astype('datetime64[ns]'), table.column('Close').to_numpy()
+
+    def _write(self, ticker, df):
+        # Tulis ke file sementara lalu rename agar aman dibaca proses lain
+        path = self.path(ticker)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+    def _is_fresh(self, ticker):
+        path = self.path(ticker)
+        return os.path.exists(path) and (time.time() - os.path.getmtime(path)) < self.refresh_seconds
+
+    # Catatan pengecekan per ticker: {'start': awal rentang yang pernah diminta, 'checked_at': waktu cek terakhir}.
+    # Dengan ini riwayat yang memang lebih pendek dari rentang (IPO baru) dan ticker tanpa data tidak diminta ulang
+    # ke sumber data sebelum PRICE_REFRESH_SECONDS lewat.
+    def meta_path(self, ticker):
+        return os.path.splitext(self.path(ticker))[0] + ".meta.json"
+
+    def _read_meta(self, ticker):
+        try:
+            with open(self.meta_path(ticker)) as f: meta = json.load(f)
+            return {'start': pd.Timestamp(meta['start']), 'checked_at': float(meta['checked_at'])}
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_meta(self, ticker, start, checked_at=None):
+        path = self.meta_path(ticker)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'start': start.strftime('%Y-%m-%d'),
+                       'checked_at': time.time() if checked_at is None else checked_at}, f)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, ticker):
+        """Paksa pengecekan ulang ke sumber data pada pemanggilan berikutnya (data lokal tetap dipakai)"""
+        path = self.path(ticker)
+        if os.path.exists(path): os.utime(path, (0, 0))
+        meta = self._read_meta(ticker)
+        if meta is not None: self._write_meta(ticker, meta['start'], checked_at=0)
+
+    def update_many(self, tickers, days):
+        """Melengkapi data lokal untuk rentang `days` hari terakhir, lalu mengembalikan dict ticker -> DataFrame"""
+        today = pd.Timestamp.today().normalize()
+        start = today - pd.Timedelta(days=days)
+        end = today + pd.Timedelta(days=1)
+        # Toleransi libur/akhir pekan di awal rentang
+        backfill_limit = start + pd.Timedelta(days=7)
+
+        stored = {ticker: self.read(ticker) for ticker in tickers}
+        metas = {ticker: self._read_meta(ticker) for ticker in tickers}
+        # Awal rentang sudah pernah diminta: data yang mulai belakangan memang tidak ada di sumber
+        head_checked = {ticker: meta is not None and meta['start'] <= start for ticker, meta in metas.items()}
+        result, new_tickers, stale_tickers = {}, [], []
+        for ticker, df in stored.items():
+            if df is None or df.empty:
+                meta = metas[ticker]
+                if head_checked[ticker] and time.time() - meta['checked_at'] < self.refresh_seconds:
+                    # Ticker tanpa data (delisting / salah ketik): hasil kosong di-cache selama jendela refresh
+                    instrumentation.count('price_store.fresh_empty', ticker=ticker)
+                    result[ticker] = _empty_frame()
+                else:
+                    new_tickers.append(ticker)
+            elif self._is_fresh(ticker) and (df.index[0] <= backfill_limit or head_checked[ticker]):
+                instrumentation.count('price_store.fresh', ticker=ticker)
+                result[ticker] = df
+            else:
+                stale_tickers.append(ticker)
+
+        fetched = {ticker: [] for ticker in tickers}
+        checked = set()  # Ticker yang rentang awalnya (dari `start`) berhasil diminta di panggilan ini
+
+        # 1. Ticker baru: ambil seluruh rentang dalam satu request
+        if new_tickers and self._fetch_into(fetched, new_tickers, start, end):
+            checked.update(new_tickers)
+
+        # 2. Ticker lama: ambil ulang mulai hari terakhir tersimpan (bar hari ini bisa belum final)
+        if stale_tickers:
+            tail_start = min(stored[t].index[-1] for t in stale_tickers)
+            self._fetch_into(fetched, stale_tickers, tail_start, end)
+
+            backfill = [t for t in stale_tickers if stored[t].index[0] > backfill_limit and not head_checked[t]]
+            if backfill:
+                head_end = max(stored[t].index[0] for t in backfill)
+                if self._fetch_into(fetched, backfill, start, head_end): checked.update(backfill)
+
+        for ticker in new_tickers + stale_tickers:
+            # Catat bahwa rentang dari `start` sudah dicek (juga jika hasilnya kosong); fetch yang gagal tidak dicatat
+            if ticker in checked:
+                meta = metas[ticker]
+                self._write_meta(ticker, min(start, meta['start']) if meta else start)
+            parts = [df for df in [stored[ticker]] + fetched[ticker] if df is not None and not df.empty]
+            if not parts:
+                result[ticker] = _empty_frame()
+                continue
+            combined = pd.concat(parts)
+            combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+            if stored[ticker] is not None and combined.equals(stored[ticker]):
+                os.utime(self.path(ticker))  # Tidak ada data baru, tandai sudah dicek
+            else:
+                self._write(ticker, combined)
+            result[ticker] = combined
+
+        return result
+
+    def _fetch_into(self, fetched, tickers, start, end):
+        try:
+            for ticker, df in self.source.fetch_many(tickers, start, end).items():
+                fetched[ticker].append(df)
+            return True
+        except Exception as e:
+            # Gagal ambil data baru: tetap pakai data lokal yang ada
+            instrumentation.error('price_store.fetch', e, tickers=', '.join(tickers))
+            return False
+
+    def close_arrays(self, tickers, days):
+        """
+        dict ticker -> (tanggal, Close) untuk banyak ticker. Ticker yang datanya masih segar dibaca langsung
+        (hanya kolom Close); sisanya dilengkapi dulu lewat update_many. Untuk screening ratusan ticker.
+        """
+        stale = [ticker for ticker in tickers if not self._is_fresh(ticker)]
+        result = {}
+        if stale:
+            for ticker, df in self.update_many(stale, days).items():
+                result[ticker] = (df.index.to_numpy().astype('datetime64[ns]'), df['Close'].to_numpy())
+        for ticker in tickers:
+            if ticker in result: continue
+            arrays = self.read_close(ticker)
+            result[ticker] = arrays if arrays is not None else (np.array([], dtype='datetime64[ns]'), np.array([]))
+        return result
+
+    def get_history(self, ticker, days=config.FORECAST_HISTORY_DAYS):
+        """OHLCV harian `days` hari terakhir untuk satu ticker"""
+        df = self.update_many([ticker], days)[ticker]
+        start = pd.Timestamp.today().normalize() - pd.Timedelta(days=days)
+        return df[df.index >= start].copy()
+
+    def get_close_matrix(self, tickers, days=config.PORTFOLIO_HISTORY_DAYS):
+        """Harga penutupan banyak ticker (kolom = ticker), setara yf.download(tickers)['Close']"""
+        frames = self.update_many(list(tickers), days)
+        start = pd.Timestamp.today().normalize() - pd.Timedelta(days=days)
+        closes = {ticker: frames[ticker]['Close'] for ticker in tickers}
+        df = pd.DataFrame(closes).sort_index()
+        return df[df.index >= start]
+
+
+# --- STORE DEFAULT ---
+_store = None
+
+def get_store():
+    """Store default; pakai FixtureSource jika PRICE_FIXTURE_DIR di-set (mode offline)"""
+    global _store
+    if _store is None:
+        fixture_dir = os.environ.get("PRICE_FIXTURE_DIR")
+        _store = PriceStore(source=FixtureSource(fixture_dir) if fixture_dir else None)
+    return _store
+
+def set_store(store):
+    global _store
+    _store = store
+
+def get_history(ticker, days=config.FORECAST_HISTORY_DAYS):
+    return get_store().get_history(ticker, days)
+
+def get_close_matrix(tickers, days=config.PORTFOLIO_HISTORY_DAYS):
+    return get_store().get_close_matrix(tickers, days)
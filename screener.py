@@ -0,0 +1,185 @@
+"""
+Screening seluruh saham IDX berdasarkan Sharpe Ratio.
+
+    python screener.py [--universe data/idx_universe.csv] [--top 20] [--days 182]
+
+Harga dimuat per potongan (SCREENER_CHUNK_SIZE ticker) lewat price store, return disimpan sebagai matriks
+float32 (hari x ticker, NaN = tidak ada data). Statistik mean/volatilitas dihitung per potongan saat dimuat,
+dan kovarians (Ledoit-Wolf) hanya dihitung sekali untuk saham terpilih.
+"""
+import os
+import argparse
+import numpy as np
+import pandas as pd
+import config
+import price_store
+import instrumentation
+
+
+def load_universe(path=None, suffix=".JK"):
+    """
+    Daftar ticker dari file CSV/teks (kolom 'ticker' / 'Kode', atau kolom pertama). Kode tanpa akhiran diberi `.JK`.
+    Tanpa file: config.BLUE_CHIPS_CANDIDATES.
+    """
+    path = path or config.IDX_UNIVERSE_FILE
+    if not os.path.exists(path): return list(config.BLUE_CHIPS_CANDIDATES)
+    df = pd.read_csv(path, dtype=str)
+    column = next((c for c in df.columns if c.lower() in ('ticker', 'kode', 'code')), df.columns[0])
+    codes = df[column].dropna().str.strip().str.upper()
+    return list(dict.fromkeys(code if "." in code else code + suffix for code in codes if code))
+
+
+def _returns_chunk(closes, tickers, calendar):
+    """Return harian float32 (hari x ticker) di atas kalender bersama, plus harga penutupan terakhir"""
+    block = np.full((len(calendar), len(tickers)), np.nan, dtype=np.float32)
+    last_prices = np.full(len(tickers), np.nan)
+    for j, ticker in enumerate(tickers):
+        dates, close = closes[ticker]
+        keep = (dates >= calendar[0]) & ~np.isnan(close)
+        dates, close = dates[keep], close[keep]
+        if len(close) < 2: continue
+        rows = np.searchsorted(calendar, dates)
+        on_calendar = (rows < len(calendar)) & (calendar[np.minimum(rows, len(calendar) - 1)] == dates)
+        rows, close = rows[on_calendar], close[on_calendar]
+        # Return dihitung antar penutupan yang ada (hari tanpa data tidak diisi)
+        block[rows[1:], j] = close[1:] / close[:-1] - 1
+        last_prices[j] = close[-1]
+    return block, last_prices
+
+
+def load_returns(tickers, days=config.PORTFOLIO_HISTORY_DAYS, chunk_size=None, stats=None):
+    """
+    Muat harga per potongan ticker -> (returns float32 hari x ticker, harga terakhir, kalender).
+    `stats` (opsional, RunningStats) diperbarui per potongan, jadi statistik siap tanpa membaca ulang matriks.
+    """
+    chunk_size = chunk_size or config.SCREENER_CHUNK_SIZE
+    today = pd.Timestamp.today().normalize()
+    calendar = pd.bdate_range(today - pd.Timedelta(days=days), today).to_numpy()
+    returns = np.full((len(calendar), len(tickers)), np.nan, dtype=np.float32)
+    last_prices = np.full(len(tickers), np.nan)
+
+    store = price_store.get_store()
+    for start in range(0, len(tickers), chunk_size):
+        chunk = tickers[start:start + chunk_size]
+        with instrumentation.span('screener.load_chunk', tickers=len(chunk)):
+            closes = store.close_arrays(chunk, days)
+            block, prices = _returns_chunk(closes, chunk, calendar)
+        del closes
+        returns[:, start:start + len(chunk)] = block
+        last_prices[start:start + len(chunk)] = prices
+        if stats is not None: stats.update(block, start)
+
+    # Hari libur bursa (tidak ada ticker yang bergerak) dibuang
+    active = ~np.isnan(returns).all(axis=1)
+    return returns[active], last_prices, calendar[active]
+
+
+class RunningStats:
+    """Jumlah, total, dan total kuadrat return per ticker (float64), diisi per potongan kolom"""
+
+    def __init__(self, num_tickers):
+        self.count = np.zeros(num_tickers)
+        self.total = np.zeros(num_tickers)
+        self.total_sq = np.zeros(num_tickers)
+
+    def update(self, block, start=0):
+        valid = ~np.isnan(block)
+        values = np.where(valid, block, 0).astype(np.float64)
+        end = start + block.shape[1]
+        self.count[start:end] += valid.sum(axis=0)
+        self.total[start:end] += values.sum(axis=0)
+        self.total_sq[start:end] += (values ** 2).sum(axis=0)
+
+    def mean(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.total / self.count
+
+    def std(self):
+        """Standar deviasi sampel (ddof=1)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = (self.total_sq - self.count * self.mean() ** 2) / (self.count - 1)
+        return np.sqrt(np.maximum(variance, 0))
+
+    def sharpe(self):
+        """Sharpe harian (tanpa risk-free rate, seperti screening lama); tidak valid = -inf"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = self.mean() / self.std()
+        return np.where(np.isfinite(ratio), ratio, -np.inf)
+
+
+def ledoit_wolf_cov(returns):
+    """
+    Kovarians Ledoit-Wolf (target: identitas berskala) dari matriks return hari x aset.
+    NaN diisi 0 setelah dikurangi rata-rata kolom (hari tanpa data tidak menambah kovarians).
+    Return (kovarians harian, intensitas shrinkage 0..1).
+    """
+    X = np.asarray(returns, dtype=np.float64)
+    X = X - np.nanmean(X, axis=0)
+    X = np.nan_to_num(X, nan=0.0)
+    n, p = X.shape
+
+    emp_cov = X.T @ X / n
+    mu = np.trace(emp_cov) / p
+    X2 = X ** 2
+    beta_ = np.sum(X2.T @ X2) / n
+    delta_ = np.sum(emp_cov ** 2)
+    beta = (beta_ - delta_) / (p * n)
+    delta = (delta_ - 2 * mu * np.trace(emp_cov) + p * mu ** 2) / p
+    beta = min(beta, delta)
+    shrinkage = 0.0 if delta == 0 else beta / delta
+
+    cov = (1 - shrinkage) * emp_cov
+    cov[np.diag_indices(p)] += shrinkage * mu
+    return cov, shrinkage
+
+
+def screen(tickers=None, top_n=config.PORTFOLIO_TOP_N, days=config.PORTFOLIO_HISTORY_DAYS, chunk_size=None,
+           min_coverage=None):
+    """
+    Pilih `top_n` ticker dengan Sharpe tertinggi. Ticker dengan data < `min_coverage` hari bursa dilewati.
+    Return dict: tickers, sharpe, mean (return harian), cov (Ledoit-Wolf harian), shrinkage, prices, screened, skipped.
+    """
+    tickers = list(tickers) if tickers else load_universe()
+    min_coverage = config.SCREENER_MIN_COVERAGE if min_coverage is None else min_coverage
+
+    with instrumentation.span('screener.screen', tickers=len(tickers)):
+        stats = RunningStats(len(tickers))
+        returns, last_prices, calendar = load_returns(tickers, days, chunk_size, stats)
+
+        sharpe = stats.sharpe()
+        covered = stats.count >= max(min_coverage * len(calendar), 2)
+        sharpe[~covered | np.isnan(last_prices)] = -np.inf
+
+        order = np.argsort(-sharpe, kind='stable')
+        top_idx = order[:top_n][np.isfinite(sharpe[order[:top_n]])]
+        if len(top_idx) == 0: return None
+
+        cov, shrinkage = ledoit_wolf_cov(returns[:, top_idx])
+    return {
+        'tickers': [tickers[i] for i in top_idx],
+        'sharpe': sharpe[top_idx],
+        'mean': stats.mean()[top_idx],
+        'cov': cov,
+        'shrinkage': shrinkage,
+        'prices': last_prices[top_idx],
+        'screened': int(covered.sum()),
+        'skipped': int(len(tickers) - covered.sum()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Screening saham IDX berdasarkan Sharpe Ratio")
+    parser.add_argument('--universe', help="CSV daftar kode saham (default config.IDX_UNIVERSE_FILE)")
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--days', type=int, default=config.PORTFOLIO_HISTORY_DAYS)
+    args = parser.parse_args()
+
+    result = screen(load_universe(args.universe), args.top, args.days)
+    if result is None:
+        print("Tidak ada saham dengan data yang cukup.")
+    else:
+        print(f"{result['screened']} saham di-screening, {result['skipped']} dilewati (data kurang); "
+              f"shrinkage kovarians {result['shrinkage']:.2f}")
+        volatility = np.sqrt(np.diag(result['cov']) * 252)
+        for ticker, sharpe, price, vol in zip(result['tickers'], result['sharpe'], result['prices'], volatility):
+            print(f"{ticker:<10} Sharpe {sharpe * np.sqrt(252):>6.2f}  Vol {vol * 100:>6.1f}%  Harga {price:>10,.0f}")
@@ -0,0 +1,192 @@
+import os
+import re
+import json
+import time
+import atexit
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+import numpy as np
+import config
+import instrumentation
+
+# Tambahan kata khas berita pasar yang tidak ada di kamus TextBlob
+FINANCE_LEXICON = {
+    'surge': 0.5, 'surges': 0.5, 'soar': 0.6, 'soars': 0.6, 'rally': 0.5, 'rallies': 0.5,
+    'gain': 0.3, 'gains': 0.3, 'jump': 0.4, 'jumps': 0.4, 'rise': 0.2, 'rises': 0.2,
+    'rebound': 0.3, 'rebounds': 0.3, 'profit': 0.3, 'profits': 0.3, 'upgrade': 0.4, 'bullish': 0.6,
+    'record': 0.2, 'beat': 0.3, 'beats': 0.3, 'dividend': 0.2, 'growth': 0.3,
+    'plunge': -0.6, 'plunges': -0.6, 'slump': -0.5, 'slumps': -0.5, 'fall': -0.3, 'falls': -0.3,
+    'drop': -0.3, 'drops': -0.3, 'decline': -0.3, 'declines': -0.3, 'loss': -0.4, 'losses': -0.4,
+    'downgrade': -0.4, 'bearish': -0.6, 'crash': -0.7, 'weaken': -0.3, 'weakens': -0.3,
+    'selloff': -0.5, 'default': -0.5, 'fraud': -0.7, 'miss': -0.3, 'misses': -0.3,
+}
+NEGATIONS = {'not', 'no', 'never', "n't", 'without'}
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalize(text):
+    """Judul berita -> bentuk baku (tanpa nama media di akhir, huruf kecil, tanpa tanda baca)"""
+    text = re.sub(r"\s+-\s+[^-]+$", "", text)  # Google News: "Judul - Nama Media"
+    return " ".join(_TOKEN_RE.findall(text.lower()))
+
+def text_key(text):
+    return hashlib.sha1(normalize(text).encode('utf-8')).hexdigest()[:16]
+
+
+# --- SCORER (bisa ditukar) ---
+class TextBlobScorer:
+    """Polaritas TextBlob, satu judul per panggilan"""
+    name = "textblob"
+
+    def score_batch(self, texts):
+        from textblob import TextBlob
+        return [float(TextBlob(text).sentiment.polarity) for text in texts]
+
+
+class LexiconScorer:
+    """
+    Polaritas berbasis kamus kata, dihitung untuk satu batch sekaligus dengan NumPy:
+    rata-rata polaritas kata yang dikenali, dibalik (x -0.5) jika didahului kata negasi.
+    """
+    name = "lexicon"
+
+    def __init__(self, lexicon=None):
+        if lexicon is None: lexicon = {**self._textblob_lexicon(), **FINANCE_LEXICON}
+        self.vocab = {word: i + 1 for i, word in enumerate(lexicon)}  # 0 = kata tak dikenal
+        self.polarity = np.zeros(len(lexicon) + 1)
+        self.polarity[1:] = list(lexicon.values())
+
+    @staticmethod
+    def _textblob_lexicon():
+        try:
+            from textblob.en import sentiment as textblob_sentiment
+            if hasattr(textblob_sentiment, 'load'): textblob_sentiment.load()
+            return {word: float(tags[None][0]) for word, tags in textblob_sentiment.items()
+                    if None in tags and tags[None][0] != 0}
+        except Exception:
+            return {}
+
+    def score_batch(self, texts):
+        if not texts: return []
+        tokens = [normalize(text).split() for text in texts]
+        lengths = np.array([len(t) for t in tokens])
+        flat = [word for t in tokens for word in t]
+        if not flat: return [0.0] * len(texts)
+
+        ids = np.array([self.vocab.get(word, 0) for word in flat])
+        negated = np.zeros(len(flat), dtype=bool)
+        negated[1:] = [word in NEGATIONS for word in flat[:-1]]
+        # Kata pertama sebuah judul tidak boleh ikut ter-negasi oleh kata terakhir judul sebelumnya
+        starts = np.cumsum(lengths)[:-1]
+        negated[starts[starts < len(flat)]] = False
+
+        weights = np.where(negated, -0.5, 1.0) * self.polarity[ids]
+        owner = np.repeat(np.arange(len(texts)), lengths)
+        total = np.bincount(owner, weights=weights, minlength=len(texts))
+        matched = np.bincount(owner, weights=(ids > 0).astype(float), minlength=len(texts))
+        return np.divide(total, matched, out=np.zeros(len(texts)), where=matched > 0).tolist()
+
+
+SCORERS = {'textblob': TextBlobScorer, 'lexicon': LexiconScorer}
+
+
+# --- ENGINE (dedup + memo) ---
+_engines = weakref.WeakSet()  # Semua engine hidup, supaya lock-nya bisa dibuat ulang setelah fork
+
+def _reset_after_fork():
+    # Worker ProcessPool di-fork dari thread lain; lock yang sedang dipegang saat fork tidak akan pernah dilepas
+    for engine in list(_engines): engine._lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class SentimentEngine:
+    """
+    Skor sentimen untuk batch judul berita. Judul yang sama (setelah normalisasi) hanya dihitung sekali,
+    hasilnya disimpan di LRU terbatas yang bisa ditulis ke disk.
+    """
+
+    def __init__(self, scorer=None, maxsize=config.SENTIMENT_CACHE_SIZE, cache_path=None, save_interval=60):
+        self.scorer = scorer if scorer is not None else TextBlobScorer()
+        self.maxsize = maxsize
+        self.cache_path = cache_path
+        self.save_interval = save_interval
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.time()
+        _engines.add(self)
+        if cache_path: self.load()
+
+    def score(self, texts):
+        """List polaritas, urutan sama dengan `texts`"""
+        keys = [text_key(text) for text in texts]
+        with self._lock:
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                elif key not in missing:
+                    missing[key] = text
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if len(keys) > len(missing): instrumentation.count('sentiment.cache_hit', len(keys) - len(missing))
+        if missing:
+            with instrumentation.span('sentiment.score', scorer=self.scorer.name, texts=len(missing)):
+                scores = self.scorer.score_batch(list(missing.values()))
+            with self._lock:
+                for key, score in zip(missing, scores): self._cache[key] = score
+                while len(self._cache) > self.maxsize: self._cache.popitem(last=False)
+                self._dirty = True
+
+        with self._lock:
+            result = [self._cache.get(key) for key in keys]
+        # Jika LRU lebih kecil dari batch, skor yang terbuang dihitung ulang
+        if any(score is None for score in result):
+            recompute = [i for i, score in enumerate(result) if score is None]
+            for i, score in zip(recompute, self.scorer.score_batch([texts[i] for i in recompute])): result[i] = score
+
+        if self.cache_path and time.time() - self._last_save > self.save_interval: self.save()
+        return result
+
+    def load(self, path=None):
+        path = path or self.cache_path
+        try:
+            with open(path) as f: data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('scorer') != self.scorer.name: return
+        with self._lock:
+            for key, score in data.get('scores', {}).items(): self._cache[key] = score
+            while len(self._cache) > self.maxsize: self._cache.popitem(last=False)
+
+    def save(self, path=None):
+        path = path or self.cache_path
+        if not path or not self._dirty: return
+        with self._lock:
+            data = {'scorer': self.scorer.name, 'scores': dict(self._cache)}
+            self._dirty = False
+            self._last_save = time.time()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f: json.dump(data, f)
+        os.replace(tmp_path, path)
+
+
+_engine = None
+
+def get_engine():
+    """Engine default sesuai config.SENTIMENT_SCORER, cache tersimpan di SENTIMENT_CACHE_DIR"""
+    global _engine
+    if _engine is None:
+        scorer = SCORERS[config.SENTIMENT_SCORER]()
+        cache_path = os.path.abspath(os.path.join(config.SENTIMENT_CACHE_DIR, f"{scorer.name}.json"))
+        _engine = SentimentEngine(scorer, cache_path=cache_path)
+        atexit.register(_engine.save)
+    return _engine
@@ -0,0 +1,179 @@
+"""
+Snapshot pasar bersama untuk semua sesi dashboard (satu objek per proses, lewat st.cache_resource).
+Riwayat harga disimpan sebagai array datetime64/float32 yang kontigu dan read-only; sesi hanya menerima view
+(tanpa salinan). Sinyal dan berita disimpan sebagai record ber-__slots__ yang ringan.
+"""
+import sys
+import time
+import threading
+from contextlib import contextmanager
+import numpy as np
+
+
+class NewsItem:
+    __slots__ = ('title', 'link', 'published')
+
+    def __init__(self, title, link, published):
+        self.title = title
+        self.link = link
+        self.published = published
+
+
+class NewsRecord:
+    __slots__ = ('keyword', 'score', 'label', 'items', 'loaded_at', 'version')
+
+    def __init__(self, keyword, score, label, items, version=0):
+        self.keyword = keyword
+        self.score = score
+        self.label = label
+        self.items = tuple(items)
+        self.loaded_at = time.time()
+        self.version = version
+
+
+class PriceSeries:
+    """Riwayat harga penutupan satu ticker: ds (datetime64[ns]) dan y (float32), keduanya read-only"""
+    __slots__ = ('ticker', 'ds', 'y', 'current', 'pred', 'loaded_at', 'version')
+
+    def __init__(self, ticker, ds, y, current, pred, version=0):
+        self.ticker = ticker
+        self.ds = _frozen(ds, 'datetime64[ns]')
+        self.y = _frozen(y, np.float32)
+        self.current = current
+        self.pred = pred
+        self.loaded_at = time.time()
+        self.version = version
+
+    def tail(self, n):
+        """View n titik terakhir (tanpa salinan)"""
+        return self.ds[-n:], self.y[-n:]
+
+
+class SignalRecord:
+    __slots__ = ('ticker', 'keyword', 'current', 'pred', 'sent_score', 'sent_label', 'signal', 'change', 'reason',
+                 'news')
+
+    def __init__(self, ticker, keyword, current, pred, sent_score, sent_label, signal, change, reason, news):
+        self.ticker = ticker
+        self.keyword = keyword
+        self.current = current
+        self.pred = pred
+        self.sent_score = sent_score
+        self.sent_label = sent_label
+        self.signal = signal
+        self.change = change
+        self.reason = reason
+        self.news = news
+
+
+def _frozen(values, dtype):
+    arr = np.ascontiguousarray(np.asarray(values).astype(dtype, copy=False))
+    arr.setflags(write=False)
+    return arr
+
+
+def _fresh(entry, version, ttl):
+    return entry is not None and entry.version == version and time.time() - entry.loaded_at < ttl
+
+
+class MarketSnapshot:
+    """
+    Cache bersama dengan TTL per lapisan: riwayat + prediksi per ticker, berita per keyword, sinyal per pasangan.
+    `version` (lihat dashboard.invalidate) yang berbeda membuat entri dimuat ulang. Satu loader per kunci
+    berjalan sekaligus; sesi lain yang meminta kunci yang sama menunggu hasilnya.
+    Entri yang melewati TTL dibuang (beserta sinyalnya), jadi ticker/keyword yang hanya sekali diketik tidak
+    menetap di memori proses. Semua perubahan dict lewat self._lock; lock per kunci dihitung pemakainya dan
+    dibuang begitu tidak ada yang memegang atau menunggunya.
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._news = {}
+        self._signals = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}  # kunci -> [Lock, jumlah thread yang memegang/menunggu]
+
+    @contextmanager
+    def _loading(self, key):
+        """Satu loader per kunci; lock dibuat saat dibutuhkan dan dibuang saat pemakai terakhir selesai"""
+        with self._lock:
+            slot = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]: yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0: del self._key_locks[key]
+
+    def _expire(self, ttl, **layers):
+        """Buang entri layer (series / news) yang lebih tua dari ttl dan sinyal yang entrinya sudah dibuang/diganti"""
+        now = time.time()
+        with self._lock:
+            for entries in layers.values():
+                for key in [k for k, entry in entries.items() if now - entry.loaded_at >= ttl]: del entries[key]
+            for key in [k for k, (series, news, _) in self._signals.items()
+                        if self._series.get(k[0]) is not series or self._news.get(k[1]) is not news]:
+                del self._signals[key]
+
+    def get_series(self, ticker, loader, ttl, version=0):
+        """PriceSeries ticker; loader(ticker) -> (df ds/y, current, pred) dipanggil jika kadaluarsa. None jika gagal"""
+        self._expire(ttl, series=self._series)
+        entry = self._series.get(ticker)
+        if _fresh(entry, version, ttl): return entry
+        with self._loading(('series', ticker)):
+            entry = self._series.get(ticker)
+            if _fresh(entry, version, ttl): return entry
+            df, current, pred = loader(ticker)
+            if df is None: return None
+            entry = PriceSeries(ticker, df['ds'].to_numpy(), df['y'].to_numpy(), current, pred, version)
+            with self._lock: self._series[ticker] = entry
+            return entry
+
+    def get_news(self, keyword, loader, ttl, version=0):
+        """NewsRecord keyword; loader(keyword) -> (score, label, news_list)"""
+        self._expire(ttl, news=self._news)
+        entry = self._news.get(keyword)
+        if _fresh(entry, version, ttl): return entry
+        with self._loading(('news', keyword)):
+            entry = self._news.get(keyword)
+            if _fresh(entry, version, ttl): return entry
+            score, label, news_list = loader(keyword)
+            items = [NewsItem(n.get('title', ''), n.get('link', ''), n.get('published', '')) for n in news_list]
+            entry = NewsRecord(keyword, score, label, items, version)
+            with self._lock: self._news[keyword] = entry
+            return entry
+
+    def get_signal(self, series, news, signal_func):
+        """SignalRecord untuk pasangan (series, news); dihitung ulang hanya jika salah satunya dimuat ulang"""
+        key = (series.ticker, news.keyword)
+        cached = self._signals.get(key)
+        if cached is not None and cached[0] is series and cached[1] is news: return cached[2]
+        signal, change, reason = signal_func(series.current, series.pred, news.score)
+        record = SignalRecord(series.ticker, news.keyword, series.current, series.pred, news.score, news.label,
+                              signal, change, reason, news.items)
+        with self._lock: self._signals[key] = (series, news, record)
+        return record
+
+    def memory_report(self):
+        """Perkiraan ukuran snapshot (byte): array harga, record berita, dan record sinyal"""
+        with self._lock:
+            series, news = list(self._series.values()), list(self._news.values())
+            records = [entry[2] for entry in self._signals.values()]
+        array_bytes = sum(s.ds.nbytes + s.y.nbytes for s in series)
+        news_bytes = sum(
+            sys.getsizeof(n) + sys.getsizeof(n.items) + sum(
+                sys.getsizeof(item) + sys.getsizeof(item.title) + sys.getsizeof(item.link) + sys.getsizeof(item.published)
+                for item in n.items)
+            for n in news)
+        record_bytes = sum(sys.getsizeof(s) for s in series) + sum(
+            sys.getsizeof(record) for record in records)
+        return {
+            'tickers': len(series),
+            'keywords': len(news),
+            'points': sum(len(s.y) for s in series),
+            'array_bytes': array_bytes,
+            'news_bytes': news_bytes,
+            'record_bytes': record_bytes,
+            'total_bytes': array_bytes + news_bytes + record_bytes,
+        }
@@ -0,0 +1,301 @@
+"""
+Mode sinyal intraday berbasis aliran harga (tanpa fit ulang Prophet per tick).
+
+    python streaming.py --replay ticks.csv [--speed 60]         # putar ulang file tick (ts,ticker,price)
+    python streaming.py --socket 127.0.0.1:9009                 # baca tick dari socket (satu baris per tick)
+    python streaming.py --serve ticks.csv --port 9009 [--speed 60]  # pengganti feed live: kirim file lewat socket
+
+Baseline tiap ticker diambil sekali per hari dari model harian s/d penutupan kemarin (cache model),
+lalu digeser mengikuti EWMA harga intraday. Sinyal dievaluasi ulang tiap STREAM_EVAL_INTERVAL_SECONDS
+dan hanya perubahan sinyal yang dikirim sebagai event ke subscriber (CLI, file JSONL untuk dashboard, dll).
+"""
+import os
+import json
+import math
+import time
+import socket
+import argparse
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import pandas as pd
+import config
+import market_analysis
+import instrumentation
+
+MARKET_TZ = ZoneInfo(config.MARKET_TIMEZONE)
+
+
+def _as_market_time(ts):
+    """str / datetime / Timestamp -> datetime di zona waktu bursa (tanpa zona dianggap jam lokal bursa)"""
+    if isinstance(ts, str): ts = datetime.fromisoformat(ts)
+    elif isinstance(ts, pd.Timestamp): ts = ts.to_pydatetime()
+    if ts.tzinfo is None: return ts.replace(tzinfo=MARKET_TZ)
+    return ts.astimezone(MARKET_TZ)
+
+def in_session(ts):
+    """True jika `ts` berada di dalam sesi perdagangan IDX (Senin-Jumat)"""
+    ts = _as_market_time(ts)
+    if ts.weekday() >= 5: return False
+    sessions = config.IDX_SESSIONS_FRIDAY if ts.weekday() == 4 else config.IDX_SESSIONS
+    clock = ts.strftime("%H:%M")
+    return any(start <= clock < end for start, end in sessions)
+
+
+def _parse_line(line):
+    """Satu baris tick: JSON {"ts", "ticker", "price"} atau CSV ts,ticker,price"""
+    line = line.strip()
+    if not line: return None
+    if line.startswith("{"):
+        data = json.loads(line)
+        return {'ts': _as_market_time(data['ts']), 'ticker': data['ticker'], 'price': float(data['price'])}
+    ts, ticker, price = line.split(",")[:3]
+    if ts == 'ts': return None  # header CSV
+    return {'ts': _as_market_time(ts), 'ticker': ticker, 'price': float(price)}
+
+
+# --- FEED (bisa ditukar) ---
+class ReplayFeed:
+    """Putar ulang file CSV tick (kolom ts, ticker, price). speed=60 -> 1 menit data per detik; None = secepatnya"""
+
+    def __init__(self, path, speed=None, tickers=None):
+        self.path = path
+        self.speed = speed
+        self.tickers = set(tickers) if tickers else None
+
+    def __iter__(self):
+        df = pd.read_csv(self.path, parse_dates=['ts'])
+        if self.tickers: df = df[df['ticker'].isin(self.tickers)]
+        previous = None
+        for ts, ticker, price in zip(df['ts'], df['ticker'], df['price']):
+            ts = _as_market_time(ts)
+            if self.speed and previous is not None:
+                time.sleep(max((ts - previous).total_seconds(), 0) / self.speed)
+            previous = ts
+            yield {'ts': ts, 'ticker': ticker, 'price': float(price)}
+
+
+class SocketFeed:
+    """Tick dari socket TCP, satu baris per tick (format _parse_line); berhenti saat koneksi ditutup"""
+
+    def __init__(self, host, port, timeout=None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def __iter__(self):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as conn:
+            with conn.makefile('r', encoding='utf-8') as lines:
+                for line in lines:
+                    try:
+                        tick = _parse_line(line)
+                    except (ValueError, KeyError) as e:
+                        instrumentation.error('stream.parse', e)
+                        continue
+                    if tick is not None: yield tick
+
+
+def serve_replay(path, host="127.0.0.1", port=9009, speed=None, ready=None):
+    """Server pengganti feed live: setiap klien yang terhubung menerima isi file tick sebagai baris JSON"""
+    with socket.create_server((host, port)) as server:
+        if ready is not None: ready.set()
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    for tick in ReplayFeed(path, speed):
+                        line = json.dumps({**tick, 'ts': tick['ts'].isoformat()}) + "\n"
+                        conn.sendall(line.encode('utf-8'))
+                except OSError:
+                    continue  # Klien memutus koneksi
+
+
+# --- ENGINE ---
+def _default_baseline(ticker, day):
+    """
+    (penutupan kemarin, prediksi hari `day`) dari model harian; memakai cache model jika data harian belum berubah.
+    Bar bertanggal `day` (bar parsial selama jam bursa) dibuang agar titik acuan EWMA = penutupan sebelumnya.
+    """
+    _, current, pred = market_analysis.get_technical_forecast(ticker, before=day)
+    if current is None: return None
+    return current, pred
+
+def _default_sentiment(keyword):
+    if not keyword: return 0.0
+    return market_analysis.get_news_sentiment(keyword)[0]
+
+
+class IntradayEngine:
+    """
+    Memperbarui input get_hybrid_signal secara inkremental per tick:
+    - baseline = prediksi harian + (EWMA harga intraday - penutupan kemarin)
+    - volatilitas = EWMA kuadrat log-return per tick
+    - sentimen di-refresh tiap STREAM_SENTIMENT_REFRESH_SECONDS
+    Event dikirim ke subscriber hanya jika sinyal berubah.
+    baseline_provider(ticker, day) -> (penutupan kemarin, prediksi) atau None; sentiment_provider(keyword) -> skor.
+    """
+
+    def __init__(self, keywords=None, eval_interval=None, span=None, sentiment_refresh=None,
+                 baseline_provider=None, sentiment_provider=None, trading_hours_only=True):
+        self.keywords = keywords if keywords is not None else {
+            info['ticker']: info['keyword'] for info in config.ASSETS.values()}
+        self.eval_interval = config.STREAM_EVAL_INTERVAL_SECONDS if eval_interval is None else eval_interval
+        self.alpha = 2 / ((span or config.STREAM_EWMA_SPAN) + 1)
+        self.sentiment_refresh = sentiment_refresh or config.STREAM_SENTIMENT_REFRESH_SECONDS
+        self.baseline_provider = baseline_provider or _default_baseline
+        self.sentiment_provider = sentiment_provider or _default_sentiment
+        self.trading_hours_only = trading_hours_only
+        self.states = {}
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """callback(event) dipanggil untuk setiap perubahan sinyal"""
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def _emit(self, event):
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                instrumentation.error('stream.subscriber', e, ticker=event['ticker'])
+
+    def _prime(self, ticker, day):
+        """
+        State awal ticker untuk satu hari bursa; baseline dari model harian (sekali per hari).
+        Tanpa baseline: state kosong (prev_close None) agar ticker dilewati sampai hari berikutnya.
+        """
+        with instrumentation.span('stream.prime', ticker=ticker):
+            baseline = self.baseline_provider(ticker, day)
+        if baseline is None or not baseline[0] > 0:
+            instrumentation.count('stream.no_baseline', ticker=ticker)
+            return {'day': day, 'prev_close': None}
+        prev_close, pred = baseline
+        return {
+            'day': day, 'prev_close': prev_close, 'pred': pred,
+            'ewma': prev_close, 'variance': 0.0, 'last_price': prev_close, 'ticks': 0,
+            'last_eval': None, 'signal': None, 'sentiment': None, 'sentiment_at': None,
+        }
+
+    def _sentiment(self, state, ticker, now):
+        if state['sentiment_at'] is None or (now - state['sentiment_at']).total_seconds() >= self.sentiment_refresh:
+            state['sentiment'] = self.sentiment_provider(self.keywords.get(ticker))
+            state['sentiment_at'] = now
+        return state['sentiment']
+
+    def on_tick(self, tick):
+        """Proses satu tick; return event jika sinyal berubah, selain itu None"""
+        ts, ticker, price = _as_market_time(tick['ts']), tick['ticker'], tick['price']
+        # Tick rusak (harga 0 / negatif / NaN) dilewati agar log-return tidak mematikan stream
+        if not (math.isfinite(price) and price > 0):
+            instrumentation.count('stream.bad_price', ticker=ticker)
+            return None
+        if self.trading_hours_only and not in_session(ts):
+            instrumentation.count('stream.off_hours')
+            return None
+
+        state = self.states.get(ticker)
+        if state is None or state['day'] != ts.date():
+            state = self._prime(ticker, ts.date())
+            self.states[ticker] = state
+        if state['prev_close'] is None: return None
+
+        # Statistik bergulir: O(1) per tick
+        log_return = math.log(price / state['last_price'])
+        state['ewma'] += self.alpha * (price - state['ewma'])
+        state['variance'] = (1 - self.alpha) * state['variance'] + self.alpha * log_return ** 2
+        state['last_price'] = price
+        state['ticks'] += 1
+
+        if state['last_eval'] is not None and (ts - state['last_eval']).total_seconds() < self.eval_interval:
+            return None
+        state['last_eval'] = ts
+
+        baseline = state['pred'] + (state['ewma'] - state['prev_close'])
+        sentiment_score = self._sentiment(state, ticker, ts)
+        signal, change, reason = market_analysis.get_hybrid_signal(price, baseline, sentiment_score)
+        if signal == state['signal']: return None
+
+        event = {
+            'type': 'signal', 'ts': ts.isoformat(), 'ticker': ticker, 'price': price,
+            'baseline': baseline, 'ewma': state['ewma'], 'volatility': math.sqrt(state['variance']),
+            'sentiment': sentiment_score, 'signal': signal, 'change': change, 'reason': reason,
+            'previous': state['signal'],
+        }
+        state['signal'] = signal
+        instrumentation.count('stream.signal_change', ticker=ticker)
+        self._emit(event)
+        return event
+
+    def run(self, feed):
+        """Konsumsi feed sampai habis; return jumlah event"""
+        events = 0
+        for tick in feed:
+            if self.on_tick(tick) is not None: events += 1
+        return events
+
+
+# --- SUBSCRIBER ---
+def print_event(event):
+    previous = event['previous'] or "-"
+    print(f"{event['ts'][:19]}  {event['ticker']:<10} {event['price']:>12,.2f}  {previous} -> {event['signal']}"
+          f"  ({event['change']}, {event['reason']})", flush=True)
+
+
+class JsonlWriter:
+    """Subscriber yang menambahkan event ke file JSONL (dibaca dashboard lewat read_events)"""
+
+    def __init__(self, path=None):
+        self.path = path or config.STREAM_EVENTS_FILE
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    def __call__(self, event):
+        with self._lock:
+            with open(self.path, 'a') as f: f.write(json.dumps(event) + "\n")
+
+
+def read_events(path=None, ticker=None, limit=20):
+    """Event terbaru dulu dari file JSONL; filter opsional per ticker"""
+    path = path or config.STREAM_EVENTS_FILE
+    try:
+        with open(path) as f: events = [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        return []
+    if ticker is not None: events = [e for e in events if e['ticker'] == ticker]
+    return events[::-1][:limit]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sinyal intraday dari aliran harga")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--replay', help="File CSV tick (ts,ticker,price)")
+    source.add_argument('--socket', help="host:port feed tick")
+    source.add_argument('--serve', help="Kirim file CSV tick lewat socket (pengganti feed live)")
+    parser.add_argument('--port', type=int, default=9009, help="Port untuk --serve")
+    parser.add_argument('--speed', type=float, help="Kecepatan replay (60 = 1 menit data per detik)")
+    parser.add_argument('--tickers', nargs='+', help="Hanya ticker ini (untuk --replay)")
+    parser.add_argument('--events-file', default=config.STREAM_EVENTS_FILE, help="File JSONL event untuk dashboard")
+    parser.add_argument('--all-hours', action='store_true', help="Jangan buang tick di luar jam bursa")
+    args = parser.parse_args()
+
+    if args.serve:
+        print(f"Mengirim {args.serve} di 127.0.0.1:{args.port} ...")
+        serve_replay(args.serve, port=args.port, speed=args.speed)
+    else:
+        if args.replay:
+            feed = ReplayFeed(args.replay, args.speed, args.tickers)
+        else:
+            host, port = args.socket.rsplit(":", 1)
+            feed = SocketFeed(host, int(port))
+        engine = IntradayEngine(trading_hours_only=not args.all_hours)
+        engine.subscribe(print_event)
+        engine.subscribe(JsonlWriter(args.events_file))
+        try:
+            total = engine.run(feed)
+            print(f"Selesai: {total} perubahan sinyal")
+        except KeyboardInterrupt:
+            pass
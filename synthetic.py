@@ -0,0 +1,152 @@
+"""
+Data sintetis deterministik untuk benchmark dan uji offline: harga OHLCV, feed RSS, dan server RSS lokal.
+Seed yang sama selalu menghasilkan data yang sama.
+"""
+import os
+import zlib
+import hashlib
+import threading
+from contextlib import contextmanager
+from email.utils import format_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+import numpy as np
+import pandas as pd
+
+
+def _seed(*parts):
+    return zlib.crc32("|".join(map(str, parts)).encode())
+
+
+# --- HARGA ---
+def ohlcv(num_days=250, seed=0, start_price=None, end=None):
+    """
+    Riwayat OHLCV harian (hari bursa) yang berakhir di `end` (default hari ini):
+    random walk geometrik + pola mingguan ringan, seperti harga saham/forex.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or pd.Timestamp.today()).normalize()
+    dates = pd.bdate_range(end=end, periods=num_days, name='Date')
+
+    start_price = start_price or float(rng.choice([15.0, 9000.0, 16000.0, 4500.0, 250.0]))
+    drift = rng.normal(0.0003, 0.0004)
+    vol = rng.uniform(0.005, 0.025)
+    weekly = 0.002 * np.sin(2 * np.pi * dates.dayofweek.to_numpy() / 5)
+    log_returns = drift + weekly + rng.normal(0, vol, num_days)
+    close = start_price * np.exp(np.cumsum(log_returns))
+
+    open_ = close * np.exp(rng.normal(0, vol / 3, num_days))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, vol / 2, num_days)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, vol / 2, num_days)))
+    volume = rng.lognormal(15, 1, num_days).round()
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=dates)
+
+def universe(num_tickers, num_days=250, seed=0, suffix=".JK"):
+    """dict ticker -> OHLCV untuk `num_tickers` ticker sintetis (SYN0000.JK, ...)"""
+    return {f"SYN{i:04d}{suffix}": ohlcv(num_days, seed=_seed(seed, i)) for i in range(num_tickers)}
+
+def synthetic_returns(num_assets, num_days=125, seed=0):
+    """Return harian sintetis berkorelasi (model 1 faktor pasar)"""
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0003, 0.01, num_days)
+    beta = rng.uniform(0.5, 1.5, num_assets)
+    drift = rng.normal(0.0004, 0.0006, num_assets)
+    noise = rng.normal(0, 0.015, (num_days, num_assets))
+    data = drift + np.outer(market, beta) + noise
+    return pd.DataFrame(data, columns=[f"SYN{i:04d}.JK" for i in range(num_assets)])
+
+def intraday_ticks(frames, date=None, interval_minutes=1, seed=0):
+    """
+    Tick harga intraday (kolom ts, ticker, price) selama jam bursa IDX pada `date` (default hari bursa berikutnya),
+    melanjutkan harga penutupan terakhir tiap ticker di `frames`.
+    """
+    date = pd.Timestamp(date) if date is not None else pd.bdate_range(
+        start=max(df.index[-1] for df in frames.values()) + pd.Timedelta(days=1), periods=1)[0]
+    sessions = [("09:00", "11:30"), ("14:00", "15:50")] if date.dayofweek == 4 else [("09:00", "12:00"), ("13:30", "15:50")]
+    times = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(f"{date.date()} {start}", f"{date.date()} {end}", freq=f"{interval_minutes}min", inclusive='left')
+        for start, end in sessions]))
+
+    parts = []
+    for i, (ticker, df) in enumerate(frames.items()):
+        rng = np.random.default_rng(_seed(seed, ticker, date.date()))
+        drift = rng.normal(0, 0.0004)
+        price = float(df['Close'].iloc[-1]) * np.exp(np.cumsum(drift + rng.normal(0, 0.0008, len(times))))
+        parts.append(pd.DataFrame({'ts': times, 'ticker': ticker, 'price': price}))
+    return pd.concat(parts).sort_values(['ts', 'ticker'], kind='stable').reset_index(drop=True)
+
+def write_price_fixtures(directory, frames):
+    """Tulis dict ticker -> OHLCV sebagai CSV (format price_store.FixtureSource)"""
+    os.makedirs(directory, exist_ok=True)
+    for ticker, df in frames.items():
+        df.to_csv(os.path.join(directory, f"{ticker}.csv"))
+
+
+# --- BERITA ---
+_SUBJECTS = ["Bank BRI", "Telkom", "Rupiah", "IHSG", "Bank Mandiri", "BCA", "Yen", "Won", "GoTo", "Astra"]
+_POSITIVE = ["surges on strong earnings", "rallies as investors cheer record profit", "gains after upgrade",
+             "jumps on great dividend outlook", "rebounds with solid growth"]
+_NEGATIVE = ["plunges amid weak outlook", "falls after bad quarterly loss", "slumps on downgrade",
+             "drops as fraud probe widens", "declines on terrible guidance"]
+_NEUTRAL = ["trades flat ahead of central bank meeting", "holds steady", "unchanged as market waits for data"]
+_SOURCES = ["Reuters", "Bloomberg", "Kontan", "CNBC Indonesia", "Jakarta Globe"]
+
+def headlines(num_items=20, seed=0):
+    rng = np.random.default_rng(seed)
+    items = []
+    for _ in range(num_items):
+        phrases = [_POSITIVE, _NEGATIVE, _NEUTRAL][rng.integers(3)]
+        items.append(f"{rng.choice(_SUBJECTS)} {rng.choice(phrases)} - {rng.choice(_SOURCES)}")
+    return items
+
+def rss_feed(keyword, num_items=20, seed=0, now=None):
+    """XML RSS 2.0 bergaya Google News untuk satu keyword"""
+    now = pd.Timestamp(now or "2026-01-02 09:00", tz="UTC")
+    rng_seed = _seed(seed, keyword)
+    items = []
+    for i, title in enumerate(headlines(num_items, rng_seed)):
+        published = format_datetime((now - pd.Timedelta(minutes=37 * i)).to_pydatetime())
+        link = f"https://news.example.com/{rng_seed}/{i}"
+        items.append(f"<item><title>{escape(title)}</title><link>{link}</link>"
+                     f"<pubDate>{published}</pubDate></item>")
+    return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>{escape(keyword)} - Google News</title>{''.join(items)}</channel></rss>")
+
+
+@contextmanager
+def serve_rss(num_items=20, seed=0):
+    """
+    Server RSS lokal (thread) untuk uji offline. Menghasilkan url_template untuk config.NEWS_RSS_URL.
+    Mendukung ETag / If-None-Match (304) seperti feed asli.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive seperti server feed asli
+
+        def do_GET(self):
+            keyword = parse_qs(urlparse(self.path).query).get('q', [''])[0]
+            body = rss_feed(keyword, num_items, seed).encode('utf-8')
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/rss?q={{query}}"
+    finally:
+        server.shutdown()
+        server.server_close()
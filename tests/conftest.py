@@ -0,0 +1,25 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import price_store
+import model_cache
+import news_fetcher
+import insta_uploader
+
+
+@pytest.fixture(autouse=True)
+def workspace(tmp_path, monkeypatch):
+    """Setiap tes di folder kosong: semua path data/ relatif (store, cache, outbox) jatuh ke tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    price_store.set_store(None)
+    model_cache.set_cache(None)
+    news_fetcher.clear_cache()
+    insta_uploader.set_client(None)
+    yield tmp_path
+    price_store.set_store(None)
+    model_cache.set_cache(None)
+    news_fetcher.clear_cache()
+    insta_uploader.set_client(None)
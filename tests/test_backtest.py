@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+import config
+import price_store
+import backtest
+import synthetic
+
+
+def test_summary_per_signal_class():
+    trades = pd.DataFrame({
+        'date': pd.date_range('2026-10-05', periods=5),
+        'signal': ['BUY', 'BUY', 'SELL', 'BUY', 'HOLD'],
+        'position': [1, 1, -1, 1, 0],
+        'next_return': [0.10, -0.20, -0.05, 0.10, 0.03],
+    })
+    trades['strategy_return'] = trades['position'] * trades['next_return']
+    trades['hit'] = np.where(trades['position'] != 0, np.sign(trades['next_return']) == trades['position'], np.nan)
+    summary = backtest.summarize(trades)
+
+    assert list(summary.index) == ['BUY', 'HOLD', 'SELL']
+    buy = summary.loc['BUY']
+    assert buy['count'] == 3
+    assert buy['hit_rate'] == pytest.approx(2 / 3)
+    assert buy['total_return'] == pytest.approx(1.1 * 0.8 * 1.1 - 1)
+    assert buy['max_drawdown'] == pytest.approx(0.8 - 1)
+    assert summary.loc['SELL', 'total_return'] == pytest.approx(0.05)
+    assert np.isnan(summary.loc['HOLD', 'hit_rate'])
+
+
+def _run(frames, root):
+    price_store.set_store(price_store.PriceStore(root=str(root), source=price_store.FrameSource(frames)))
+    return backtest.run_backtest(list(frames), steps=40, window_steps=15, max_workers=2)
+
+
+def test_walk_forward_uses_only_past_prices(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, 'FORECAST_BACKEND', 'holt')
+    end = pd.Timestamp.today().normalize()
+    frames = {'AAA.JK': synthetic.ohlcv(500, seed=1, end=end), 'BBB.JK': synthetic.ohlcv(500, seed=2, end=end)}
+    trades, summary = _run(frames, tmp_path / "first")
+
+    assert sorted(trades.groupby('ticker').size().to_dict().items()) == [('AAA.JK', 40), ('BBB.JK', 40)]
+    assert summary['count'].sum() == 80
+    assert trades.groupby('ticker')['date'].is_monotonic_increasing.all()
+
+    # Harga 10 hari terakhir diubah: prediksi hari-hari sebelumnya tidak boleh ikut berubah
+    changed = {t: df.copy() for t, df in frames.items()}
+    for df in changed.values(): df.iloc[-10:, :] *= 1.5
+    again, _ = _run(changed, tmp_path / "second")
+    before = trades['date'] < frames['AAA.JK'].index[-11]
+    assert (trades.loc[before, 'pred'].to_numpy() == again.loc[before, 'pred'].to_numpy()).all()
+    assert (trades.loc[~before, 'pred'].to_numpy() != again.loc[~before, 'pred'].to_numpy()).any()
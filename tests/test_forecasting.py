@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import config
+import forecasting
+import market_analysis
+import price_store
+import synthetic
+
+
+def _frame(num_days, seed=0):
+    df = synthetic.ohlcv(num_days, seed=seed)
+    return pd.DataFrame({'ds': df.index, 'y': df['Close'].values})
+
+
+def test_holt_short_series_returns_none():
+    backend = forecasting.get_backend('holt')
+    preds = backend.forecast_many({'SHORT': _frame(2), 'EMPTY': _frame(0), 'LONG': _frame(120)})
+    assert preds['SHORT'] is None
+    assert preds['EMPTY'] is None
+    assert np.isfinite(preds['LONG'])
+
+
+def test_holt_batch_matches_single_forecasts():
+    backend = forecasting.get_backend('holt')
+    frames = {f"T{i}": _frame(60 + 30 * i, seed=i) for i in range(4)}
+    batch = backend.forecast_many(frames)
+    for ticker, df in frames.items():
+        assert np.isclose(batch[ticker], backend.forecast(ticker, df))
+
+
+def test_technical_forecast_with_short_history_fails_cleanly(monkeypatch):
+    monkeypatch.setattr(config, 'FORECAST_BACKEND', 'holt')
+    price_store.set_store(price_store.PriceStore(source=price_store.FrameSource({'NEW.JK': synthetic.ohlcv(2)})))
+    assert market_analysis.get_technical_forecast('NEW.JK') == (None, None, None)
+    assert market_analysis.get_technical_forecast_many(['NEW.JK'])['NEW.JK'] == (None, None, None)
+
+
+def test_walk_forward_uses_only_past_data():
+    backend = forecasting.get_backend('holt')
+    history = _frame(200, seed=5)
+    rows = list(range(150, 160))
+    preds = backend.walk_forward(history, rows)
+    for row, pred in zip(rows, preds):
+        expected = backend.forecast('X', history.iloc[forecasting._lookback_start(history['ds'].to_numpy(), row):row + 1])
+        assert np.isclose(pred, expected)
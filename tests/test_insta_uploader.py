@@ -0,0 +1,104 @@
+import os
+import pytest
+from PIL import Image
+import config
+import insta_uploader
+
+
+def _images(tmp_path, count, size=(1600, 1200)):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"page_{i}.png"
+        Image.new('RGB', size, (i * 20 % 255, 80, 120)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def test_retry_with_exponential_backoff(tmp_path):
+    client = insta_uploader.FakeClient(fail_times=2)
+    sleeps = []
+    queue = insta_uploader.UploadQueue(client, max_retries=3, backoff=5, sleep=sleeps.append)
+    results = queue.add(_images(tmp_path, 1), "caption").run()
+
+    assert results[0]['status'] == 'ok'
+    assert results[0]['attempts'] == 3
+    assert sleeps == [5, 10]
+    assert queue.pending == []
+    assert len(client.uploads) == 1 and client.uploads[0]['kind'] == 'photo'
+
+
+def test_failed_post_stays_in_queue(tmp_path):
+    client = insta_uploader.FakeClient(fail_times=10)
+    queue = insta_uploader.UploadQueue(client, max_retries=2, backoff=0, sleep=lambda s: None)
+    results = queue.add(_images(tmp_path, 1), "caption").run()
+
+    assert results[0]['status'] == 'failed'
+    assert len(queue.pending) == 1
+    client.fail_times = 0
+    assert queue.run()[0]['status'] == 'ok'
+
+
+def test_carousel_is_split_at_the_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'UPLOAD_MAX_CAROUSEL', 10)
+    client = insta_uploader.FakeClient()
+    media_ids = insta_uploader.upload_images(_images(tmp_path, 12), "caption", client)
+
+    assert len(media_ids) == 2
+    assert [upload['kind'] for upload in client.uploads] == ['album', 'album']
+    assert [len(upload['paths']) for upload in client.uploads] == [10, 2]
+
+
+def test_images_are_recompressed_once(tmp_path):
+    path = _images(tmp_path, 1)[0]
+    first = insta_uploader.prepare_image(path)
+    second = insta_uploader.prepare_image(path)
+
+    assert first == second and first.endswith(".jpg")
+    with Image.open(first) as img:
+        assert img.format == 'JPEG'
+        assert max(img.size) == config.UPLOAD_MAX_SIDE_PX
+
+
+def test_upload_images_raises_when_post_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'UPLOAD_MAX_RETRIES', 2)
+    monkeypatch.setattr(config, 'UPLOAD_BACKOFF_SECONDS', 0)
+    client = insta_uploader.FakeClient(fail_times=2)
+    with pytest.raises(RuntimeError):
+        insta_uploader.upload_images(_images(tmp_path, 1), "caption", client)
+
+
+def test_failed_post_is_sent_by_the_next_run(tmp_path):
+    pending_file = str(tmp_path / "pending.json")
+    images = _images(tmp_path, 2)
+    client = insta_uploader.FakeClient(fail_times=10)
+    queue = insta_uploader.UploadQueue(client, max_retries=1, pending_file=pending_file)
+    assert queue.add(images, "caption").run()[0]['status'] == 'failed'
+
+    # Proses baru: antrian dibaca dari disk
+    client.fail_times = 0
+    queue = insta_uploader.UploadQueue(client, max_retries=1, pending_file=pending_file)
+    assert [post['caption'] for post in queue.pending] == ["caption"]
+    assert queue.run()[0]['status'] == 'ok'
+    assert insta_uploader.UploadQueue(client, pending_file=pending_file).pending == []
+
+
+def test_retried_upload_replaces_pending_post(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'UPLOAD_PENDING_FILE', str(tmp_path / "pending.json"))
+    monkeypatch.setattr(config, 'UPLOAD_BACKOFF_SECONDS', 0)
+    images = _images(tmp_path, 2)
+    client = insta_uploader.FakeClient(fail_times=config.UPLOAD_MAX_RETRIES)
+    with pytest.raises(RuntimeError):
+        insta_uploader.upload_images(images, "first", client)
+
+    assert insta_uploader.upload_images(images, "second", client) == ["fake_1"]
+    assert [upload['caption'] for upload in client.uploads] == ["second"]
+
+
+def test_pending_post_with_missing_images_is_dropped(tmp_path):
+    pending_file = str(tmp_path / "pending.json")
+    images = _images(tmp_path, 1)
+    queue = insta_uploader.UploadQueue(insta_uploader.FakeClient(fail_times=10), max_retries=1,
+                                       pending_file=pending_file)
+    queue.add(images, "caption").run()
+    os.remove(images[0])
+    assert insta_uploader.UploadQueue(insta_uploader.FakeClient(), pending_file=pending_file).pending == []
@@ -0,0 +1,55 @@
+import os
+import time
+import pandas as pd
+import config
+import forecasting
+import model_cache
+import synthetic
+
+
+def _frame(days, seed=1):
+    hist = synthetic.ohlcv(days, seed=seed, end=pd.Timestamp('2026-10-16'))
+    return pd.DataFrame({'ds': hist.index, 'y': hist['Close'].values})
+
+
+def _fit_events(backend, ticker, df):
+    before = model_cache.get_stats()
+    backend.forecast(ticker, df)
+    return [event for event, count in model_cache.get_stats().items() if count > before[event]]
+
+
+def test_hit_warm_and_cold_fits_are_counted():
+    backend = forecasting.ProphetBackend()
+    df = _frame(200)
+    assert _fit_events(backend, 'AAA.JK', df.iloc[:-(config.WARM_START_MAX_NEW_ROWS + 2)]) == ['cold_fit']
+    assert _fit_events(backend, 'AAA.JK', df.iloc[:-(config.WARM_START_MAX_NEW_ROWS + 2)]) == ['hit']
+    # Beberapa bar baru -> lanjut dari parameter lama; terlalu banyak bar baru -> fit dari nol
+    assert _fit_events(backend, 'AAA.JK', df.iloc[:-(config.WARM_START_MAX_NEW_ROWS + 1)]) == ['warm_fit']
+    assert _fit_events(backend, 'AAA.JK', df) == ['cold_fit']
+    # Ticker lain tidak memakai model AAA
+    assert _fit_events(backend, 'BBB.JK', df) == ['cold_fit']
+
+
+def _write_entry(cache, ticker, size, age_seconds):
+    base = cache._base(ticker)
+    with open(base + ".json", 'w') as f: f.write("x" * size)
+    with open(base + ".meta.json", 'w') as f: f.write('{"fingerprint": "x"}')
+    mtime = time.time() - age_seconds
+    os.utime(base + ".meta.json", (mtime, mtime))
+
+
+def test_expired_models_are_evicted(tmp_path):
+    cache = model_cache.ModelCache(root=str(tmp_path / "models"), max_age_days=1)
+    _write_entry(cache, 'OLD.JK', 10, 2 * 86400)
+    _write_entry(cache, 'NEW.JK', 10, 60)
+    assert cache.load_meta('OLD.JK') is None
+    cache.evict()
+    assert sorted(os.listdir(cache.root)) == ['NEW.JK.json', 'NEW.JK.meta.json']
+
+
+def test_oldest_models_are_evicted_above_size_limit(tmp_path):
+    cache = model_cache.ModelCache(root=str(tmp_path / "models"), max_bytes=2500)
+    for i, ticker in enumerate(['A.JK', 'B.JK', 'C.JK', 'D.JK']):
+        _write_entry(cache, ticker, 1000, 400 - i * 100)
+    cache.evict()
+    assert sorted(os.listdir(cache.root)) == ['C.JK.json', 'C.JK.meta.json', 'D.JK.json', 'D.JK.meta.json']
@@ -0,0 +1,55 @@
+import config
+import instrumentation
+import news_fetcher
+import synthetic
+
+
+def _counter(name):
+    return instrumentation.get_counters().get(name, 0)
+
+
+def test_fetch_many_reuses_cache_within_ttl():
+    with synthetic.serve_rss(num_items=5) as url:
+        first = news_fetcher.fetch_many(['alpha', 'beta'], url_template=url, ttl=600)
+        hits = _counter('rss.cache_hit')
+        second = news_fetcher.fetch_many(['alpha', 'beta'], url_template=url, ttl=600)
+
+    assert len(first['alpha']) == 5
+    assert second == first
+    assert _counter('rss.cache_hit') == hits + 2
+
+
+def test_expired_feed_is_revalidated_with_etag():
+    with synthetic.serve_rss(num_items=5) as url:
+        first = news_fetcher.fetch_many(['alpha'], url_template=url)
+        cached = news_fetcher._cache[news_fetcher.feed_url('alpha', url)]
+        assert cached['etag']
+
+        not_modified = _counter('rss.not_modified')
+        again = news_fetcher.fetch_many(['alpha'], url_template=url, ttl=0)
+
+    assert _counter('rss.not_modified') == not_modified + 1  # Server membalas 304, isi dari cache
+    assert again == first
+
+
+def test_invalidate_forces_conditional_get():
+    with synthetic.serve_rss(num_items=3) as url:
+        news_fetcher.fetch_many(['gamma'], url_template=url)
+        news_fetcher.invalidate('gamma', url_template=url)
+        not_modified = _counter('rss.not_modified')
+        news_fetcher.fetch_many(['gamma'], url_template=url)
+    assert _counter('rss.not_modified') == not_modified + 1
+
+
+def test_failed_fetch_falls_back_to_cached_entries():
+    with synthetic.serve_rss(num_items=3) as url:
+        first = news_fetcher.fetch_many(['delta'], url_template=url)
+    # Server sudah mati: entri lama tetap dipakai
+    again = news_fetcher.fetch_many(['delta'], url_template=url, ttl=0, timeout=1)
+    assert again == first
+
+
+def test_unreachable_feed_without_cache_is_left_out():
+    url = "http://127.0.0.1:9/{query}"
+    assert news_fetcher.fetch_many(['epsilon'], url_template=url, timeout=1) == {}
+    assert config.NEWS_RSS_URL  # Template default tidak diubah oleh url_template
@@ -0,0 +1,70 @@
+import threading
+import multiprocessing
+from datetime import date
+import pandas as pd
+import config
+import price_store
+import pipeline
+import insta_uploader
+import synthetic
+import instrumentation
+import sentiment
+import portfolio_optimizer
+
+_engine = sentiment.SentimentEngine(sentiment.LexiconScorer())
+
+
+def _use_locks():
+    instrumentation.count('test.fork')
+    with portfolio_optimizer._weights_lock: pass
+    assert _engine.score(["stocks rally"])[0] > 0
+
+
+def test_fork_while_locks_are_held_does_not_deadlock():
+    locks = [instrumentation._lock, _engine._lock, portfolio_optimizer._weights_lock]
+    held, release = threading.Event(), threading.Event()
+
+    def holder():
+        for lock in locks: lock.acquire()
+        held.set()
+        release.wait()
+        for lock in locks: lock.release()
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait()
+    # Sama seperti worker ProcessPool (start method fork) yang dibuat dari thread tahap pipeline
+    child = multiprocessing.get_context('fork').Process(target=_use_locks)
+    try:
+        child.start()
+        child.join(timeout=30)
+        if child.is_alive(): child.kill()
+    finally:
+        release.set()
+        thread.join()
+    assert child.exitcode == 0
+
+
+def test_rerun_after_failed_upload_only_repeats_upload(monkeypatch):
+    end = pd.Timestamp.today().normalize()
+    frames = {'AAA.JK': synthetic.ohlcv(200, end=end, seed=1), 'BBB.JK': synthetic.ohlcv(200, end=end, seed=2)}
+    source = price_store.FrameSource(frames)
+    calls = []
+    monkeypatch.setattr(source, 'fetch_many', lambda *args: calls.append(args) or frames)
+    price_store.set_store(price_store.PriceStore(source=source))
+    monkeypatch.setattr(config, 'FORECAST_BACKEND', 'holt')
+    monkeypatch.setattr(config, 'UPLOAD_BACKOFF_SECONDS', 0)
+    client = insta_uploader.FakeClient(fail_times=config.UPLOAD_MAX_RETRIES + 1)
+    insta_uploader.set_client(client)
+    run_date = date(2026, 10, 18)
+
+    first = pipeline.run_pipeline(list(frames), run_date)
+    assert first['stages']['upload']['status'] == 'failed'
+    assert all(first['stages'][name]['status'] == 'done' for name in ('fetch', 'forecast', 'signal', 'render'))
+    fetches = len(calls)
+
+    second = pipeline.run_pipeline(list(frames), run_date)
+    assert second['stages']['upload']['status'] == 'done'
+    assert all(second['stages'][name]['status'] == 'cached' for name in ('fetch', 'forecast', 'signal', 'render'))
+    assert len(calls) == fetches
+    assert len(client.uploads) == 1
@@ -0,0 +1,62 @@
+import itertools
+import numpy as np
+import pytest
+import config
+import portfolio_optimizer
+
+
+def _squared_error(lots, weights, prices, amount):
+    return float(((lots * prices * config.LOT_SIZE - amount * weights) ** 2).sum())
+
+
+def _brute_force(weights, prices, amount):
+    """
+    Selisih kuadrat terkecil dari SEMUA alokasi yang muat di dana: lot 0..floor+1 untuk semua saham kecuali
+    yang terakhir; saham terakhir diberi lot terbaik yang masih muat (selisih kuadrat cembung per saham).
+    """
+    lot_cost = prices * config.LOT_SIZE
+    target = amount * weights
+    ranges = [np.arange(int(t // c) + 2) for t, c in zip(target[:-1], lot_cost[:-1])]
+    grid = np.array(list(itertools.product(*ranges)), dtype=float).reshape(-1, len(ranges)) if ranges else np.zeros((1, 0))
+    remaining = amount - grid @ lot_cost[:-1]
+    feasible = remaining >= 0
+    grid, remaining = grid[feasible], remaining[feasible]
+    last = np.minimum(np.round(target[-1] / lot_cost[-1]), np.floor(remaining / lot_cost[-1]))
+    lots = np.column_stack([grid, last])
+    return float((((lots * lot_cost) - target) ** 2).sum(axis=1).min())
+
+
+def _cases(count, num_assets, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        yield rng.dirichlet(np.ones(num_assets)), rng.uniform(500, 20_000, num_assets), rng.uniform(1e6, 1e7)
+
+
+@pytest.mark.parametrize('num_assets', [1, 2, 3, 4])
+def test_allocate_lots_matches_brute_force(num_assets):
+    for weights, prices, amount in _cases(150, num_assets, seed=num_assets):
+        lots = portfolio_optimizer.allocate_lots(weights, prices, amount)
+        assert lots.min() >= 0
+        assert lots @ (prices * config.LOT_SIZE) <= amount
+        assert _squared_error(lots, weights, prices, amount) <= _brute_force(weights, prices, amount) * (1 + 1e-9) + 1e-6
+
+
+def test_cheap_stock_gives_way_to_expensive_one():
+    # Floor + {0, 1} lot tidak bisa membeli saham 72% sama sekali; solusi optimal mengurangi saham murah
+    weights, prices, amount = np.array([0.049, 0.233, 0.718]), np.array([9994.0, 787.0, 16670.0]), 1_981_805
+    lots = portfolio_optimizer.allocate_lots(weights, prices, amount)
+    assert lots[2] == 1
+    assert _squared_error(lots, weights, prices, amount) <= _brute_force(weights, prices, amount) + 1e-6
+
+
+def test_greedy_fallback_stays_within_budget(monkeypatch):
+    monkeypatch.setattr(config, 'LOT_EXACT_MAX_ASSETS', 0)
+    for weights, prices, amount in _cases(200, 30):
+        lots = portfolio_optimizer.allocate_lots(weights, prices, amount)
+        assert lots.min() >= 0
+        assert lots @ (prices * config.LOT_SIZE) <= amount
+
+
+def test_budget_too_small_buys_nothing():
+    lots = portfolio_optimizer.allocate_lots([0.5, 0.5], [10_000.0, 20_000.0], 500_000)
+    assert lots.tolist() == [0, 0]
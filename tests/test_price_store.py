@@ -0,0 +1,110 @@
+import pandas as pd
+import price_store
+import synthetic
+
+
+class RecordingSource(price_store.FrameSource):
+    """FrameSource yang mencatat setiap request (tickers, start, end)"""
+
+    def __init__(self, frames):
+        super().__init__(frames)
+        self.requests = []
+
+    def fetch_many(self, tickers, start, end):
+        self.requests.append((list(tickers), start, end))
+        return super().fetch_many(tickers, start, end)
+
+
+def _frames(days=300):
+    end = pd.Timestamp.today().normalize()
+    return {'AAA.JK': synthetic.ohlcv(days, end=end, seed=1), 'BBB.JK': synthetic.ohlcv(days, end=end, seed=2)}
+
+
+def test_first_fetch_downloads_full_range_once():
+    source = RecordingSource(_frames())
+    store = price_store.PriceStore(source=source)
+    result = store.update_many(['AAA.JK', 'BBB.JK'], 365)
+
+    assert len(source.requests) == 1
+    assert source.requests[0][0] == ['AAA.JK', 'BBB.JK']
+    assert not result['AAA.JK'].empty
+    assert store.read('AAA.JK').equals(result['AAA.JK'])
+
+
+def test_fresh_store_is_not_refetched():
+    source = RecordingSource(_frames())
+    store = price_store.PriceStore(source=source)
+    store.update_many(['AAA.JK'], 365)
+    store.update_many(['AAA.JK'], 365)
+    assert len(source.requests) == 1
+
+
+def test_stale_store_fetches_only_the_tail():
+    frames = _frames()
+    source = RecordingSource(frames)
+    store = price_store.PriceStore(source=source)
+    first = store.update_many(['AAA.JK'], 365)['AAA.JK']
+
+    store.invalidate('AAA.JK')
+    second = store.update_many(['AAA.JK'], 365)['AAA.JK']
+
+    assert len(source.requests) == 2
+    tickers, start, _ = source.requests[1]
+    assert tickers == ['AAA.JK']
+    assert start == first.index[-1]  # Mulai dari hari terakhir tersimpan, bukan seluruh rentang
+    assert second.equals(first)
+
+
+def test_missing_ticker_returns_empty_frame():
+    store = price_store.PriceStore(source=RecordingSource(_frames()))
+    assert store.update_many(['ZZZ.JK'], 365)['ZZZ.JK'].empty
+
+
+def test_short_history_is_not_backfilled_again():
+    # Riwayat 60 hari (mis. IPO baru) di jendela 365 hari: awal rentang cukup dicek sekali
+    end = pd.Timestamp.today().normalize()
+    source = RecordingSource({'IPO.JK': synthetic.ohlcv(60, end=end, seed=4)})
+    store = price_store.PriceStore(source=source)
+    for _ in range(3): store.get_history('IPO.JK', 365)
+    assert len(source.requests) == 1
+
+    store.invalidate('IPO.JK')
+    store.get_history('IPO.JK', 365)
+    assert len(source.requests) == 2  # Hanya bagian akhir, tanpa backfill
+    assert source.requests[1][1] > end - pd.Timedelta(days=30)
+
+
+def test_longer_window_backfills_once():
+    end = pd.Timestamp.today().normalize()
+    source = RecordingSource({'AAA.JK': synthetic.ohlcv(400, end=end, seed=5)})
+    store = price_store.PriceStore(source=source)
+    store.get_history('AAA.JK', 182)
+    store.invalidate('AAA.JK')
+    store.get_history('AAA.JK', 365)  # Rentang lebih panjang dari yang pernah diminta: tail + backfill
+    store.get_history('AAA.JK', 365)
+    assert len(source.requests) == 3
+    assert store.read('AAA.JK').index[0] <= end - pd.Timedelta(days=358)
+
+
+def test_missing_ticker_is_cached_for_refresh_window():
+    source = RecordingSource(_frames())
+    store = price_store.PriceStore(source=source)
+    for _ in range(3): assert store.get_history('ZZZ.JK', 365).empty
+    assert len(source.requests) == 1
+
+    store.invalidate('ZZZ.JK')
+    store.get_history('ZZZ.JK', 365)
+    assert len(source.requests) == 2
+
+
+def test_failed_fetch_is_not_recorded_as_checked():
+    class FailingSource(RecordingSource):
+        def fetch_many(self, tickers, start, end):
+            super().fetch_many(tickers, start, end)
+            raise ConnectionError("offline")
+
+    source = FailingSource(_frames())
+    store = price_store.PriceStore(source=source)
+    store.get_history('AAA.JK', 365)
+    store.get_history('AAA.JK', 365)
+    assert len(source.requests) == 2
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+import price_store
+import screener
+import synthetic
+
+
+def _reference_ledoit_wolf(X):
+    """Ledoit & Wolf (2004) langsung dari definisinya, satu observasi per iterasi"""
+    X = X - X.mean(axis=0)
+    n, p = X.shape
+    S = X.T @ X / n
+    mu = np.trace(S) / p
+    target = mu * np.eye(p)
+    d2 = np.sum((S - target) ** 2) / p
+    b2 = sum(np.sum((np.outer(x, x) - S) ** 2) for x in X) / p / n ** 2
+    shrinkage = min(b2, d2) / d2
+    return shrinkage * target + (1 - shrinkage) * S, shrinkage
+
+
+@pytest.mark.parametrize("n, p", [(250, 5), (40, 30), (20, 60)])
+def test_ledoit_wolf_matches_reference(n, p):
+    rng = np.random.default_rng(n + p)
+    X = rng.normal(0, 0.02, (n, p)) + rng.normal(0, 0.01, (n, 1))
+    cov, shrinkage = screener.ledoit_wolf_cov(X)
+    expected_cov, expected_shrinkage = _reference_ledoit_wolf(X)
+    assert shrinkage == pytest.approx(expected_shrinkage, rel=1e-9)
+    np.testing.assert_allclose(cov, expected_cov, rtol=1e-9, atol=1e-15)
+
+
+def test_ledoit_wolf_matches_sklearn():
+    covariance = pytest.importorskip("sklearn.covariance")
+    X = np.random.default_rng(7).normal(0, 0.02, (60, 25))
+    cov, shrinkage = screener.ledoit_wolf_cov(X)
+    expected_cov, expected_shrinkage = covariance.ledoit_wolf(X)
+    assert shrinkage == pytest.approx(expected_shrinkage)
+    np.testing.assert_allclose(cov, expected_cov, rtol=1e-9)
+
+
+def test_running_stats_match_numpy_across_chunks():
+    rng = np.random.default_rng(3)
+    returns = rng.normal(0.001, 0.02, (100, 7)).astype(np.float32)
+    returns[rng.random(returns.shape) < 0.2] = np.nan
+    stats = screener.RunningStats(7)
+    for start in range(0, 7, 3): stats.update(returns[:, start:start + 3], start)
+    np.testing.assert_allclose(stats.mean(), np.nanmean(returns.astype(np.float64), axis=0), rtol=1e-9)
+    np.testing.assert_allclose(stats.std(), np.nanstd(returns.astype(np.float64), axis=0, ddof=1), rtol=1e-6)
+
+
+def test_screen_skips_tickers_without_enough_coverage():
+    end = pd.Timestamp.today().normalize()
+    frames = {f"T{i}.JK": synthetic.ohlcv(200, seed=i, end=end) for i in range(6)}
+    frames['NEW.JK'] = synthetic.ohlcv(40, seed=99, end=end)  # Baru listing: data < 80% hari bursa
+    price_store.set_store(price_store.PriceStore(source=price_store.FrameSource(frames)))
+
+    result = screener.screen(list(frames), top_n=3, days=182, chunk_size=2)
+    assert result['screened'] == 6 and result['skipped'] == 1
+    assert 'NEW.JK' not in result['tickers']
+    assert len(result['tickers']) == 3 and result['cov'].shape == (3, 3)
+    assert list(result['sharpe']) == sorted(result['sharpe'], reverse=True)
+
+    # Ukuran potongan tidak mengubah hasil
+    again = screener.screen(list(frames), top_n=3, days=182, chunk_size=100)
+    assert again['tickers'] == result['tickers']
+    np.testing.assert_allclose(again['cov'], result['cov'])
+
+    # Tanpa batas cakupan ticker baru ikut di-screening
+    assert screener.screen(list(frames), top_n=7, days=182, min_coverage=0)['screened'] == 7
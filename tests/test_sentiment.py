@@ -0,0 +1,56 @@
+import sentiment
+
+
+class CountingScorer:
+    """Skor = panjang judul ternormalisasi; mencatat setiap judul yang benar-benar dihitung"""
+    name = "counting"
+
+    def __init__(self):
+        self.scored = []
+
+    def score_batch(self, texts):
+        self.scored.extend(texts)
+        return [float(len(sentiment.normalize(text))) for text in texts]
+
+
+def test_same_headline_is_scored_once():
+    scorer = CountingScorer()
+    engine = sentiment.SentimentEngine(scorer)
+    texts = ["Stocks rally on rate cut - Reuters", "STOCKS RALLY ON RATE CUT!", "Oil slumps"]
+    assert engine.score(texts) == [24.0, 24.0, 10.0]
+    assert engine.score(["stocks rally on rate cut - Bloomberg"]) == [24.0]
+    assert len(scorer.scored) == 2
+    assert (engine.hits, engine.misses) == (2, 2)
+
+
+def test_cache_is_bounded_lru():
+    scorer = CountingScorer()
+    engine = sentiment.SentimentEngine(scorer, maxsize=2)
+    engine.score(["a", "bb"])
+    engine.score(["a"])  # "a" jadi yang terbaru, "bb" yang dibuang berikutnya
+    engine.score(["ccc"])
+    assert len(engine._cache) == 2
+    scorer.scored.clear()
+    engine.score(["a", "bb"])
+    assert scorer.scored == ["bb"]
+
+    # Batch lebih besar dari LRU tetap menghasilkan skor lengkap
+    assert engine.score(["d", "ee", "fff", "gggg"]) == [1.0, 2.0, 3.0, 4.0]
+    assert len(engine._cache) == 2
+
+
+def test_cache_persists_across_engines(tmp_path):
+    path = str(tmp_path / "cache" / "counting.json")
+    engine = sentiment.SentimentEngine(CountingScorer(), cache_path=path)
+    engine.score(["Stocks rally", "Oil slumps"])
+    engine.save()
+
+    scorer = CountingScorer()
+    assert sentiment.SentimentEngine(scorer, cache_path=path).score(["stocks rally"]) == [12.0]
+    assert scorer.scored == []
+
+    # Cache dari scorer lain tidak dipakai
+    other = CountingScorer()
+    other.name = "other"
+    assert sentiment.SentimentEngine(other, cache_path=path).score(["stocks rally"]) == [12.0]
+    assert other.scored == ["stocks rally"]
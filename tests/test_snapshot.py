@@ -0,0 +1,91 @@
+import threading
+import time
+import pandas as pd
+import market_analysis
+import snapshot
+
+
+def _frame(points=30):
+    return pd.DataFrame({'ds': pd.bdate_range('2026-01-01', periods=points), 'y': [100.0 + i for i in range(points)]})
+
+
+class CountingLoader:
+    def __init__(self, result, delay=0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, key):
+        with self._lock: self.calls += 1
+        time.sleep(self.delay)
+        return self.result
+
+
+def test_series_cached_until_ttl():
+    snap = snapshot.MarketSnapshot()
+    loader = CountingLoader((_frame(), 129.0, 131.0))
+    first = snap.get_series('AAA.JK', loader, ttl=60)
+    assert snap.get_series('AAA.JK', loader, ttl=60) is first
+    assert loader.calls == 1
+    assert not first.y.flags.writeable and first.tail(5)[1].base is not None  # View read-only, bukan salinan
+
+    time.sleep(0.05)
+    assert snap.get_series('AAA.JK', loader, ttl=0.01) is not first
+    assert loader.calls == 2
+
+
+def test_version_bump_reloads_only_that_key():
+    snap = snapshot.MarketSnapshot()
+    loader = CountingLoader((0.2, "Positif", [{'title': 't', 'link': 'l', 'published': 'p'}]))
+    snap.get_news('alpha', loader, ttl=60)
+    snap.get_news('beta', loader, ttl=60)
+    snap.get_news('alpha', loader, ttl=60, version=1)
+    snap.get_news('beta', loader, ttl=60)
+    assert loader.calls == 3
+
+
+def test_failed_load_is_not_cached():
+    snap = snapshot.MarketSnapshot()
+    loader = CountingLoader((None, None, None))
+    assert snap.get_series('BAD.JK', loader, ttl=60) is None
+    assert snap.get_series('BAD.JK', loader, ttl=60) is None
+    assert loader.calls == 2
+    assert snap._key_locks == {}
+
+
+def test_expired_entries_and_signals_are_evicted():
+    snap = snapshot.MarketSnapshot()
+    series = snap.get_series('AAA.JK', CountingLoader((_frame(), 129.0, 131.0)), ttl=0.05)
+    news = snap.get_news('alpha', CountingLoader((0.0, "Netral", [])), ttl=0.05)
+    snap.get_signal(series, news, market_analysis.get_hybrid_signal)
+    time.sleep(0.1)
+
+    snap.get_series('BBB.JK', CountingLoader((_frame(), 129.0, 131.0)), ttl=0.05)
+    snap.get_news('beta', CountingLoader((0.0, "Netral", [])), ttl=0.05)
+    assert list(snap._series) == ['BBB.JK']
+    assert list(snap._news) == ['beta']
+    assert snap._signals == {}
+
+
+def test_concurrent_sessions_share_one_loader():
+    snap = snapshot.MarketSnapshot()
+    loader = CountingLoader((_frame(), 129.0, 131.0), delay=0.05)
+    errors, results = [], []
+
+    def session(i):
+        try:
+            # Sesi lain memuat ticker berbeda bersamaan (dict diubah saat _expire berjalan)
+            results.append(snap.get_series('AAA.JK', loader, ttl=60))
+            snap.get_series(f"T{i}.JK", CountingLoader((_frame(), 1.0, 1.0)), ttl=60)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(16)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+    assert errors == []
+    assert loader.calls == 1
+    assert all(result is results[0] for result in results)
+    assert snap._key_locks == {}
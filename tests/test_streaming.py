@@ -0,0 +1,87 @@
+import pandas as pd
+import config
+import price_store
+import streaming
+import instrumentation
+import synthetic
+
+DAY = pd.Timestamp('2026-10-12')  # Senin
+
+
+def _tick(ticker, minute, price, day=DAY):
+    return {'ts': day + pd.Timedelta(hours=9, minutes=30 + minute), 'ticker': ticker, 'price': price}
+
+
+def _engine(baseline_provider, **kwargs):
+    return streaming.IntradayEngine(keywords={}, eval_interval=0, span=1, baseline_provider=baseline_provider,
+                                    sentiment_provider=lambda keyword: 0.0, **kwargs)
+
+
+def test_baseline_is_shifted_by_intraday_moves():
+    engine = _engine(lambda ticker, day: (100.0, 101.0))
+    event = engine.on_tick(_tick('AAA.JK', 0, 104.0))
+    # span=1 -> EWMA = harga terakhir; baseline = prediksi + (EWMA - penutupan kemarin)
+    assert event['baseline'] == 101.0 + (104.0 - 100.0)
+    assert event['previous'] is None
+
+
+def test_event_only_when_signal_changes():
+    engine = _engine(lambda ticker, day: (100.0, 110.0))
+    events = [engine.on_tick(_tick('AAA.JK', i, 100.0)) for i in range(5)]
+    assert sum(event is not None for event in events) == 1
+
+
+def test_missing_baseline_is_not_requested_again_same_day():
+    calls = []
+
+    def provider(ticker, day):
+        calls.append((ticker, day))
+        return None if ticker == 'BBB.JK' else (100.0, 101.0)
+
+    engine = _engine(provider)
+    for i in range(50):
+        assert engine.on_tick(_tick('BBB.JK', i, 100.0 + i)) is None
+        engine.on_tick(_tick('AAA.JK', i, 100.0 + i))
+    assert calls.count(('BBB.JK', DAY.date())) == 1
+    assert calls.count(('AAA.JK', DAY.date())) == 1
+
+    # Hari bursa berikutnya dicoba lagi
+    engine.on_tick(_tick('BBB.JK', 0, 100.0, day=DAY + pd.Timedelta(days=1)))
+    assert len([c for c in calls if c[0] == 'BBB.JK']) == 2
+
+
+def test_ticks_outside_session_are_ignored():
+    calls = []
+    engine = _engine(lambda ticker, day: calls.append(ticker) or (100.0, 101.0))
+    assert engine.on_tick({'ts': DAY + pd.Timedelta(hours=12, minutes=30), 'ticker': 'AAA.JK', 'price': 100.0}) is None
+    assert engine.on_tick({'ts': DAY + pd.Timedelta(days=5, hours=10), 'ticker': 'AAA.JK', 'price': 100.0}) is None
+    assert calls == []
+
+
+def test_default_baseline_drops_todays_partial_bar(monkeypatch):
+    monkeypatch.setattr(config, 'FORECAST_BACKEND', 'holt')
+    frames = {'AAA.JK': synthetic.ohlcv(120, seed=3)}
+    price_store.set_store(price_store.PriceStore(source=price_store.FrameSource(frames)))
+    today = frames['AAA.JK'].index[-1]
+
+    prev_close, pred = streaming._default_baseline('AAA.JK', today.date())
+    assert prev_close == frames['AAA.JK']['Close'].iloc[-2]
+    assert pred is not None
+
+
+def test_bad_prices_are_counted_and_skipped():
+    engine = _engine(lambda ticker, day: (100.0, 101.0))
+    before = instrumentation.get_counters().get('stream.bad_price', 0)
+    for i, price in enumerate([0.0, -5.0, float('nan'), float('inf')]):
+        assert engine.on_tick(_tick('AAA.JK', i, price)) is None
+    assert instrumentation.get_counters()['stream.bad_price'] - before == 4
+
+    # Stream tetap hidup dan statistik tidak tercemar
+    event = engine.on_tick(_tick('AAA.JK', 5, 104.0))
+    assert event['baseline'] == 101.0 + (104.0 - 100.0)
+    assert engine.states['AAA.JK']['ticks'] == 1
+
+
+def test_zero_prev_close_counts_as_missing_baseline():
+    engine = _engine(lambda ticker, day: (0.0, 101.0))
+    assert engine.on_tick(_tick('AAA.JK', 0, 100.0)) is None
@@ -0,0 +1,40 @@
+import os
+import pandas as pd
+import config
+import visualizer
+import synthetic
+
+
+def _asset(name, seed, signal="BUY"):
+    hist = synthetic.ohlcv(90, seed=seed, end=pd.Timestamp('2026-10-16'))
+    df = pd.DataFrame({'ds': hist.index, 'y': hist['Close'].values})
+    current = float(df['y'].iloc[-1])
+    return {'name': name, 'df': df, 'current': current, 'pred': current * 1.01, 'signal': signal,
+            'change': "1.00%", 'sentiment_label': "Netral ⚪"}
+
+
+def test_same_report_is_served_from_render_cache(tmp_path, monkeypatch):
+    renders = []
+    setup_canvas = visualizer.setup_canvas
+    monkeypatch.setattr(visualizer, 'setup_canvas', lambda date_str: renders.append(date_str) or setup_canvas(date_str))
+    assets = [_asset("AAA", 1), _asset("BBB", 2)]
+
+    first = visualizer.render_report(assets, "16 October 2026", str(tmp_path / "a.jpg"))
+    second = visualizer.render_report(assets, "16 October 2026", str(tmp_path / "b.jpg"))
+    assert len(renders) == 1
+    with open(first, 'rb') as f1, open(second, 'rb') as f2: assert f1.read() == f2.read()
+
+    # Isi report berubah -> render ulang
+    visualizer.render_report([_asset("AAA", 1, "SELL"), assets[1]], "16 October 2026", str(tmp_path / "c.jpg"))
+    assert len(renders) == 2
+
+
+def test_multi_page_report_reuses_cached_pages(tmp_path):
+    assets = [_asset(f"A{i}", i) for i in range(5)]
+    files = visualizer.render_pages(assets, "16 October 2026", str(tmp_path / "report.jpg"), max_workers=2)
+    assert [os.path.basename(f) for f in files] == ["report_1.jpg", "report_2.jpg"]
+
+    cache_dir = config.RENDER_CACHE_DIR
+    cached = {name: os.path.getmtime(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir)}
+    visualizer.render_pages(assets, "16 October 2026", str(tmp_path / "again.jpg"), max_workers=2)
+    assert {name: os.path.getmtime(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir)} == cached
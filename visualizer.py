@@ -1,35 +1,65 @@
+import os
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # Render tanpa GUI
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-import seaborn as sns
 from datetime import timedelta
 import config
 
-def setup_canvas(date_str):
+FIGSIZE = (12, 12)
+# Naikkan jika tampilan plot berubah, agar cache render lama tidak dipakai
+RENDER_VERSION = 1
+
+_style_ready = False
+_figure = None
+
+def _init_style():
+    # Style global cukup di-set sekali per proses
+    global _style_ready
+    if _style_ready: return
+    import seaborn as sns
     sns.set_theme(style="darkgrid")
-    plt.rcParams['figure.figsize'] = (12, 12)
+    plt.rcParams['figure.figsize'] = FIGSIZE
     plt.rcParams['font.family'] = 'sans-serif'
     plt.style.use('dark_background')
-    
-    fig, axs = plt.subplots(2, 2)
-    fig.suptitle(f"MARKET FORECAST (Hybrid Analysis)\n{date_str}", fontsize=16, fontweight='bold', color='white')
-    return fig, axs.flatten()
+    _style_ready = True
+
+def setup_canvas(date_str):
+    """Kanvas 2x2; figure yang sama dipakai ulang antar report"""
+    global _figure
+    _init_style()
+    if _figure is None:
+        _figure, axs = plt.subplots(2, 2, figsize=FIGSIZE)
+        axs = axs.flatten()
+    else:
+        axs = np.array(_figure.axes)
+        for ax in axs:
+            ax.clear()
+            ax.set_visible(True)
+
+    _figure.suptitle(f"MARKET FORECAST (Hybrid Analysis)\n{date_str}", fontsize=16, fontweight='bold', color='white')
+    return _figure, axs
 
 def plot_asset(ax, name, df_recent, current, pred, signal, change, sentiment_label):
     ax.plot(df_recent['ds'], df_recent['y'], label='Historis', color='#3498db', linewidth=2)
-    
+
     pred_date = df_recent['ds'].iloc[-1] + timedelta(days=1)
     ax.scatter(pred_date, pred, color='#e67e22', s=150, zorder=5)
-    
-    ax.annotate(f"{current:,.0f}", (df_recent['ds'].iloc[-1], current), 
+
+    ax.annotate(f"{current:,.0f}", (df_recent['ds'].iloc[-1], current),
                 xytext=(10, -20), textcoords='offset points', color='white', fontsize=8)
-    
+
     bg_color = config.COLORS['HOLD']
     if 'BUY' in signal: bg_color = config.COLORS['BELI']
     elif 'SELL' in signal: bg_color = config.COLORS['JUAL']
-    
+
     box_text = f"{name}\n{signal}\n({change})\nNews: {sentiment_label}"
     props = dict(boxstyle='round,pad=0.5', facecolor=bg_color, alpha=0.9, edgecolor='none')
-    
+
     ax.text(0.05, 0.95, box_text, transform=ax.transAxes, fontsize=10,
             fontweight='bold', color='white', verticalalignment='top', bbox=props)
 
@@ -37,7 +67,79 @@ def plot_asset(ax, name, df_recent, current, pred, signal, change, sentiment_lab
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%d-%b'))
     ax.set_facecolor('#2c3e50')
 
-def save_image(filename="market_forecast.png"):
-    plt.tight_layout(rect=[0, 0.03, 1, 0.90])
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
+def _export(fig, filename, size_px, quality):
+    fig.set_size_inches(FIGSIZE)
+    fig.tight_layout(rect=[0, 0.03, 1, 0.90])
+
+    fmt = os.path.splitext(filename)[1].lstrip('.').lower() or 'png'
+    if fmt == 'jpg': fmt = 'jpeg'
+    pil_kwargs = {'quality': quality} if fmt in ('jpeg', 'webp') else None
+    fig.savefig(filename, format=fmt, dpi=size_px[0] / FIGSIZE[0], pil_kwargs=pil_kwargs)
+
+def save_image(filename=config.REPORT_FILENAME, fig=None, size_px=config.REPORT_SIZE_PX, quality=config.REPORT_QUALITY):
+    """Simpan langsung di resolusi target (format dari ekstensi: .jpg/.webp/.png)"""
+    _export(fig or _figure or plt.gcf(), filename, size_px, quality)
     print(f"Gambar berhasil disimpan: {filename}")
+
+
+# --- REPORT + CACHE RENDER ---
+def _render_key(assets, date_str, size_px, quality, ext):
+    """Hash isi report: data yang diplot, sinyal, dan pengaturan ekspor"""
+    h = hashlib.sha1(f"{RENDER_VERSION}|{date_str}|{size_px}|{quality}|{ext}".encode())
+    for asset in assets:
+        df = asset['df']
+        h.update(df['ds'].values.astype('datetime64[ns]').view('int64').tobytes())
+        h.update(df['y'].values.astype('float64').tobytes())
+        h.update(repr((asset['name'], float(asset['current']), float(asset['pred']), asset['signal'],
+                       asset['change'], asset['sentiment_label'])).encode())
+    return h.hexdigest()
+
+def render_report(assets, date_str, filename=config.REPORT_FILENAME, size_px=config.REPORT_SIZE_PX,
+                  quality=config.REPORT_QUALITY):
+    """
+    Report satu halaman (maks. config.REPORT_SLOTS aset).
+    assets: list dict berisi name, df (ds/y), current, pred, signal, change, sentiment_label.
+    Jika isi report sama dengan render sebelumnya, file diambil dari cache tanpa render ulang.
+    """
+    ext = os.path.splitext(filename)[1] or '.png'
+    key = _render_key(assets, date_str, size_px, quality, ext)
+    cached_path = os.path.join(config.RENDER_CACHE_DIR, key + ext)
+
+    cache_hit = os.path.exists(cached_path)
+    if not cache_hit:
+        fig, axs = setup_canvas(date_str)
+        for ax, asset in zip(axs, assets):
+            plot_asset(ax, asset['name'], asset['df'], asset['current'], asset['pred'],
+                       asset['signal'], asset['change'], asset['sentiment_label'])
+        for ax in axs[len(assets):]: ax.set_visible(False)
+
+        os.makedirs(config.RENDER_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cached_path}.{os.getpid()}.tmp{ext}"
+        _export(fig, tmp_path, size_px, quality)
+        os.replace(tmp_path, cached_path)
+
+    if os.path.abspath(cached_path) != os.path.abspath(filename):
+        shutil.copyfile(cached_path, filename)
+    print(f"Gambar berhasil disimpan: {filename}" + (" (cache)" if cache_hit else ""))
+    return filename
+
+def _render_page(args):
+    return render_report(*args)
+
+def render_pages(assets, date_str, filename=config.REPORT_FILENAME, size_px=config.REPORT_SIZE_PX,
+                 quality=config.REPORT_QUALITY, max_workers=None):
+    """
+    Report multi-halaman (config.REPORT_SLOTS aset per halaman), dirender paralel di worker proses.
+    File: <nama>_1.jpg, <nama>_2.jpg, ... (atau nama asli jika cukup satu halaman).
+    """
+    slots = config.REPORT_SLOTS
+    pages = [assets[i:i + slots] for i in range(0, len(assets), slots)]
+    if len(pages) <= 1:
+        return [render_report(assets, date_str, filename, size_px, quality)]
+
+    base, ext = os.path.splitext(filename)
+    jobs = [(page, f"{date_str} ({i + 1}/{len(pages)})", f"{base}_{i + 1}{ext}", size_px, quality)
+            for i, page in enumerate(pages)]
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_page, jobs))